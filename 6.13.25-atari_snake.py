@@ -1,350 +1,307 @@
+import argparse
+import os
+import sys
+import time
+
 import pygame
-import random
-import math
-import numpy as np
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+from snake_audio import AudioManager, init_mixer
+from snake_autopilot import Autopilot
+from snake_engine import (GRID_SIZE, MAX_GRID_SIZE, FPS, UP, DOWN, LEFT, RIGHT, Engine,
+                          FixedTimestep, EVENT_SOUND, EVENT_PARTICLES, EVENT_GAME_OVER, DEATH_WALL,
+                          BOARD_FULL, FOOD_EFFECTS, TurnQueue)
+from snake_particles import ParticlePool
+from snake_profiler import (FrameProfiler, PHASE_EVENTS, PHASE_INPUT, PHASE_UPDATE,
+                            PHASE_PARTICLES, PHASE_DRAW_MENU, PHASE_DRAW_GAME,
+                            PHASE_DRAW_GAME_OVER, PHASE_PRESENT, PHASE_AUDIO, StateCPU)
+from snake_replay import ReplayRecorder
+from snake_render import (BoardRenderer, BLACK, GREEN, RED, WHITE, YELLOW, PURPLE,
+                          CYAN)
+from snake_sound import SAMPLE_RATE, beep_pcm
+from snake_text import TextCache
 
 # Constants
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-GRID_SIZE = 20
-CELL_SIZE = WINDOW_WIDTH // GRID_SIZE
-FPS = 60
-
-# Colors - Retro palette
-BLACK = (0, 0, 0)
-GREEN = (0, 255, 0)
-DARK_GREEN = (0, 180, 0)
-RED = (255, 0, 0)
-WHITE = (255, 255, 255)
-YELLOW = (255, 255, 0)
-BLUE = (0, 100, 255)
-PURPLE = (255, 0, 255)
-CYAN = (0, 255, 255)
-ORANGE = (255, 165, 0)
+MIN_CELL_SIZE = 16  # Boards that would need smaller cells scroll instead
+BLINK_MS = 500  # The game over cursor shows for this long, then hides as long
+
+
+def cell_size_for(grid_size):
+    # Small boards fit the window whole; big ones get readable cells and a
+    # camera that follows the head
+    return max(MIN_CELL_SIZE, min(WINDOW_WIDTH, WINDOW_HEIGHT) // grid_size)
+
+
+# Steering keys
+KEY_DIRECTIONS = {
+    pygame.K_UP: UP, pygame.K_w: UP,
+    pygame.K_DOWN: DOWN, pygame.K_s: DOWN,
+    pygame.K_LEFT: LEFT, pygame.K_a: LEFT,
+    pygame.K_RIGHT: RIGHT, pygame.K_d: RIGHT,
+}
 
 # Game states
 STATE_MENU = "menu"
 STATE_PLAYING = "playing"
 STATE_GAME_OVER = "game_over"
 
+def init_pygame():
+    # Done by the first Game rather than at import, so tools that only want
+    # the rules never open a window or an audio device. A machine without
+    # audio leaves the mixer off instead of failing.
+    if not pygame.get_init():
+        pygame.mixer.pre_init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=512)
+        pygame.init()
+
 # Sound generation functions
 def generate_beep(frequency, duration):
-    sample_rate = 22050
-    samples = int(sample_rate * duration)
-    waves = np.zeros((samples, 2), dtype=np.int16)
-    
-    for i in range(samples):
-        t = float(i) / sample_rate
-        # Square wave for that Atari sound
-        value = 32767 if math.sin(2 * math.pi * frequency * t) > 0 else -32767
-        # Add some envelope
-        envelope = 1.0
-        if i < samples * 0.1:
-            envelope = i / (samples * 0.1)
-        elif i > samples * 0.9:
-            envelope = (samples - i) / (samples * 0.1)
-        value = int(value * envelope * 0.3)
-        waves[i][0] = value  # Left channel
-        waves[i][1] = value  # Right channel
-    
-    sound = pygame.sndarray.make_sound(waves)
-    return sound
-
-# Generate game sounds
-eat_sound = generate_beep(440, 0.1)  # A4 note
-death_sound = generate_beep(110, 0.5)  # A2 note (lower, longer)
-move_sound = generate_beep(220, 0.02)  # A3 note (quick tick)
-level_up_sound = generate_beep(880, 0.3)  # A5 note
-menu_sound = generate_beep(660, 0.15)  # E5 note
-select_sound = generate_beep(523, 0.2)  # C5 note
-
-class Snake:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self):
-        self.positions = [(GRID_SIZE // 2, GRID_SIZE // 2)]
-        self.direction = (1, 0)
-        self.grow_count = 0
-        self.rainbow_mode = False
-        
-    def move(self):
-        head = self.positions[0]
-        new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
-        
-        # Check if snake leaves screen
-        if (new_head[0] < 0 or new_head[0] >= GRID_SIZE or 
-            new_head[1] < 0 or new_head[1] >= GRID_SIZE):
-            return None  # Signal that snake left screen
-        
-        self.positions.insert(0, new_head)
-        
-        if self.grow_count > 0:
-            self.grow_count -= 1
-        else:
-            self.positions.pop()
-            
-        # Play move sound (very quiet)
-        move_sound.set_volume(0.05)
-        move_sound.play()
-            
-        return new_head
-        
-    def grow(self, amount=1):
-        self.grow_count += amount
-        
-    def check_collision(self):
-        head = self.positions[0]
-        return head in self.positions[1:]
-        
-    def change_direction(self, new_direction):
-        # Prevent going back into yourself
-        if (new_direction[0] * -1, new_direction[1] * -1) != self.direction:
-            self.direction = new_direction
-
-class Food:
-    def __init__(self):
-        self.position = None
-        self.type = "normal"
-        self.timer = 0
-        self.lifespan = 0
-        self.spawn()
-        
-    def spawn(self):
-        self.position = (random.randint(0, GRID_SIZE - 1), 
-                        random.randint(0, GRID_SIZE - 1))
-        
-        # Different food types with different rarities
-        rand = random.random()
-        if rand < 0.6:  # 60% normal apple
-            self.type = "apple"
-            self.lifespan = -1  # Never expires
-        elif rand < 0.8:  # 20% golden apple
-            self.type = "golden"
-            self.lifespan = -1
-        elif rand < 0.9:  # 10% speed fruit
-            self.type = "speed"
-            self.lifespan = 300  # 5 seconds at 60 FPS
-        elif rand < 0.95:  # 5% ghost fruit
-            self.type = "ghost"
-            self.lifespan = 180  # 3 seconds
-        else:  # 5% bomb (avoid this!)
-            self.type = "bomb"
-            self.lifespan = 240  # 4 seconds
-            
-        self.timer = 0
-        
-    def update(self):
-        if self.lifespan > 0:
-            self.timer += 1
-            if self.timer >= self.lifespan:
-                return True  # Signal to respawn
-        return False
-        
-    @property
-    def special(self):
-        return self.type != "apple"
-        
+    # PCM comes from the vectorized synthesizer and its on-disk cache;
+    # None when there is no audio
+    if not init_mixer():
+        return None
+    return pygame.sndarray.make_sound(beep_pcm(frequency, duration))
+
+# Particle bursts for special food: (count, speed, colors, life)
+PARTICLE_COLORS = [YELLOW, CYAN, PURPLE, GREEN, WHITE, RED]
+PARTICLE_BURSTS = {
+    "golden": (20, 5, [YELLOW, CYAN, PURPLE, GREEN], 1.0),
+    "speed": (15, 8, [CYAN], 1.0),
+    "ghost": (10, 3, [WHITE], 1.5),
+    "bomb": (30, 10, [RED], 0.8),
+}
+
+# Online, a delta only says how much a snake's score changed; each food is
+# worth a different amount, so that picks its sound
+SCORE_SOUNDS = {points: sound for points, _, sound in FOOD_EFFECTS.values()}
+
 class Game:
-    def __init__(self):
+    def __init__(self, grid_size=GRID_SIZE, server=None, room=0):
+        init_pygame()
+        self.sounds = AudioManager()
+        self.sounds.load()  # Synthesizes in the background while the menu is up
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("SNAKE - ATARI VIBES")
         self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep()
         self.font = pygame.font.Font(None, 36)
         self.big_font = pygame.font.Font(None, 72)
         self.title_font = pygame.font.Font(None, 96)
+        self.text = TextCache()  # Every string drawn goes through this
         
         self.state = STATE_MENU
         self.menu_selection = 0  # 0 = Start, 1 = Quit
         
-        self.snake = Snake()
-        self.food = Food()
-        self.score = 0
+        # All game rules live in the headless engine; Game only renders it
+        self.grid_size = grid_size
+        self.cell_size = cell_size_for(grid_size)
+        self.engine = Engine(grid_size)
+        self.snake = self.engine.snake
+        self.food = self.engine.food
         self.high_score = 0
-        self.move_timer = 0
-        self.move_delay = 100  # milliseconds
-        self.particle_effects = []
-        self.speed_boost_timer = 0
-        self.ghost_mode_timer = 0
+        self.particles = ParticlePool(PARTICLE_COLORS)
+        self.recorder = ReplayRecorder()
+        self.autopilot = Autopilot(self.engine)
+        self.autopilot_on = False  # Toggled with P while playing
+        self.turns = TurnQueue()  # Key presses, one taken per move
+        self.last_replay = None
+        # F3 shows frame timings (SNAKE_PROFILE=1 starts with them on), F4
+        # saves a Chrome trace to SNAKE_TRACE
+        self.profiler = FrameProfiler(FPS)
+        self.profiler.enabled = os.environ.get("SNAKE_PROFILE") == "1"
+        self.overlay_lines = []
+        self.overlay_refresh = 0
+        self.state_cpu = StateCPU()
+        # The menu and a still game over screen are drawn only when input or
+        # a timer changes them, and the loop sleeps in between;
+        # SNAKE_ON_DEMAND=0 draws them every frame as the game does
+        self.on_demand = os.environ.get("SNAKE_ON_DEMAND") != "0"
+        self.redraw_at = 0  # pygame ticks when the idle screen is due; None: on input only
+        self.drawn_state = None
+        # The game over screen minus its cursor, composed once per game over
+        self.dim = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self.dim.set_alpha(128)
+        self.dim.fill(BLACK)
+        self.game_over_frame = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self.game_over_cached = False
+        self.renderer = BoardRenderer(self.screen, grid_size, self.cell_size, self.font,
+                                      self.text)
+        # With `server` (host, port) this is a client of snake_server: the
+        # room's rules run there, and the game sends turns and draws the room
+        self.server = server
+        self.room = room
+        self.remote = None  # snake_server.RoomClient while connected
+        self.remote_score = 0  # Ours as of the last death, while game over
+
+    @property
+    def score(self):
+        if self.remote is not None:
+            return self.remote_score
+        return self.engine.score
+
+    @property
+    def speed_boost_timer(self):
+        # The server doesn't send power-up timers
+        return 0 if self.remote is not None else self.engine.speed_boost_timer
+
+    @property
+    def ghost_mode_timer(self):
+        return 0 if self.remote is not None else self.engine.ghost_mode_timer
         
     def handle_menu_input(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key in [pygame.K_UP, pygame.K_w]:
                 self.menu_selection = 0
-                menu_sound.play()
+                self.sounds.post("menu")
             elif event.key in [pygame.K_DOWN, pygame.K_s]:
                 self.menu_selection = 1
-                menu_sound.play()
+                self.sounds.post("menu")
             elif event.key in [pygame.K_RETURN, pygame.K_SPACE]:
                 if self.menu_selection == 0:
                     self.state = STATE_PLAYING
                     self.reset_game()
-                    select_sound.play()
+                    self.sounds.post("select")
                 else:
                     return False  # Quit game
         return True
         
-    def handle_game_input(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.snake.change_direction((0, -1))
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.snake.change_direction((0, 1))
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.snake.change_direction((-1, 0))
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.snake.change_direction((1, 0))
-            
+    def handle_game_input(self, event):
+        # A press queues a turn for the snake's next move, so taps between
+        # moves all count; online, it goes straight to the server
+        if event.type != pygame.KEYDOWN or event.key not in KEY_DIRECTIONS:
+            return
+        direction = KEY_DIRECTIONS[event.key]
+        if self.remote is not None:
+            self.remote.turn(direction)
+        elif not self.autopilot_on:
+            self.turns.push(direction, self.snake.direction, time.perf_counter())
+
     def handle_game_over_input(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_y:
-                self.reset_game()
                 self.state = STATE_PLAYING
-                select_sound.play()
+                self.reset_game()
+                self.sounds.post("select")
             elif event.key == pygame.K_n:
+                self.disconnect()
                 self.state = STATE_MENU
                 self.menu_selection = 0
-                menu_sound.play()
+                self.sounds.post("menu")
                 
-    def update(self, dt):
+    def update(self):
+        # One fixed simulation tick
         if self.state != STATE_PLAYING:
             return
-            
-        self.move_timer += dt
-        
-        if self.move_timer >= self.move_delay:
-            self.move_timer = 0
-            
-            # Move snake
-            head = self.snake.move()
-            
-            # Check if snake left screen
-            if head is None:
+
+        if self.engine.move_due:
+            if self.autopilot_on:
+                turned = self.autopilot.steer()
+            else:
+                direction = self.turns.pop(time.perf_counter())
+                turned = direction is not None and self.engine.turn(direction)
+            if turned:
+                self.recorder.record(self.engine)
+
+        for event in self.engine.tick():
+            kind = event[0]
+            if kind == EVENT_SOUND:
+                self.sounds.post(event[1])
+            elif kind == EVENT_PARTICLES:
+                self.spawn_particles(event[1], event[2])
+            elif kind == EVENT_GAME_OVER:
                 self.state = STATE_GAME_OVER
-                death_sound.play()
                 if self.score > self.high_score:
                     self.high_score = self.score
-                return
-            
-            # Check food collision
-            if head == self.food.position:
-                if self.food.type == "apple":
-                    self.snake.grow()
-                    self.score += 10
-                    eat_sound.play()
-                elif self.food.type == "golden":
-                    self.snake.grow(3)
-                    self.score += 50
-                    level_up_sound.play()
-                    self.snake.rainbow_mode = True
-                    # Add particles
-                    for _ in range(20):
-                        self.particle_effects.append({
-                            'pos': [head[0] * CELL_SIZE + CELL_SIZE // 2, 
-                                   head[1] * CELL_SIZE + CELL_SIZE // 2],
-                            'vel': [random.uniform(-5, 5), random.uniform(-5, 5)],
-                            'color': random.choice([YELLOW, CYAN, PURPLE, GREEN]),
-                            'life': 1.0
-                        })
-                elif self.food.type == "speed":
-                    self.score += 25
-                    self.speed_boost_timer = 300  # 5 seconds of boost
-                    menu_sound.play()
-                    # Blue particles for speed
-                    for _ in range(15):
-                        self.particle_effects.append({
-                            'pos': [head[0] * CELL_SIZE + CELL_SIZE // 2, 
-                                   head[1] * CELL_SIZE + CELL_SIZE // 2],
-                            'vel': [random.uniform(-8, 8), random.uniform(-8, 8)],
-                            'color': CYAN,
-                            'life': 1.0
-                        })
-                elif self.food.type == "ghost":
-                    self.score += 30
-                    self.ghost_mode_timer = 180  # 3 seconds of ghost mode
-                    select_sound.play()
-                    # White particles for ghost
-                    for _ in range(10):
-                        self.particle_effects.append({
-                            'pos': [head[0] * CELL_SIZE + CELL_SIZE // 2, 
-                                   head[1] * CELL_SIZE + CELL_SIZE // 2],
-                            'vel': [random.uniform(-3, 3), random.uniform(-3, 3)],
-                            'color': WHITE,
-                            'life': 1.5
-                        })
-                elif self.food.type == "bomb":
-                    # Bomb hurts! Lose score and length
-                    self.score = max(0, self.score - 20)
-                    death_sound.play()
-                    # Remove snake segments if possible
-                    if len(self.snake.positions) > 3:
-                        self.snake.positions = self.snake.positions[:len(self.snake.positions)//2]
-                    # Red explosion particles
-                    for _ in range(30):
-                        self.particle_effects.append({
-                            'pos': [head[0] * CELL_SIZE + CELL_SIZE // 2, 
-                                   head[1] * CELL_SIZE + CELL_SIZE // 2],
-                            'vel': [random.uniform(-10, 10), random.uniform(-10, 10)],
-                            'color': RED,
-                            'life': 0.8
-                        })
-                    
-                self.food.spawn()
-                
-                # Spawn food away from snake
-                while self.food.position in self.snake.positions:
-                    self.food.spawn()
-                    
-                # Speed up game (except for bombs)
-                if self.food.type != "bomb":
-                    self.move_delay = max(50, self.move_delay - 2)
+                self.save_replay()
+
+        # The engine stops at a wall before the tick's timers and particles
+        if self.engine.game_over and self.engine.death_cause == DEATH_WALL:
+            return
+
+        started = self.profiler.start()
+        self.particles.update()
+        self.profiler.end(PHASE_PARTICLES, started)
                 
-            # Check self collision (unless in ghost mode)
-            if self.ghost_mode_timer <= 0 and self.snake.check_collision():
+    def poll_remote(self):
+        # Once a frame while connected: apply what the server sent. Our own
+        # snake's changes make the sounds and end the game when it dies;
+        # the server respawns it, and Y picks up with the new one.
+        from snake_server import DIED, MOVED, SPAWNED  # Loaded by connect()
+
+        try:
+            changes = self.remote.poll()
+        except (ConnectionError, ValueError) as error:
+            print(f"disconnected: {error}")
+            self.disconnect()
+            self.state = STATE_MENU
+            return
+        if self.state != STATE_PLAYING:
+            return
+        player = self.remote.me
+        self.remote_score = player.score if player is not None else 0
+        self.high_score = max(self.high_score, self.remote_score)
+        for player_id, flags, score in changes:
+            if player_id != self.remote.player_id:
+                continue
+            if flags & MOVED:
+                self.sounds.post("move")
+            if score and not flags & SPAWNED:  # A respawn starts the score over
+                self.sounds.post(SCORE_SOUNDS.get(score, "death" if score < 0 else "eat"))
+            if flags & DIED:
+                self.sounds.post("death")
                 self.state = STATE_GAME_OVER
-                death_sound.play()
-                if self.score > self.high_score:
-                    self.high_score = self.score
-                    
-        # Update food timer
-        if self.food.update():
-            self.food.spawn()
-            while self.food.position in self.snake.positions:
-                self.food.spawn()
-                
-        # Update power-up timers
-        if self.speed_boost_timer > 0:
-            self.speed_boost_timer -= 1
-            # Temporarily increase speed
-            if self.move_timer >= self.move_delay * 0.5:  # Double speed
-                self.move_timer = self.move_delay * 0.5
-                
-        if self.ghost_mode_timer > 0:
-            self.ghost_mode_timer -= 1
-                    
-        # Update particles
-        for particle in self.particle_effects[:]:
-            particle['pos'][0] += particle['vel'][0]
-            particle['pos'][1] += particle['vel'][1]
-            particle['vel'][1] += 0.5  # gravity
-            particle['life'] -= 0.02
-            if particle['life'] <= 0:
-                self.particle_effects.remove(particle)
-                
+
+    def connect(self):
+        # Joins the room on the first game; False if the server can't be reached
+        if self.remote is not None:
+            return True
+        import snake_server  # asyncio and friends, only for online play
+
+        host, port = self.server
+        try:
+            self.remote = snake_server.RoomClient(host, port, self.room)
+        except (OSError, ValueError) as error:
+            print(f"can't join {host}:{port}: {error}")
+            return False
+        grid_size = self.remote.view.grid_size
+        if grid_size != self.grid_size:
+            # The room's board, not --grid
+            self.grid_size = grid_size
+            self.cell_size = cell_size_for(grid_size)
+            self.renderer = BoardRenderer(self.screen, grid_size, self.cell_size, self.font,
+                                          self.text)
+        return True
+
+    def disconnect(self):
+        if self.remote is not None:
+            self.remote.close()
+            self.remote = None
+
+    def save_replay(self):
+        # Keep the finished game; SNAKE_REPLAY_DIR also writes it to disk
+        self.last_replay = self.recorder.finish(self.engine)
+        directory = os.environ.get("SNAKE_REPLAY_DIR")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.engine.seed}.snkr"
+            self.last_replay.save(os.path.join(directory, name))
+
+    def spawn_particles(self, food_type, cell):
+        count, speed, colors, life = PARTICLE_BURSTS[food_type]
+        size = self.cell_size
+        self.particles.emit(cell[0] * size + size // 2, cell[1] * size + size // 2,
+                            count, speed, colors, life)
+
     def draw_menu(self):
         self.screen.fill(BLACK)
         
         # Title
-        title_text = self.title_font.render("SNAKE", True, GREEN)
+        title_text = self.text.render(self.title_font, "SNAKE", GREEN)
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
         self.screen.blit(title_text, title_rect)
         
         # Subtitle
-        subtitle_text = self.font.render("ATARI VIBES", True, CYAN)
+        subtitle_text = self.text.render(self.font, "ATARI VIBES", CYAN)
         subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 220))
         self.screen.blit(subtitle_text, subtitle_rect)
         
@@ -352,243 +309,304 @@ class Game:
         start_color = YELLOW if self.menu_selection == 0 else WHITE
         quit_color = YELLOW if self.menu_selection == 1 else WHITE
         
-        start_text = self.big_font.render("START", True, start_color)
+        start_text = self.text.render(self.big_font, "START", start_color)
         start_rect = start_text.get_rect(center=(WINDOW_WIDTH // 2, 350))
         self.screen.blit(start_text, start_rect)
         
-        quit_text = self.big_font.render("QUIT", True, quit_color)
+        quit_text = self.text.render(self.big_font, "QUIT", quit_color)
         quit_rect = quit_text.get_rect(center=(WINDOW_WIDTH // 2, 450))
         self.screen.blit(quit_text, quit_rect)
         
         # Instructions
-        inst_text = self.font.render("Use ARROWS/WASD to select, ENTER to confirm", True, WHITE)
+        inst_text = self.text.render(self.font, "Use ARROWS/WASD to select, ENTER to confirm", WHITE)
         inst_rect = inst_text.get_rect(center=(WINDOW_WIDTH // 2, 550))
         self.screen.blit(inst_text, inst_rect)
         
         # High score
         if self.high_score > 0:
-            hs_text = self.font.render(f"HIGH SCORE: {self.high_score}", True, PURPLE)
+            hs_text = self.text.render(self.font, f"HIGH SCORE: {self.high_score}", PURPLE)
             hs_rect = hs_text.get_rect(center=(WINDOW_WIDTH // 2, 280))
             self.screen.blit(hs_text, hs_rect)
                 
-    def draw_game(self):
-        self.screen.fill(BLACK)
-        
-        # Draw border
-        pygame.draw.rect(self.screen, RED, (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT), 3)
-        
-        # Draw grid lines (subtle)
-        for x in range(0, WINDOW_WIDTH, CELL_SIZE):
-            pygame.draw.line(self.screen, (20, 20, 20), (x, 0), (x, WINDOW_HEIGHT))
-        for y in range(0, WINDOW_HEIGHT, CELL_SIZE):
-            pygame.draw.line(self.screen, (20, 20, 20), (0, y), (WINDOW_WIDTH, y))
-        
-        # Draw snake
-        for i, pos in enumerate(self.snake.positions):
-            rect = pygame.Rect(pos[0] * CELL_SIZE, pos[1] * CELL_SIZE, 
-                              CELL_SIZE - 2, CELL_SIZE - 2)
-            
-            # Ghost mode makes snake translucent
-            if self.ghost_mode_timer > 0:
-                ghost_surf = pygame.Surface((CELL_SIZE - 2, CELL_SIZE - 2), pygame.SRCALPHA)
-                alpha = 100 + int(155 * abs(math.sin(pygame.time.get_ticks() * 0.01)))
-                
-            if self.snake.rainbow_mode:
-                # Rainbow effect
-                hue = (i * 20 + pygame.time.get_ticks() / 10) % 360
-                color = pygame.Color(0)
-                color.hsla = (hue, 100, 50, 100)
-            else:
-                # Gradient from head to tail
-                color = GREEN if i == 0 else DARK_GREEN
-                
-            if self.ghost_mode_timer > 0:
-                ghost_surf.fill((*color[:3], alpha))
-                self.screen.blit(ghost_surf, rect)
-            else:
-                pygame.draw.rect(self.screen, color, rect)
-            
-            # Draw eyes on head
-            if i == 0:
-                eye_size = CELL_SIZE // 5
-                eye_color = WHITE if self.ghost_mode_timer <= 0 else (*WHITE, alpha)
-                if self.snake.direction == (1, 0):  # Right
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.right - eye_size, rect.top + eye_size), eye_size // 2)
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.right - eye_size, rect.bottom - eye_size), eye_size // 2)
-                elif self.snake.direction == (-1, 0):  # Left
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.left + eye_size, rect.top + eye_size), eye_size // 2)
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.left + eye_size, rect.bottom - eye_size), eye_size // 2)
-                elif self.snake.direction == (0, -1):  # Up
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.left + eye_size, rect.top + eye_size), eye_size // 2)
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.right - eye_size, rect.top + eye_size), eye_size // 2)
-                else:  # Down
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.left + eye_size, rect.bottom - eye_size), eye_size // 2)
-                    pygame.draw.circle(self.screen, eye_color, 
-                                     (rect.right - eye_size, rect.bottom - eye_size), eye_size // 2)
-        
-        # Draw food
-        food_rect = pygame.Rect(self.food.position[0] * CELL_SIZE, 
-                               self.food.position[1] * CELL_SIZE,
-                               CELL_SIZE - 2, CELL_SIZE - 2)
-        
-        if self.food.type == "apple":
-            # Normal red apple
-            pygame.draw.rect(self.screen, RED, food_rect)
-        elif self.food.type == "golden":
-            # Pulsing golden apple
-            pulse = abs(math.sin(pygame.time.get_ticks() * 0.005))
-            size = int(CELL_SIZE - 2 - pulse * 10)
-            offset = (CELL_SIZE - size) // 2
-            food_rect = pygame.Rect(self.food.position[0] * CELL_SIZE + offset,
-                                   self.food.position[1] * CELL_SIZE + offset,
-                                   size, size)
-            pygame.draw.rect(self.screen, YELLOW, food_rect)
-            pygame.draw.rect(self.screen, PURPLE, food_rect, 3)
-        elif self.food.type == "speed":
-            # Blue lightning bolt shape for speed
-            pygame.draw.rect(self.screen, CYAN, food_rect)
-            # Draw lightning bolt
-            bolt_points = [
-                (food_rect.centerx - 5, food_rect.top + 5),
-                (food_rect.centerx + 2, food_rect.centery - 2),
-                (food_rect.centerx - 2, food_rect.centery + 2),
-                (food_rect.centerx + 5, food_rect.bottom - 5)
-            ]
-            pygame.draw.lines(self.screen, WHITE, False, bolt_points, 3)
-        elif self.food.type == "ghost":
-            # White ghost shape with fade effect
-            fade = abs(math.sin(pygame.time.get_ticks() * 0.01)) * 0.5 + 0.5
-            ghost_surf = pygame.Surface((CELL_SIZE - 2, CELL_SIZE - 2), pygame.SRCALPHA)
-            alpha = int(255 * fade)
-            pygame.draw.circle(ghost_surf, (*WHITE, alpha), 
-                             ((CELL_SIZE - 2) // 2, (CELL_SIZE - 2) // 2), 
-                             (CELL_SIZE - 2) // 2)
-            self.screen.blit(ghost_surf, food_rect)
-        elif self.food.type == "bomb":
-            # Red bomb with fuse
-            pygame.draw.circle(self.screen, (80, 0, 0), food_rect.center, CELL_SIZE // 2 - 2)
-            pygame.draw.circle(self.screen, RED, food_rect.center, CELL_SIZE // 2 - 2, 2)
-            # Sparking fuse
-            if self.food.timer % 10 < 5:
-                spark_pos = (food_rect.centerx + CELL_SIZE // 3, food_rect.top)
-                pygame.draw.circle(self.screen, YELLOW, spark_pos, 3)
-                pygame.draw.circle(self.screen, ORANGE, spark_pos, 2)
-            
-        # Draw timer bar for expiring foods
-        if self.food.lifespan > 0:
-            time_left = (self.food.lifespan - self.food.timer) / self.food.lifespan
-            bar_width = int(CELL_SIZE * time_left)
-            bar_rect = pygame.Rect(self.food.position[0] * CELL_SIZE,
-                                  self.food.position[1] * CELL_SIZE - 5,
-                                  bar_width, 3)
-            bar_color = GREEN if time_left > 0.5 else YELLOW if time_left > 0.25 else RED
-            pygame.draw.rect(self.screen, bar_color, bar_rect)
-            
-        # Draw particles
-        for particle in self.particle_effects:
-            alpha = int(particle['life'] * 255)
-            size = int(particle['life'] * 10)
-            if size > 0:
-                surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(surf, (*particle['color'], alpha), (size, size), size)
-                self.screen.blit(surf, (particle['pos'][0] - size, particle['pos'][1] - size))
-        
-        # Draw score
-        score_text = self.font.render(f"SCORE: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
-        
-        high_score_text = self.font.render(f"HIGH: {self.high_score}", True, CYAN)
-        self.screen.blit(high_score_text, (10, 50))
-        
-        # Draw active power-ups
+    def draw_game(self, interp=0.0):
+        # Returns dirty rects for display.update, or None if a flip is needed
+        hud = [
+            (f"SCORE: {self.score}", WHITE, (10, 10)),
+            (f"HIGH: {self.high_score}", CYAN, (10, 50)),
+        ]
+
+        # Active power-ups
         y_offset = 90
         if self.speed_boost_timer > 0:
-            speed_text = self.font.render(f"SPEED: {self.speed_boost_timer // 60 + 1}s", True, CYAN)
-            self.screen.blit(speed_text, (10, y_offset))
+            hud.append((f"SPEED: {self.speed_boost_timer // 60 + 1}s", CYAN, (10, y_offset)))
             y_offset += 30
-            
+
         if self.ghost_mode_timer > 0:
-            ghost_text = self.font.render(f"GHOST: {self.ghost_mode_timer // 60 + 1}s", True, WHITE)
-            self.screen.blit(ghost_text, (10, y_offset))
-        
+            hud.append((f"GHOST: {self.ghost_mode_timer // 60 + 1}s", WHITE, (10, y_offset)))
+            y_offset += 30
+
+        if self.autopilot_on:
+            hud.append(("AUTOPILOT", YELLOW, (10, y_offset)))
+
+        if self.remote is not None:
+            view = self.remote.view
+            hud.append((f"ROOM {self.remote.room}: {len(view.players)} PLAYERS", WHITE,
+                        (10, y_offset)))
+
+        if self.profiler.enabled:
+            hud.extend((line, YELLOW, (WINDOW_WIDTH - 300, 10 + i * 30))
+                       for i, line in enumerate(self.overlay_lines))
+
+        if self.remote is not None:
+            return self.renderer.draw_room(view.players, view.foods, self.remote.player_id, hud)
+
+        return self.renderer.draw(self.snake, self.food, self.particles, hud,
+                                  ghost=self.ghost_mode_timer > 0, interp=interp)
+
     def draw_game_over(self):
-        self.draw_game()  # Draw the game state underneath
-        
+        # Composed once and kept, then each frame is a copy of that plus the
+        # blinking cursor. A board that animates, a room still playing
+        # online or the profiler's lines under the overlay recompose it.
+        if (not self.game_over_cached or not self.game_over_still()
+                or self.profiler.enabled):
+            self.compose_game_over()
+        else:
+            self.screen.blit(self.game_over_frame, (0, 0))
+
+        # Blinking cursor
+        if pygame.time.get_ticks() % (2 * BLINK_MS) < BLINK_MS:
+            cursor_text = self.text.render(self.font, "_", WHITE)
+            cursor_rect = cursor_text.get_rect(left=self.prompt_rect.right + 10,
+                                               centery=self.prompt_rect.centery)
+            self.screen.blit(cursor_text, cursor_rect)
+
+    def compose_game_over(self):
+        # Draw the game state underneath; the overlay spoils any dirty rects
+        self.renderer.invalidate()
+        self.draw_game()
+
         # Dark overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
-        
+        self.screen.blit(self.dim, (0, 0))
+
         # Game over text
-        game_over_text = self.big_font.render("GAME OVER", True, RED)
+        if self.remote is None and self.engine.death_cause == BOARD_FULL:
+            game_over_text = self.text.render(self.big_font, "YOU WIN!", YELLOW)
+        else:
+            game_over_text = self.text.render(self.big_font, "GAME OVER", RED)
         text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 50))
         pygame.draw.rect(self.screen, BLACK, text_rect.inflate(20, 20))
         pygame.draw.rect(self.screen, RED, text_rect.inflate(20, 20), 3)
         self.screen.blit(game_over_text, text_rect)
-        
+
         # Score
-        score_text = self.font.render(f"FINAL SCORE: {self.score}", True, YELLOW)
+        score_text = self.text.render(self.font, f"FINAL SCORE: {self.score}", YELLOW)
         score_rect = score_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 20))
         self.screen.blit(score_text, score_rect)
-        
+
         # Y/N prompt
-        prompt_text = self.font.render("Play again? Y/N", True, WHITE)
-        prompt_rect = prompt_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80))
-        self.screen.blit(prompt_text, prompt_rect)
-        
-        # Blinking cursor
-        if pygame.time.get_ticks() % 1000 < 500:
-            cursor_text = self.font.render("_", True, WHITE)
-            cursor_rect = cursor_text.get_rect(left=prompt_rect.right + 10, centery=prompt_rect.centery)
-            self.screen.blit(cursor_text, cursor_rect)
-            
+        prompt_text = self.text.render(self.font, "Play again? Y/N", WHITE)
+        self.prompt_rect = prompt_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80))
+        self.screen.blit(prompt_text, self.prompt_rect)
+
+        self.game_over_frame.blit(self.screen, (0, 0))
+        self.game_over_cached = True
+
+    def game_over_still(self):
+        # True if only the cursor moves on the game over screen: offline,
+        # with no pulsing or fading food and no ghost or rainbow snake
+        food = self.food
+        return (self.remote is None and not self.ghost_mode_timer and not self.snake.rainbow_mode
+                and (food.position is None or food.type not in ("golden", "ghost")))
+
+    def idle(self):
+        # Screens that change only on input or a timer
+        return self.on_demand and (self.state == STATE_MENU or
+                                   self.state == STATE_GAME_OVER and self.game_over_still())
+
+    def next_redraw(self):
+        # When the idle screen next changes by itself, in pygame ticks:
+        # the cursor blinks and the profiler overlay refreshes. None if
+        # only input changes it.
+        due = None
+        if self.state == STATE_GAME_OVER:
+            now = pygame.time.get_ticks()
+            due = now - now % BLINK_MS + BLINK_MS
+        if self.profiler.enabled:
+            due = self.overlay_refresh if due is None else min(due, self.overlay_refresh)
+        return due
+
+    def redraw_due(self):
+        if self.state != self.drawn_state or self.redraw_at == 0:
+            return True
+        return self.redraw_at is not None and pygame.time.get_ticks() >= self.redraw_at
+
+    def wait_for_event(self):
+        # Sleep until input or the idle screen's next redraw; returns the
+        # event that woke us, or None at the deadline
+        if self.redraw_due():
+            return None
+        if self.redraw_at is None:
+            event = pygame.event.wait()
+        else:
+            # A timeout of 0 would wait for good
+            event = pygame.event.wait(max(1, self.redraw_at - pygame.time.get_ticks()))
+        return None if event.type == pygame.NOEVENT else event
+
+    def update_overlay(self):
+        # Refreshed twice a second so the numbers can be read
+        now = pygame.time.get_ticks()
+        if now >= self.overlay_refresh:
+            self.overlay_lines = self.profiler.overlay_lines()
+            self.state_cpu.enter(self.state)  # Up to date for the line below
+            self.overlay_lines.append(f"CPU {self.state_cpu.usage(self.state) * 100:.1f}%")
+            if self.turns.latencies:
+                self.overlay_lines.append(f"INPUT p50 {self.turns.latency(0.5) * 1000:.0f} "
+                                          f"p99 {self.turns.latency(0.99) * 1000:.0f} ms")
+            self.overlay_refresh = now + 500
+
+    def draw_overlay(self):
+        # Over the full-screen states; draw_game puts it in its HUD instead
+        for i, line in enumerate(self.overlay_lines):
+            self.screen.blit(self.text.render(self.font, line, YELLOW),
+                             (WINDOW_WIDTH - 300, 10 + i * 30))
+
+    def export_trace(self):
+        path = os.environ.get("SNAKE_TRACE", "snake-trace.json")
+        print(f"trace written to {self.profiler.export(path)}")
+
     def reset_game(self):
-        self.snake.reset()
-        self.food.spawn()
-        self.score = 0
-        self.move_delay = 100
-        self.particle_effects = []
-        self.speed_boost_timer = 0
-        self.ghost_mode_timer = 0
+        self.sounds.wait()  # Every sound is ready before the first tick
+        if self.server is not None and not self.connect():
+            self.state = STATE_MENU
+            return
+        self.engine.reset()
+        self.recorder.start(self.engine)
+        self.particles.clear()
+        self.turns.clear()
+        self.game_over_cached = False
+        self.renderer.reset()
+        self.timestep.reset()
         
     def run(self):
         running = True
+        profiler = self.profiler
         
         while running:
+            self.state_cpu.enter(self.state)
+            idle = self.idle()
+            woken = None
+            if idle:
+                woken = self.wait_for_event()
+                profiler.pause()  # Asleep on purpose, not a dropped frame
             dt = self.clock.tick(FPS)
+            profiler.begin_frame()
             
-            for event in pygame.event.get():
+            started = profiler.start()
+            events = pygame.event.get()
+            if woken is not None:
+                events.insert(0, woken)
+            profiler.end(PHASE_EVENTS, started)
+            for event in events:
+                if event.type != pygame.MOUSEMOTION:
+                    self.redraw_at = 0  # Anything else may change an idle screen
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    self.overlay_refresh = 0
+                    self.game_over_cached = False
+                    self.renderer.invalidate()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    self.export_trace()
                 elif self.state == STATE_MENU:
                     running = self.handle_menu_input(event)
                 elif self.state == STATE_GAME_OVER:
                     self.handle_game_over_input(event)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_p and self.remote is None:
+                    self.autopilot_on = not self.autopilot_on
+                    self.turns.clear()
+                else:
+                    started = profiler.start()
+                    self.handle_game_input(event)
+                    profiler.end(PHASE_INPUT, started)
                     
-            if self.state == STATE_PLAYING:
-                self.handle_game_input()
-                self.update(dt)
+            started = profiler.start()
+            if self.remote is not None:
+                # The server ticks the room; keep reading it on every
+                # screen so the view is current and the socket drains
+                self.poll_remote()
+            elif self.state == STATE_PLAYING:
+                # Run as many fixed ticks as the frame took, so game speed
+                # doesn't depend on the frame rate. Time asleep on an idle
+                # screen isn't game time.
+                for _ in range(self.timestep.advance(0 if idle else dt)):
+                    self.update()
+            profiler.end(PHASE_UPDATE, started)
+            # Start the frame's sounds; game logic only queued them
+            started = profiler.start()
+            self.sounds.pump()
+            profiler.end(PHASE_AUDIO, started)
+            if profiler.enabled:
+                self.update_overlay()
+
+            if self.idle() and not self.redraw_due():
+                profiler.end_frame()
+                continue  # Woken by something that didn't change the screen
                 
             # Draw based on state
+            dirty_rects = None
+            started = profiler.start()
             if self.state == STATE_MENU:
                 self.draw_menu()
+                phase = PHASE_DRAW_MENU
             elif self.state == STATE_PLAYING:
-                self.draw_game()
+                dirty_rects = self.draw_game(self.timestep.alpha)
+                phase = PHASE_DRAW_GAME
             elif self.state == STATE_GAME_OVER:
                 self.draw_game_over()
+                phase = PHASE_DRAW_GAME_OVER
+            if profiler.enabled and dirty_rects is None:
+                self.draw_overlay()
+            profiler.end(phase, started)
             
-            pygame.display.flip()
+            started = profiler.start()
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            profiler.end(PHASE_PRESENT, started)
+            self.drawn_state = self.state
+            if self.idle():
+                self.redraw_at = self.next_redraw()
+            profiler.end_frame()
             
+        self.disconnect()
+        if profiler.enabled:
+            self.state_cpu.enter(None)
+            for line in self.state_cpu.lines():
+                print(line)
         pygame.quit()
 
 if __name__ == "__main__":
-    game = Game()
+    # `tournament [options]` runs scripted policies headless instead
+    if sys.argv[1:2] == ["tournament"]:
+        import snake_tournament
+        sys.exit(snake_tournament.main(sys.argv[2:]))
+    parser = argparse.ArgumentParser(description="Snake, Atari style")
+    parser.add_argument("--grid", type=int, default=GRID_SIZE,
+                        help=f"board size in cells, up to {MAX_GRID_SIZE}")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="play online in a snake_server room")
+    parser.add_argument("--room", type=int, default=0,
+                        help="room to join with --connect (default: any with space)")
+    args = parser.parse_args()
+    if not 4 <= args.grid <= MAX_GRID_SIZE:
+        parser.error(f"--grid must be between 4 and {MAX_GRID_SIZE}")
+    server = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        if not host or not port.isdigit():
+            parser.error("--connect must be HOST:PORT")
+        server = (host, int(port))
+    game = Game(args.grid, server, args.room)
     game.run()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from snake_audio import QUEUE_LIMIT, AudioManager, SoundBank  # noqa: E402
+
+# Sound requests during a speed-boosted burst: two move ticks a frame, a
+# pickup every few frames, then the death cue. Posting to the AudioManager
+# against calling Sound.play from the tick, for the cost on the simulation
+# path and for whether the death cue still gets a channel.
+
+FRAMES = 600
+FRAME_SECONDS = 1 / 60
+
+
+def burst(frame):
+    names = ["move", "move"]
+    if frame % 6 == 0:
+        names.append("eat")
+    if frame % 60 == 0:
+        names.append("level_up")
+    return names
+
+
+def per_call_us(fn, number=20_000):
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def post_us(manager, number=20_000):
+    # One post, with the queue emptied every QUEUE_LIMIT of them as a
+    # pump would
+    start = time.perf_counter()
+    for _ in range(number // QUEUE_LIMIT):
+        for _ in range(QUEUE_LIMIT):
+            manager.post("move")
+        manager.clear()
+    return (time.perf_counter() - start) / (number // QUEUE_LIMIT * QUEUE_LIMIT) * 1e6
+
+
+def main():
+    pygame.mixer.pre_init(buffer=512)
+    pygame.init()
+    bank = SoundBank()
+    if not bank.load() or not bank.wait(10):
+        print("no audio: the mixer didn't open in stereo")
+        return 1
+    sounds = bank.sounds
+
+    # Direct play: every event reaches the mixer from inside the tick
+    pygame.mixer.stop()
+    calls = lost = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        for name in burst(frame):
+            calls += 1
+            lost += sounds[name].play() is None
+    direct_us = (time.perf_counter() - start) / calls * 1e6
+    death_direct = sounds["death"].play() is not None
+
+    # Managed: the tick only posts; one pump a frame on a 60 FPS clock
+    pygame.mixer.stop()
+    clock = [0.0]
+    manager = AudioManager(bank, clock=lambda: clock[0])
+    pump_time = 0.0
+    for frame in range(FRAMES):
+        for name in burst(frame):
+            manager.post(name)
+        start = time.perf_counter()
+        manager.pump()
+        pump_time += time.perf_counter() - start
+        clock[0] += FRAME_SECONDS
+    manager.post("death")
+    manager.pump()
+    death_managed = manager._channels["alert"][0].get_busy()
+    counts = (f"{manager.played} played, {manager.limited} rate limited, "
+              f"{manager.stolen} stolen, {manager.dropped} dropped")
+    manager.clear()
+    posted = post_us(manager)
+    for _ in range(QUEUE_LIMIT):
+        manager.post("move")
+    full = per_call_us(lambda: manager.post("move"))  # Each one dropped
+
+    print(f"{calls} sound events over {FRAMES} frames")
+    print(f"  direct Sound.play: {direct_us:6.2f} us per event, {lost} found no channel, "
+          f"death cue played: {death_direct}")
+    print(f"  AudioManager:      {posted:6.2f} us per post ({full:.2f} to a full queue), "
+          f"{pump_time / FRAMES * 1e6:.2f} us per pump")
+    print(f"                     {counts}, death cue played: {death_managed}")
+    manager.clear()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
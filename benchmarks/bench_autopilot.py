@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import hamiltonian_turns  # noqa: E402
+from snake_autopilot import Autopilot  # noqa: E402
+from snake_engine import Engine  # noqa: E402
+
+FRAME_BUDGET_US = 1_000_000 / 60
+
+
+class FromScratch(Autopilot):
+    # Rebuilds the distance field before every plan, for comparison
+    def _sync(self):
+        self._moves = -1
+        super()._sync()
+
+
+def setup(grid_size, length, seed=1):
+    # A snake of `length` laid along a Hamiltonian cycle, food on a free cell
+    engine = Engine(grid_size)
+    engine.reset(seed)
+    snake = engine.snake
+    turns = hamiltonian_turns(grid_size)
+    snake.grow(length - 1)
+    while snake.grow_count:
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+    snake.direction = turns[snake.body[0]]
+    engine.food.spawn(snake.free)
+    return engine
+
+
+def plan_cost(pilot_class, grid_size, length, moves):
+    # Per-move planning time in microseconds (median, p99) and moves made
+    engine = setup(grid_size, length)
+    pilot = pilot_class(engine)
+    times = []
+    while len(times) < moves and not engine.game_over:
+        if engine.move_due:
+            start = time.perf_counter()
+            direction = pilot.decide()
+            times.append(time.perf_counter() - start)
+            if direction is not None:
+                engine.turn(direction)
+        engine.tick()
+    times.sort()
+    return (times[len(times) // 2] * 1e6, times[int(len(times) * 0.99)] * 1e6, len(times))
+
+
+def cached_cost(grid_size, length, calls=10_000):
+    # decide() on a tick with no move in between: just the cache check
+    engine = setup(grid_size, length)
+    pilot = Autopilot(engine)
+    pilot.decide()
+    start = time.perf_counter()
+    for _ in range(calls):
+        pilot.decide()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(moves=300):
+    print("autopilot planning cost per move, microseconds (median / p99)")
+    print(f"{'grid':>6} {'length':>8}   {'incremental':>18}   {'from scratch':>18}")
+    for grid_size in (20, 50, 100, 200):
+        for length in (1, grid_size, grid_size * grid_size // 8):
+            inc = plan_cost(Autopilot, grid_size, length, moves)
+            full = plan_cost(FromScratch, grid_size, length, moves)
+            status = "ok" if inc[1] <= FRAME_BUDGET_US else "over a frame"
+            print(f"{grid_size:>6} {length:>8}   {inc[0]:>8.1f} / {inc[1]:>8.1f}   "
+                  f"{full[0]:>8.1f} / {full[1]:>8.1f}   ({inc[2]} moves, {status})")
+    print(f"cached decide() between moves: {cached_cost(200, 200):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_batch import CAUSES, FOOD_TYPES, NO_ACTION, BatchEngine  # noqa: E402
+from snake_engine import DIRECTIONS, Engine  # noqa: E402
+
+# Toward the food: right, left, down, up as DIRECTIONS indices
+_CHASE = np.array([DIRECTIONS.index(d) for d in ((1, 0), (-1, 0), (0, 1), (0, -1))],
+                  dtype=np.int32)
+
+
+def run(num_boards, steps, grid_size=20, seed=1):
+    rng = np.random.default_rng(seed)
+    # Mostly-straight random policy, pregenerated so only stepping is timed
+    actions = rng.integers(0, 4, (64, num_boards), dtype=np.int32)
+    actions[rng.random(actions.shape) > 0.2] = NO_ACTION
+    batch = BatchEngine(num_boards, grid_size, seed=seed)
+    # Warm up so first-touch page faults on the state arrays are not timed
+    for i in range(20):
+        batch.step(actions[i & 63])
+
+    start = time.perf_counter()
+    for i in range(steps):
+        batch.step(actions[i & 63])
+    elapsed = time.perf_counter() - start
+    return num_boards * steps / elapsed, int(batch.episodes.sum())
+
+
+def chase(num_boards, steps, grid_size, seed=1):
+    # Every snake heads straight for its food, so boards eat and respawn
+    # food often; the policy is computed outside the timed step
+    batch = BatchEngine(num_boards, grid_size, seed=seed)
+    rows = np.arange(num_boards)
+    elapsed = 0.0
+    eaten = 0
+    for _ in range(steps):
+        head = batch.body[rows, batch.head_ptr]
+        dx = batch.food_pos % grid_size - head % grid_size
+        dy = batch.food_pos // grid_size - head // grid_size
+        actions = _CHASE[np.where(dx > 0, 0, np.where(dx < 0, 1, np.where(dy > 0, 2, 3)))]
+        start = time.perf_counter()
+        batch.step(actions)
+        elapsed += time.perf_counter() - start
+        eaten += int((batch.eaten >= 0).sum())
+    return num_boards * steps / elapsed, eaten
+
+
+def _seek(engine, rng):
+    # Toward the food without leaving the board, so snakes grow long enough
+    # to eat every food type and run into themselves; now and then any
+    # direction that stays on the board, reversals included
+    (x, y), (fx, fy) = engine.snake.positions[0], engine.food.position
+    size = engine.grid_size
+    moves = [(abs(x + dx - fx) + abs(y + dy - fy), rng.random(), index)
+             for index, (dx, dy) in enumerate(DIRECTIONS)
+             if 0 <= x + dx < size and 0 <= y + dy < size]
+    if rng.random() < 0.2:
+        return rng.choice(moves)[2]
+    dx, dy = engine.snake.direction
+    ahead = [move for move in moves if DIRECTIONS[move[2]] != (-dx, -dy)]
+    return min(ahead)[2] if ahead else NO_ACTION
+
+
+def check(episodes=300, grid_size=8, seed=0):
+    # One batch board against Engine.step on the same actions: the same
+    # body, score, timers and effects after every step, and the same death,
+    # cause and final score when an episode ends. The two draw food from
+    # different generators, so the engine's food is set to the batch's
+    # after each step. Returns a description of each mismatch.
+    rng = random.Random(seed)
+    batch = BatchEngine(1, grid_size, seed=seed)
+    engine = Engine(grid_size)
+    mismatches = []
+
+    def sync_food():
+        cell = int(batch.food_pos[0])
+        food = engine.food
+        food.position = (cell % grid_size, cell // grid_size)
+        food.type = FOOD_TYPES[batch.food_type[0]]
+        food.lifespan = int(batch.food_lifespan[0])
+        food.timer = int(batch.food_timer[0])
+
+    engine.reset()
+    sync_food()
+    while batch.episodes[0] < episodes:
+        action = _seek(engine, rng)
+        engine.step(None if action == NO_ACTION else DIRECTIONS[action])
+        batch.step([action])
+        if batch.done[0] or engine.game_over:
+            expected = (engine.game_over, engine.death_cause, engine.score,
+                        len(engine.snake.body))
+            got = (bool(batch.done[0]), CAUSES[batch.death_cause[0]], int(batch.final_score[0]),
+                   int(batch.final_length[0]))
+        else:
+            expected = (list(engine.snake.positions), engine.score, engine.snake.grow_count,
+                        engine.snake.rainbow_mode, engine.speed_boost_timer,
+                        engine.ghost_mode_timer)
+            got = (batch.positions(0), int(batch.score[0]), int(batch.grow_count[0]),
+                   bool(batch.rainbow_mode[0]), int(batch.speed_boost_timer[0]),
+                   int(batch.ghost_mode_timer[0]))
+        if expected != got:
+            mismatches.append(f"episode {batch.episodes[0]}: engine {expected}, batch {got}")
+            if not batch.done[0]:
+                batch.reset([0])
+        if batch.done[0] or engine.game_over or expected != got:
+            engine.reset()
+        sync_food()
+    return mismatches
+
+
+def main(steps=200):
+    for grid_size in (20, 50):
+        for num_boards in (1_000, 10_000, 100_000):
+            rate, episodes = run(num_boards, steps, grid_size)
+            print(f"grid {grid_size:>3}, {num_boards:>7,} boards: "
+                  f"{rate:14,.0f} board-steps/sec ({episodes:,} episodes)")
+    for grid_size in (20, 50, 100):
+        rate, eaten = chase(2_000, steps, grid_size)
+        print(f"grid {grid_size:>3},   2,000 boards chasing food: "
+              f"{rate:14,.0f} board-steps/sec ({eaten:,} eaten)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--check"]:
+        # BatchEngine against Engine.step, instead of timing it
+        failures = check() + check(grid_size=3)  # The small board fills up
+        for failure in failures[:10]:
+            print(failure)
+        print(f"{len(failures)} mismatches" if failures else "batch matches Engine.step")
+        sys.exit(1 if failures else 0)
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_spawn import snake_filling  # noqa: E402
+
+# Whole-board queries on a bitboard against the per-cell loops they replace:
+# a flood fill of the free region (the autopilot's room check) and counting
+# free cells, plus what a board state costs to keep.
+
+
+def loop_flood(snake, start):
+    # Breadth-first search over the occupancy grid, one cell at a time
+    size = snake.grid_size
+    occupancy = snake.occupancy
+    seen = {start}
+    frontier = [start]
+    while frontier:
+        following = []
+        for cell in frontier:
+            y, x = divmod(cell, size)
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < size and 0 <= ny < size:
+                    n = ny * size + nx
+                    if not occupancy[n] and n not in seen:
+                        seen.add(n)
+                        following.append(n)
+        frontier = following
+    return len(seen)
+
+
+def bit_flood(snake, start):
+    bits = snake.bits
+    return bits.flood(1 << start, bits.free()).bit_count()
+
+
+def timed(fn, *args, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6, result
+
+
+def main():
+    print("flood fill of the free region, microseconds (best of 20)")
+    print(f"{'grid':>6} {'occupied':>9} {'cell loop':>11} {'bitboard':>10}")
+    for size in (20, 50, 100, 200):
+        for fraction in (0.1, 0.5):
+            snake = snake_filling(size, fraction)
+            start = snake.free.cells[0]
+            loop_us, loop_count = timed(loop_flood, snake, start)
+            bit_us, bit_count = timed(bit_flood, snake, start)
+            assert loop_count == bit_count
+            print(f"{size:>6} {fraction:>9.0%} {loop_us:>11.1f} {bit_us:>10.1f}")
+
+    snake = snake_filling(20, 0.5)
+    count_us, _ = timed(lambda: sum(1 for c in snake.occupancy if not c), repeat=200)
+    bits_us, _ = timed(snake.bits.free_count, repeat=200)
+    print(f"free cells on 20x20: scan {count_us:.2f} us, popcount {bits_us:.2f} us")
+    bits = snake.bits
+    print(f"20x20 board state: body bitboard {sys.getsizeof(bits.body)} bytes, "
+          f"occupancy grid {sys.getsizeof(snake.occupancy)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_engine import DIRECTIONS, Engine, Snake  # noqa: E402
+
+TARGET_STEPS_PER_SEC = 100_000
+
+
+def run(steps, grid_size=20, seed=1):
+    # Mostly-straight random policy; boards that end are reset immediately
+    rng = random.Random(seed)
+    actions = [rng.choice(DIRECTIONS) if rng.random() < 0.2 else None
+               for _ in range(4096)]
+    random.seed(seed)
+    engine = Engine(grid_size)
+    engine.reset()
+    games = 0
+
+    start = time.perf_counter()
+    for i in range(steps):
+        engine.step(actions[i & 4095])
+        if engine.game_over:
+            engine.reset()
+            games += 1
+    elapsed = time.perf_counter() - start
+    return steps / elapsed, games
+
+
+def hamiltonian_turns(size):
+    # Direction to take from every cell of a cycle through the whole board:
+    # serpentine over columns 1.., then back up column 0. `size` must be even.
+    order = []
+    for y in range(size):
+        xs = range(1, size) if y % 2 == 0 else range(size - 1, 0, -1)
+        order.extend((x, y) for x in xs)
+    order.extend((0, y) for y in range(size - 1, -1, -1))
+    turns = {}
+    for (x, y), (nx, ny) in zip(order, order[1:] + order[:1]):
+        turns[y * size + x] = (nx - x, ny - y)
+    return turns
+
+
+def long_snake_tick(length, ticks=100_000):
+    # Per-tick cost of move + check_collision for a snake of `length`
+    # segments following a cycle that never runs into itself
+    size = int(length ** 0.5) + 2
+    size += size % 2
+    turns = hamiltonian_turns(size)
+    snake = Snake(size)
+    snake.grow(length - 1)
+    for _ in range(length - 1):
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+        snake.check_collision()
+    elapsed = time.perf_counter() - start
+    assert len(snake.positions) == length and not snake.check_collision()
+    return elapsed / ticks * 1e9
+
+
+def main(steps=500_000):
+    for grid_size in (20, 100):
+        rate, games = run(steps, grid_size)
+        status = "ok" if rate >= TARGET_STEPS_PER_SEC else "BELOW TARGET"
+        print(f"grid {grid_size:>4}: {rate:12,.0f} steps/sec over {games} games "
+              f"(target {TARGET_STEPS_PER_SEC:,}) {status}")
+
+    for length in (10, 1_000, 100_000):
+        print(f"snake length {length:>7,}: {long_snake_tick(length):8.0f} ns per "
+              f"move + check_collision")
+
+
+if __name__ == "__main__":
+    main()
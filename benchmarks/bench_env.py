@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from snake_env import CHANNELS, FOOD, HEAD, SnakeEnv, SnakeVecEnv  # noqa: E402
+from snake_batch import FOOD_TYPES  # noqa: E402
+from snake_engine import DIRECTIONS  # noqa: E402
+
+# Environment steps per second on one core with a mostly-straight random
+# policy: the incremental observation against building a fresh array from
+# snake.positions every step, plus pixels and the shared-buffer vector env.
+
+TARGET_STEPS_PER_SEC = 20_000
+
+
+def actions(seed=1, count=4096):
+    rng = random.Random(seed)
+    return [rng.randrange(len(DIRECTIONS)) if rng.random() < 0.2 else -1 for _ in range(count)]
+
+
+def rebuilt_observation(engine):
+    # What an environment without the preallocated buffer does each step
+    size = engine.grid_size
+    obs = np.zeros((len(CHANNELS), size, size), dtype=np.float32)
+    for x, y in engine.snake.positions:
+        obs[0, y, x] = 1.0
+    x, y = engine.snake.positions[0]
+    obs[HEAD, y, x] = 1.0
+    if engine.food.position is not None:
+        x, y = engine.food.position
+        obs[FOOD + FOOD_TYPES.index(engine.food.type), y, x] = 1.0
+    return obs
+
+
+def run_env(env, steps, rebuild=False):
+    policy = actions()
+    env.reset(seed=1)
+    start = time.perf_counter()
+    for i in range(steps):
+        _, _, terminated, truncated, _ = env.step(policy[i & 4095])
+        if rebuild:
+            rebuilt_observation(env.engine)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def run_vec(vec, steps):
+    policy = np.array(actions(), dtype=np.int64)
+    n = vec.num_envs
+    vec.reset(seed=1)
+    rounds = steps // n
+    start = time.perf_counter()
+    for i in range(rounds):
+        offset = (i * n) & 4095
+        vec.step(policy[offset:offset + n] if offset + n <= 4096 else policy[:n])
+    return rounds * n / (time.perf_counter() - start)
+
+
+def main(steps=200_000):
+    print(f"steps per second, 20x20, {steps} steps")
+    rebuilt = run_env(SnakeEnv(), steps // 4, rebuild=True)
+    grid = run_env(SnakeEnv(), steps)
+    pixels = run_env(SnakeEnv(pixels=True), steps // 2)
+    vec = run_vec(SnakeVecEnv(16), steps)
+    vec_pixels = run_vec(SnakeVecEnv(16, pixels=True), steps // 2)
+    print(f"  rebuilt from positions   {rebuilt:>10,.0f}")
+    print(f"  in-place grid            {grid:>10,.0f}  "
+          f"({'ok' if grid >= TARGET_STEPS_PER_SEC else 'FAIL'}, "
+          f"target {TARGET_STEPS_PER_SEC:,})")
+    print(f"  in-place grid + pixels   {pixels:>10,.0f}")
+    print(f"  vector env, 16 boards    {vec:>10,.0f}")
+    print(f"  vector env + pixels      {vec_pixels:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# CPU use of the idle screens: the real Game.run loop left on the menu or
+# the game over screen for a few seconds, drawing every frame
+# (SNAKE_ON_DEMAND=0) against drawing only when input or the cursor blink
+# changes the screen. Each run is its own process, since run() ends with
+# pygame.quit(). Also times one game over frame composed from scratch
+# against one copied from the cached composition.
+#
+# The dummy video driver can't wake a waiting event loop, so SDL polls
+# every millisecond while it waits; a real display driver sleeps outright.
+
+
+def game_module():
+    path = os.path.join(ROOT, "6.13.25-atari_snake.py")
+    spec = importlib.util.spec_from_file_location("atari_snake", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def game_over(module):
+    # A game lost at the wall with nothing animating under the overlay
+    game = module.Game()
+    game.state = module.STATE_PLAYING
+    game.reset_game()
+    seed = 0
+    while True:
+        game.engine.reset(seed)
+        game.recorder.start(game.engine)
+        game.state = module.STATE_PLAYING
+        while game.state == module.STATE_PLAYING:
+            game.update()
+        if game.game_over_still():
+            return game
+        seed += 1
+
+
+def measure(state, seconds):
+    # In the child: run the loop on `state` and report CPU and frames drawn
+    import pygame
+
+    module = game_module()
+    game = game_over(module) if state == "game_over" else module.Game()
+    frames = [0]
+    for name in ("draw_menu", "draw_game_over"):
+        draw = getattr(game, name)
+
+        def counted(draw=draw):
+            frames[0] += 1
+            draw()
+        setattr(game, name, counted)
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    game.run()
+    wall = time.perf_counter() - wall
+    print(json.dumps({"cpu": (time.process_time() - cpu) / wall, "fps": frames[0] / wall}))
+
+
+def draw_costs(number=200):
+    module = game_module()
+    game = game_over(module)
+    start = time.perf_counter()
+    for _ in range(number):
+        game.compose_game_over()
+    composed = (time.perf_counter() - start) / number * 1e6
+    start = time.perf_counter()
+    for _ in range(number):
+        game.draw_game_over()
+    cached = (time.perf_counter() - start) / number * 1e6
+    return composed, cached
+
+
+def main(seconds=3.0):
+    if sys.argv[1:2] == ["--child"]:
+        measure(sys.argv[2], seconds)
+        return 0
+    print(f"process CPU over {seconds:.0f} s on each screen, {os.environ['SDL_VIDEODRIVER']} video")
+    for state in ("menu", "game_over"):
+        for on_demand in ("0", "1"):
+            env = dict(os.environ, SNAKE_ON_DEMAND=on_demand)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", state],
+                                 env=env, capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            mode = "on demand" if on_demand == "1" else "every frame"
+            print(f"  {state:10} {mode:12} {result['cpu'] * 100:5.1f}% CPU, "
+                  f"{result['fps']:5.1f} frames drawn/s")
+    composed, cached = draw_costs()
+    print(f"  game over frame: composed {composed:7.1f} us, from the cache {cached:7.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import cost in a fresh interpreter, and a check that importing has no
+# side effects: no pygame initialized, no mixer opened, no threads started.
+# The game module can't import faster than pygame itself (which pulls in
+# NumPy and pkg_resources), so its target is the time on top of that.
+
+TARGET_HEADLESS_MS = 50  # Rules-only modules and tools, which must not import pygame
+TARGET_GAME_OVERHEAD_MS = 50  # The game module beyond a bare `import pygame`
+
+PROBE = """
+import importlib.util, sys, threading, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{body}
+elapsed = (time.perf_counter() - start) * 1000
+pygame = sys.modules.get("pygame")
+print(elapsed, pygame is not None,
+      bool(pygame and (pygame.get_init() or pygame.mixer.get_init())),
+      threading.active_count())
+"""
+
+LOAD_GAME = """
+spec = importlib.util.spec_from_file_location(
+    "atari_snake", {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+""".format(path=os.path.join(ROOT, "6.13.25-atari_snake.py"))
+
+
+def probe(body, repeat):
+    # Best import time over `repeat` fresh interpreters, plus what the
+    # import left behind
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.pop("SDL_AUDIODRIVER", None)  # Importing must not need an audio device
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(root=ROOT, body=body)],
+                             capture_output=True, text=True, env=env, check=True)
+        ms, has_pygame, initialized, threads = out.stdout.split()
+        result = (float(ms), has_pygame == "True", initialized == "True", int(threads))
+        if best is None or result[0] < best[0]:
+            best = result
+    return best
+
+
+def main(repeat=5):
+    pygame_ms = probe("import pygame", repeat)[0]
+    print(f"import pygame alone: {pygame_ms:.1f} ms")
+    failed = False
+    for name in ("snake_engine", "snake_replay", "snake_autopilot", "snake_tournament"):
+        ms, has_pygame, _, threads = probe(f"import {name}", repeat)
+        ok = ms <= TARGET_HEADLESS_MS and not has_pygame and threads == 1
+        failed |= not ok
+        print(f"  {name:<18} {ms:7.1f} ms  pygame imported: {has_pygame}  "
+              f"({'ok' if ok else 'FAIL'}, target {TARGET_HEADLESS_MS} ms)")
+
+    ms, _, initialized, threads = probe(LOAD_GAME, repeat)
+    overhead = ms - pygame_ms
+    ok = overhead <= TARGET_GAME_OVERHEAD_MS and not initialized and threads == 1
+    failed |= not ok
+    print(f"  {'game module':<18} {ms:7.1f} ms  (+{overhead:.1f} ms over pygame)  "
+          f"initialized: {initialized}  threads: {threads}  "
+          f"({'ok' if ok else 'FAIL'}, target +{TARGET_GAME_OVERHEAD_MS} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_engine import (DOWN, LEFT, MIN_MOVE_DELAY, RIGHT, TICK_MS, UP, Engine,  # noqa: E402
+                          FixedTimestep, TurnQueue)
+
+# Quick U-turns at the fastest pace (a move every 50 ms): heading right, the
+# player taps up and then left a few tens of milliseconds apart. Sampling
+# the held keys once a frame, as the game used to, against queueing every
+# key press and taking one per move. Reports how many U-turns came out as
+# both turns, how many reversed straight into the neck (the second key
+# replacing the first before the snake moved), and how long the first press
+# waited for the move that made it, on simulated time, so the numbers don't
+# depend on the machine. Polling only counts the presses it saw at all,
+# which leaves out its slowest ones, so the last line compares the two on
+# the same presses.
+
+FRAME_MS = 1000 / 60
+HOLD_MS = 30  # How long a quick tap keeps the key down
+GAP_MS = (10, 40)  # Between the two taps of a U-turn
+PRIORITY = (UP, DOWN, LEFT, RIGHT)  # The order handle_game_input checked keys in
+
+
+def u_turn(rng):
+    # (press time, direction) for one U-turn starting at a random phase
+    first = 100 + rng.random() * 50
+    second = first + rng.uniform(*GAP_MS)
+    return [(first, UP), (second, LEFT)]
+
+
+def play(taps, queued, frames=30):
+    # Runs frames until the taps have had time to act; returns the moves'
+    # directions and how long the first tap waited for the snake to turn
+    engine = Engine(40, seed=1)
+    engine.move_delay = MIN_MOVE_DELAY
+    engine.snake.grow(4)  # Long enough that a reversal is fatal
+    timestep = FixedTimestep()
+    turns = TurnQueue()
+    moves = []
+    wait = None
+    now = 0.0
+    for _ in range(frames):
+        last = now
+        now += FRAME_MS
+        if queued:
+            for press, direction in taps:
+                if last < press <= now:
+                    turns.push(direction, engine.snake.direction, press)
+        else:
+            held = {direction for press, direction in taps if press <= now < press + HOLD_MS}
+            for direction in PRIORITY:
+                if direction in held:
+                    engine.turn(direction)
+                    break
+        for _ in range(timestep.advance(FRAME_MS)):
+            if queued and engine.move_due:
+                direction = turns.pop(now)
+                if direction is not None:
+                    engine.turn(direction)
+            moved = engine.move_due
+            engine.tick()
+            if moved:
+                # Shown at the end of this frame
+                moves.append(engine.snake.direction)
+                press, direction = taps[0]
+                if wait is None and direction == engine.snake.direction:
+                    wait = now - press
+    return moves, wait, engine.game_over
+
+
+def made_both(moves):
+    # Up then left, in that order
+    try:
+        return LEFT in moves[moves.index(UP):]
+    except ValueError:
+        return False
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main(trials=2_000):
+    rng = random.Random(1)
+    trials_taps = [u_turn(rng) for _ in range(trials)]
+    print(f"{trials} U-turns at {MIN_MOVE_DELAY * TICK_MS:.0f} ms a move, "
+          f"taps {GAP_MS[0]}-{GAP_MS[1]} ms apart, held {HOLD_MS} ms")
+    results = {}
+    for name, queued in (("poll held keys per frame", False), ("queued key presses", True)):
+        done = died = 0
+        waits = []
+        for taps in trials_taps:
+            moves, wait, dead = play(taps, queued)
+            done += made_both(moves) and not dead
+            died += dead
+            waits.append(wait)
+        results[queued] = waits
+        seen = [wait for wait in waits if wait is not None]
+        print(f"  {name:26} {done / trials:6.1%} made both turns, {died} reversed into "
+              f"themselves, first press to move p50 {percentile(seen, 0.5):.0f} "
+              f"p99 {percentile(seen, 0.99):.0f} ms over {len(seen)} presses")
+    # Polling loses exactly the presses that waited longest for a move (the
+    # second key replaced them), so compare on the presses both saw
+    paired = [(polled, queued) for polled, queued in zip(results[False], results[True])
+              if polled is not None and queued is not None]
+    polled = [pair[0] for pair in paired]
+    queued = [pair[1] for pair in paired]
+    print(f"  on the {len(paired)} presses both saw: polling p50 {percentile(polled, 0.5):.0f} "
+          f"p99 {percentile(polled, 0.99):.0f} ms, queue p50 {percentile(queued, 0.5):.0f} "
+          f"p99 {percentile(queued, 0.99):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+from snake_particles import DECAY, ParticlePool  # noqa: E402
+
+WIDTH, HEIGHT = 800, 600
+COLORS = [(255, 255, 0), (0, 255, 255), (255, 0, 255), (0, 255, 0), (255, 255, 255), (255, 0, 0)]
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class LegacyParticles:
+    # The old dict-per-particle list, kept as the reference implementation
+    def __init__(self):
+        self.particles = []
+
+    def __len__(self):
+        return len(self.particles)
+
+    def emit(self, x, y, count, speed, colors, life):
+        for _ in range(count):
+            self.particles.append({
+                'pos': [x, y],
+                'vel': [random.uniform(-speed, speed), random.uniform(-speed, speed)],
+                'color': random.choice(colors),
+                'life': life
+            })
+
+    def update(self):
+        for particle in self.particles[:]:
+            particle['pos'][0] += particle['vel'][0]
+            particle['pos'][1] += particle['vel'][1]
+            particle['vel'][1] += 0.5
+            particle['life'] -= 0.02
+            if particle['life'] <= 0:
+                self.particles.remove(particle)
+
+    def draw(self, surface):
+        for particle in self.particles:
+            alpha = int(min(particle['life'], 1.0) * 255)
+            size = int(particle['life'] * 10)
+            if size > 0:
+                surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surf, (*particle['color'], alpha), (size, size), size)
+                surface.blit(surf, (particle['pos'][0] - size, particle['pos'][1] - size))
+
+
+def stress(particles, surface, live, frames, show=False):
+    # Keep about `live` particles alive by emitting a burst every frame
+    per_frame = max(1, int(live * DECAY))
+    for _ in range(int(1 / DECAY)):
+        particles.emit(WIDTH // 2, HEIGHT // 3, per_frame, 6, COLORS, 1.0)
+        particles.update()
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        surface.fill((0, 0, 0))
+        particles.emit(WIDTH // 2, HEIGHT // 3, per_frame, 6, COLORS, 1.0)
+        particles.update()
+        particles.draw(surface)
+        if show:
+            pygame.display.flip()
+            pygame.event.pump()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return len(particles), times[len(times) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particle system stress test")
+    parser.add_argument("--show", action="store_true", help="draw into a real window")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--legacy", action="store_true",
+                        help="also time the old dict-based particles (slow)")
+    args = parser.parse_args()
+
+    if not args.show:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    surface = screen if args.show else pygame.Surface((WIDTH, HEIGHT))
+
+    for live in (1_000, 10_000, 20_000):
+        count, median = stress(ParticlePool(COLORS, capacity=2 * live, seed=1),
+                               surface, live, args.frames, args.show)
+        status = "ok" if median <= FRAME_BUDGET_MS else "over budget"
+        print(f"pool   {count:>6,} live: {median:7.2f} ms/frame median ({status})")
+        if args.legacy and live <= 10_000:
+            count, median = stress(LegacyParticles(), surface, live, 10)
+            print(f"legacy {count:>6,} live: {median:7.2f} ms/frame median")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from bench_engine import hamiltonian_turns  # noqa: E402
+from snake_engine import Food, Snake  # noqa: E402
+from snake_particles import ParticlePool  # noqa: E402
+from snake_render import (BoardRenderer, BLACK, CYAN, DARK_GREEN, GREEN, RED,  # noqa: E402
+                          WHITE)
+
+WIDTH, HEIGHT = 800, 600
+
+
+def legacy_draw(screen, font, snake, food, cell_size, score):
+    # The old draw_game body for the common case (no ghost/rainbow), + flip
+    screen.fill(BLACK)
+    pygame.draw.rect(screen, RED, (0, 0, WIDTH, HEIGHT), 3)
+    for x in range(0, WIDTH, cell_size):
+        pygame.draw.line(screen, (20, 20, 20), (x, 0), (x, HEIGHT))
+    for y in range(0, HEIGHT, cell_size):
+        pygame.draw.line(screen, (20, 20, 20), (0, y), (WIDTH, y))
+    for i, pos in enumerate(snake.positions):
+        rect = pygame.Rect(pos[0] * cell_size, pos[1] * cell_size, cell_size - 2, cell_size - 2)
+        pygame.draw.rect(screen, GREEN if i == 0 else DARK_GREEN, rect)
+    food_rect = pygame.Rect(food.position[0] * cell_size, food.position[1] * cell_size,
+                            cell_size - 2, cell_size - 2)
+    pygame.draw.rect(screen, RED, food_rect)
+    screen.blit(font.render(f"SCORE: {score}", True, WHITE), (10, 10))
+    screen.blit(font.render(f"HIGH: {score}", True, CYAN), (10, 50))
+    pygame.display.flip()
+
+
+def legacy_special_draw(screen, snake, cell_size):
+    # The old ghost + rainbow segment loop: a Color and a Surface per segment
+    alpha = 100 + int(155 * abs(math.sin(pygame.time.get_ticks() * 0.01)))
+    for i, pos in enumerate(snake.positions):
+        hue = (i * 20 + pygame.time.get_ticks() / 10) % 360
+        color = pygame.Color(0)
+        color.hsla = (hue, 100, 50, 100)
+        rect = pygame.Rect(pos[0] * cell_size, pos[1] * cell_size, cell_size - 2, cell_size - 2)
+        ghost_surf = pygame.Surface((cell_size - 2, cell_size - 2), pygame.SRCALPHA)
+        ghost_surf.fill((*color[:3], alpha))
+        screen.blit(ghost_surf, rect)
+    pygame.display.flip()
+
+
+def new_draw(renderer, snake, food, particles, score, ghost=False):
+    hud = [(f"SCORE: {score}", WHITE, (10, 10)), (f"HIGH: {score}", CYAN, (10, 50))]
+    rects = renderer.draw(snake, food, particles, hud, ghost)
+    if rects is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(rects)
+
+
+def frame_time(draw, snake, turns, frames):
+    # Median ms per frame while the snake walks its cycle, one move a frame
+    times = []
+    for _ in range(frames):
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+        start = time.perf_counter()
+        draw()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def main(frames=300):
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.Font(None, 36)
+    print("median frame time, ms (snake fills a quarter of the board)")
+    for grid_size in (20, 40, 80):
+        cell_size = min(WIDTH, HEIGHT) // grid_size
+        turns = hamiltonian_turns(grid_size)
+        snake = Snake(grid_size)
+        snake.grow(grid_size * grid_size // 4)
+        while snake.grow_count:
+            snake.direction = turns[snake.body[0]]
+            snake.move()
+        food = Food(grid_size)
+        food.position = (0, 0)
+        food.type, food.lifespan = "apple", -1
+        particles = ParticlePool([WHITE])
+        renderer = BoardRenderer(screen, grid_size, cell_size, font)
+
+        legacy = frame_time(lambda: legacy_draw(screen, font, snake, food, cell_size, 0),
+                            snake, turns, frames)
+        new = frame_time(lambda: new_draw(renderer, snake, food, particles, 0),
+                         snake, turns, frames)
+        print(f"  grid {grid_size:>3} ({len(snake.positions):>4} segments): "
+              f"full redraw {legacy:6.2f}  dirty rects {new:6.2f}")
+
+    # Ghost + rainbow redraws every segment each frame
+    grid_size, length = 40, 1000
+    cell_size = min(WIDTH, HEIGHT) // grid_size
+    turns = hamiltonian_turns(grid_size)
+    snake = Snake(grid_size)
+    snake.grow(length - 1)
+    while snake.grow_count:
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+    snake.rainbow_mode = True
+    renderer = BoardRenderer(screen, grid_size, cell_size, font)
+    legacy = frame_time(lambda: legacy_special_draw(screen, snake, cell_size),
+                        snake, turns, frames)
+    new = frame_time(lambda: new_draw(renderer, snake, food, particles, 0, ghost=True),
+                     snake, turns, frames)
+    status = "ok" if new <= 1000 / 60 else "over budget"
+    print(f"  ghost + rainbow, {length} segments: "
+          f"per-segment surfaces {legacy:6.2f}  sprite blits {new:6.2f} ({status})")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
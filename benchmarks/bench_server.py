@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from snake_engine import TICK_RATE  # noqa: E402
+from snake_replay import _read_varint, _write_varint  # noqa: E402
+from snake_server import (MSG_ACK, MSG_DELTA, MSG_JOIN, MSG_STATS, MSG_TURN,  # noqa: E402
+                          _HEADER, frame)
+
+# Load generator for snake_server: starts the server in its own process,
+# connects bots that fill `rooms` rooms and turn every so often, and reports
+# what both sides saw:
+#
+#   python benchmarks/bench_server.py --rooms 200 --players 2 --seconds 10
+#
+# The server side is tick work and how late ticks started (from its STATS);
+# the client side is input latency, from sending a TURN to getting its ACK,
+# which includes waiting for the next tick. Bots and server share the
+# machine, so the numbers are for both together.
+
+TARGET_LATE_P99_MS = 1000 / TICK_RATE  # Ticks may start late, but not by a whole tick
+
+
+class Bot:
+    def __init__(self, room, turn_interval, rng):
+        self.room = room
+        self.turn_interval = turn_interval
+        self.rng = rng
+        self.sent = {}  # seq -> send time
+        self.latencies = []
+        self.deltas = 0
+        self.delta_bytes = 0
+        self.seq = 0
+
+    async def run(self, host, port, stop):
+        reader, writer = await asyncio.open_connection(host, port)
+        out = bytearray()
+        _write_varint(out, self.room)
+        writer.write(frame(MSG_JOIN, out))
+        receiving = asyncio.ensure_future(self._receive(reader))
+        try:
+            # Start at a random phase so the bots don't all turn together
+            await asyncio.sleep(self.rng.random() * self.turn_interval)
+            while not stop.is_set():
+                self.seq += 1
+                out = bytearray()
+                _write_varint(out, self.rng.randrange(4))
+                _write_varint(out, self.seq)
+                self.sent[self.seq] = time.perf_counter()
+                writer.write(frame(MSG_TURN, out))
+                try:
+                    await asyncio.wait_for(stop.wait(), self.turn_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            receiving.cancel()
+            writer.close()
+
+    async def _receive(self, reader):
+        while True:
+            (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+            data = await reader.readexactly(length)
+            if data[0] == MSG_DELTA:
+                self.deltas += 1
+                self.delta_bytes += _HEADER.size + length
+            elif data[0] == MSG_ACK:
+                seq, _ = _read_varint(data, 1)
+                sent = self.sent.pop(seq, None)
+                if sent is not None:
+                    self.latencies.append((time.perf_counter() - sent) * 1000)
+                # Acks only ever cover the latest turn
+                for old in [s for s in self.sent if s < seq]:
+                    del self.sent[old]
+
+
+async def server_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(frame(MSG_STATS))
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    data = await reader.readexactly(length)
+    writer.close()
+    return json.loads(data[1:])
+
+
+async def load(host, port, rooms, players, seconds, turn_interval, seed):
+    rng = random.Random(seed)
+    bots = [Bot(room + 1, turn_interval, random.Random(rng.getrandbits(32)))
+            for room in range(rooms) for _ in range(players)]
+    # Connect gradually, then measure over a window that starts once all
+    # the rooms are up
+    stop = asyncio.Event()
+    tasks = []
+    for bot in bots:
+        tasks.append(asyncio.ensure_future(bot.run(host, port, stop)))
+        await asyncio.sleep(0)
+    await asyncio.sleep(2)
+    before = await server_stats(host, port)
+    for bot in bots:
+        bot.latencies.clear()
+        bot.deltas = bot.delta_bytes = 0
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    after = await server_stats(host, port)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*tasks)
+    return bots, before, after, elapsed
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for snake_server")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--players", type=int, default=2, help="bots per room")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--turn-interval", type=float, default=0.25,
+                        help="seconds between each bot's turns")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "snake_server.py"),
+                               "--port", "0", "--players", str(args.players),
+                               "--seed", str(args.seed)],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        line = server.stdout.readline()
+        host, port = line.rsplit(" ", 1)[1].strip().rsplit(":", 1)
+        bots, before, after, elapsed = asyncio.run(
+            load(host, int(port), args.rooms, args.players, args.seconds,
+                 args.turn_interval, args.seed))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = [ms for bot in bots for ms in bot.latencies]
+    room_ticks = after["room_ticks"] - before["room_ticks"]
+    ticks = after["ticks"] - before["ticks"]
+    messages = sum(bot.deltas for bot in bots)
+    received = sum(bot.delta_bytes for bot in bots)
+    late = after["tick_late_ms"]
+    work = after["tick_work_ms"]
+    print(f"{after['rooms']} rooms, {after['players']} snakes, {elapsed:.1f} s")
+    print(f"  server: {ticks / elapsed:.1f} ticks/s ({room_ticks / elapsed:,.0f} room ticks/s, "
+          f"target {TICK_RATE * args.rooms:,}), {after['dropped_ticks']} dropped")
+    print(f"  tick work  p50 {work['p50']:.2f}  p99 {work['p99']:.2f}  max {work['max']:.2f} ms")
+    print(f"  tick late  p50 {late['p50']:.2f}  p99 {late['p99']:.2f}  max {late['max']:.2f} ms "
+          f"({'ok' if late['p99'] <= TARGET_LATE_P99_MS else 'FAIL'}, "
+          f"target p99 {TARGET_LATE_P99_MS:.1f} ms)")
+    print(f"  input -> ack  p50 {percentile(latencies, 0.5):.2f}  "
+          f"p99 {percentile(latencies, 0.99):.2f}  max {max(latencies, default=0):.2f} ms "
+          f"over {len(latencies)} turns")
+    print(f"  deltas: {messages / elapsed / len(bots):.1f}/s per client, "
+          f"{received / max(1, messages):.1f} bytes each, "
+          f"{received / elapsed / 1024:.0f} KiB/s in total, {after['slow_clients']} clients dropped")
+    return 0 if late["p99"] <= TARGET_LATE_P99_MS and not after["dropped_ticks"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snake_sound  # noqa: E402
+
+# The six beeps the game synthesizes at startup
+GAME_SOUNDS = [(440, 0.1), (110, 0.5), (220, 0.02), (880, 0.3), (660, 0.15), (523, 0.2)]
+
+
+def legacy_beep_pcm(frequency, duration):
+    # The original per-sample loop, kept here as the reference implementation
+    sample_rate = 22050
+    samples = int(sample_rate * duration)
+    waves = np.zeros((samples, 2), dtype=np.int16)
+
+    for i in range(samples):
+        t = float(i) / sample_rate
+        value = 32767 if math.sin(2 * math.pi * frequency * t) > 0 else -32767
+        envelope = 1.0
+        if i < samples * 0.1:
+            envelope = i / (samples * 0.1)
+        elif i > samples * 0.9:
+            envelope = (samples - i) / (samples * 0.1)
+        value = int(value * envelope * 0.3)
+        waves[i][0] = value
+        waves[i][1] = value
+    return waves
+
+
+def time_startup(build, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeat=5):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        snake_sound.CACHE_DIR = cache_dir
+
+        def legacy():
+            return [legacy_beep_pcm(f, d) for f, d in GAME_SOUNDS]
+
+        def cold():
+            snake_sound.clear_cache(disk=True)
+            return [snake_sound.beep_pcm(f, d) for f, d in GAME_SOUNDS]
+
+        def warm():
+            snake_sound.clear_cache()
+            return [snake_sound.beep_pcm(f, d) for f, d in GAME_SOUNDS]
+
+        def in_process():
+            return [snake_sound.beep_pcm(f, d) for f, d in GAME_SOUNDS]
+
+        identical = all(np.array_equal(a, b) for a, b in zip(legacy(), cold()))
+
+        results = [
+            ("legacy per-sample loop", time_startup(legacy, max(1, repeat // 2))),
+            ("vectorized, cold cache", time_startup(cold, repeat)),
+            ("vectorized, warm disk cache", time_startup(warm, repeat)),
+            ("in-process cache hit", time_startup(in_process, repeat)),
+        ]
+
+    print(f"startup sound synthesis ({len(GAME_SOUNDS)} sounds), best of {repeat}")
+    for name, seconds in results:
+        print(f"  {name:<30} {seconds * 1000:9.3f} ms")
+    print(f"  speedup cold vs legacy: {results[0][1] / results[1][1]:.0f}x")
+    print(f"  PCM identical to legacy: {identical}")
+
+
+if __name__ == "__main__":
+    main()
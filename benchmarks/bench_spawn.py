@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import hamiltonian_turns  # noqa: E402
+from snake_engine import Food, Snake  # noqa: E402
+
+
+def snake_filling(size, fraction):
+    # A snake covering `fraction` of a size x size board without touching itself
+    turns = hamiltonian_turns(size)
+    snake = Snake(size)
+    length = int(size * size * fraction)
+    snake.grow(length - 1)
+    for _ in range(length - 1):
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+    return snake
+
+
+def legacy_spawn(food, positions):
+    # The old loop: re-roll a uniform cell until it misses a list of positions
+    food.spawn()
+    while food.position in positions:
+        food.spawn()
+
+
+def time_spawns(spawn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        spawn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main(size=40, count=2_000):
+    random.seed(1)
+    print(f"Food.spawn on a {size}x{size} board, microseconds per spawn")
+    for fraction in (0.5, 0.9, 0.99):
+        snake = snake_filling(size, fraction)
+        food = Food(size)
+        as_list = list(snake.positions)
+        legacy = time_spawns(lambda: legacy_spawn(food, as_list), max(10, count // 20))
+        rejection = time_spawns(lambda: legacy_spawn(food, snake.positions), count)
+        free = time_spawns(lambda: food.spawn(snake.free), count)
+        print(f"  {fraction:>4.0%} occupied: list re-roll {legacy:10.1f}  "
+              f"occupancy re-roll {rejection:8.1f}  free-cell draw {free:6.2f}")
+
+    # Filling every cell leaves nowhere to spawn, which is a win, not a hang
+    full = snake_filling(size, 1.0)
+    assert not Food(size).spawn(full.free)
+
+
+if __name__ == "__main__":
+    main()
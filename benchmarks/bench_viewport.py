@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from bench_engine import hamiltonian_turns  # noqa: E402
+from snake_engine import Food, Snake  # noqa: E402
+from snake_particles import ParticlePool  # noqa: E402
+from snake_render import BoardRenderer, CYAN, WHITE  # noqa: E402
+
+# Frame cost against board size and snake length, with the camera scrolling.
+# With culling, both columns should stay flat as the board and the snake
+# grow: only what is inside the 800x600 view gets drawn.
+
+WIDTH, HEIGHT = 800, 600
+MIN_CELL_SIZE = 16  # As in the game: bigger boards scroll
+
+
+def walking_snake(grid_size, length, turns):
+    snake = Snake(grid_size)
+    snake.grow(length - 1)
+    while snake.grow_count:
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+    return snake
+
+
+def frame_times(renderer, snake, food, particles, turns, frames, ghost=False):
+    # Median and worst ms per frame (draw + present), one move a frame,
+    # and how many frames moved the camera
+    hud = [("SCORE: 0", WHITE, (10, 10)), ("HIGH: 0", CYAN, (10, 50))]
+    times = []
+    scrolls = 0
+    camera = renderer.camera
+    for _ in range(frames):
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+        before = (camera.x, camera.y)
+        start = time.perf_counter()
+        rects = renderer.draw(snake, food, particles, hud, ghost)
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        times.append(time.perf_counter() - start)
+        scrolls += before != (camera.x, camera.y)
+    times.sort()
+    return times[len(times) // 2] * 1000, times[-1] * 1000, scrolls
+
+
+def main(frames=600):
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.Font(None, 36)
+    particles = ParticlePool([WHITE])
+    print("ms per frame, median / worst, while the snake walks and the camera follows")
+    print(f"{'grid':>6} {'cell':>5} {'length':>7} {'plain':>15} {'ghost+rainbow':>15} {'scrolls':>8}")
+    for grid_size in (20, 100, 1000):
+        cell_size = max(MIN_CELL_SIZE, min(WIDTH, HEIGHT) // grid_size)
+        turns = hamiltonian_turns(grid_size)
+        for length in (100, 10_000):
+            if length > grid_size * grid_size // 2:
+                continue
+            snake = walking_snake(grid_size, length, turns)
+            food = Food(grid_size)
+            food.position = snake.positions[0]
+            food.type, food.lifespan = "apple", -1
+            renderer = BoardRenderer(screen, grid_size, cell_size, font)
+            plain, plain_worst, scrolls = frame_times(renderer, snake, food, particles,
+                                                      turns, frames)
+            snake.rainbow_mode = True
+            renderer.invalidate()
+            special, special_worst, _ = frame_times(renderer, snake, food, particles,
+                                                    turns, frames, ghost=True)
+            print(f"{grid_size:>6} {cell_size:>5} {length:>7} "
+                  f"{plain:>6.2f} / {plain_worst:>6.2f} {special:>6.2f} / {special_worst:>6.2f} "
+                  f"{scrolls:>8}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame  # noqa: E402
+
+from bench_engine import hamiltonian_turns  # noqa: E402
+from bench_spawn import snake_filling  # noqa: E402
+from snake_engine import Food, Snake  # noqa: E402
+import snake_sound  # noqa: E402
+
+# The regression suite: every hot path timed the same way and written to a
+# JSON file, so two runs (or a run and the committed baseline) can be
+# compared number by number.
+#
+#   python benchmarks/suite.py run --out results.json
+#   python benchmarks/suite.py compare benchmarks/baseline.json results.json
+#
+# Each case reports microseconds per operation: the median and the best of
+# several rounds. Every round is paired with a fixed pure-Python workload,
+# and compare goes by the best round relative to that workload's best, so a
+# machine that is busy or clocked down for the whole run doesn't read as a
+# regression. It exits 1 when any case got slower than the baseline by more
+# than its threshold.
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # 25% slower than the baseline is a regression
+ROUNDS = 9
+
+CASES = []
+
+
+def case(name, number, threshold=DEFAULT_THRESHOLD):
+    # Register a benchmark. The decorated function does the setup and
+    # returns the operation to time, which runs `number` times per round.
+    def register(setup):
+        CASES.append((name, setup, number, threshold))
+        return setup
+    return register
+
+
+def _game_module():
+    # The game script's name isn't importable, so load it by path, once
+    module = sys.modules.get("atari_snake")
+    if module is None:
+        path = os.path.join(ROOT, "6.13.25-atari_snake.py")
+        spec = importlib.util.spec_from_file_location("atari_snake", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["atari_snake"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def _cycling_snake(grid_size, length):
+    # A snake of `length` that can follow a Hamiltonian cycle forever
+    turns = hamiltonian_turns(grid_size)
+    snake = Snake(grid_size)
+    snake.grow(length - 1)
+    while snake.grow_count:
+        snake.direction = turns[snake.body[0]]
+        snake.move()
+    return snake, turns
+
+
+def _playing_game(seed=1, length=0):
+    # A Game mid-play on the autopilot, so games last and keep eating
+    module = _game_module()
+    game = module.Game()
+    game.reset_game()
+    game.engine.reset(seed)
+    game.engine.snake.grow(length)
+    game.state = module.STATE_PLAYING
+    game.autopilot_on = True
+    return module, game
+
+
+def _keep_playing(module, game, seed):
+    if game.state != module.STATE_PLAYING:
+        game.reset_game()
+        game.engine.reset(seed)
+        game.state = module.STATE_PLAYING
+
+
+@case("import.game_module", number=1, threshold=0.4)
+def bench_import_game():
+    # A fresh interpreter importing the game: pygame, NumPy and our modules
+    command = [sys.executable, "-c",
+               "import importlib.util, sys; sys.path.insert(0, sys.argv[1]); "
+               "spec = importlib.util.spec_from_file_location('atari_snake', sys.argv[2]); "
+               "spec.loader.exec_module(importlib.util.module_from_spec(spec))",
+               ROOT, os.path.join(ROOT, "6.13.25-atari_snake.py")]
+    return lambda: subprocess.run(command, check=True)
+
+
+@case("sound.generate_beep", number=2000)
+def bench_generate_beep():
+    # PCM from the in-memory cache, so this is the Sound construction
+    generate_beep = _game_module().generate_beep
+    return lambda: generate_beep(440, 0.1)
+
+
+@case("sound.synth_wave", number=20)
+def bench_synth_wave():
+    return lambda: snake_sound.synth_wave(110, 0.5)
+
+
+def _snake_move(length):
+    def setup():
+        size = int(length ** 0.5) + 2
+        size += size % 2
+        snake, turns = _cycling_snake(size, length)
+
+        def op():
+            snake.direction = turns[snake.body[0]]
+            snake.move()
+            snake.check_collision()
+        return op
+    return setup
+
+
+for _length in (10, 1_000, 100_000):
+    case(f"engine.snake_move[len={_length}]", number=20_000)(_snake_move(_length))
+
+
+def _food_spawn(fraction):
+    def setup():
+        snake = snake_filling(40, fraction)
+        food = Food(40)
+        return lambda: food.spawn(snake.free)
+    return setup
+
+
+for _fraction in (0.5, 0.99):
+    case(f"engine.food_spawn[occupied={_fraction:.0%}]", number=20_000)(_food_spawn(_fraction))
+
+
+@case("game.update[particles]", number=600, threshold=0.4)
+def bench_game_update():
+    # Fixed ticks with a burst of particles every half second
+    module, game = _playing_game()
+    count = 0
+
+    def op():
+        nonlocal count
+        count += 1
+        if count % 30 == 0:
+            game.spawn_particles("bomb", game.snake.positions[0])
+        game.update()
+        _keep_playing(module, game, 1)
+    return op
+
+
+@case("frame.playing", number=300, threshold=0.4)
+def bench_frame_playing():
+    # One whole frame end to end: a tick, the drawing and the present
+    module, game = _playing_game(length=100)
+    count = 0
+
+    def op():
+        nonlocal count
+        count += 1
+        if count % 30 == 0:
+            game.spawn_particles("golden", game.snake.positions[0])
+        game.update()
+        _keep_playing(module, game, 1)
+        rects = game.draw_game(0.5)
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+    return op
+
+
+@case("render.draw_game[full]", number=100)
+def bench_draw_game_full():
+    # Worst case for the board: nothing reusable from the last frame
+    module, game = _playing_game(length=100)
+    for _ in range(600):
+        game.update()
+        _keep_playing(module, game, 1)
+
+    def op():
+        game.renderer.invalidate()
+        game.draw_game()
+        pygame.display.flip()
+    return op
+
+
+@case("render.draw_menu", number=100)
+def bench_draw_menu():
+    game = _game_module().Game()
+    game.high_score = 1234
+
+    def op():
+        game.draw_menu()
+        pygame.display.flip()
+    return op
+
+
+@case("render.draw_game_over", number=100)
+def bench_draw_game_over():
+    module, game = _playing_game()
+    game.autopilot_on = False  # Straight into the wall
+    while game.state == module.STATE_PLAYING:
+        game.update()
+
+    def op():
+        game.draw_game_over()
+        pygame.display.flip()
+    return op
+
+
+def calibration():
+    # A fixed interpreter-bound workload, to measure how fast the machine
+    # is running right now
+    total = 0
+    for i in range(20_000):
+        total += i * i
+    return total
+
+
+def measure(setup, number, rounds=ROUNDS):
+    # Microseconds per operation over `rounds` timed rounds, after a short
+    # untimed warm-up, each round next to a calibration run
+    op = setup()
+    for _ in range(max(1, number // 10)):
+        op()
+    per_op = []
+    reference = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        calibration()
+        reference.append((time.perf_counter() - start) * 1e6)
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        per_op.append((time.perf_counter() - start) / number * 1e6)
+    return {"median_us": statistics.median(per_op), "min_us": min(per_op),
+            "calibration_us": min(reference)}
+
+
+def _cost(result, raw):
+    # What compare measures: the best round, relative to the calibration
+    if raw:
+        return result["min_us"]
+    return result["min_us"] / result["calibration_us"] * 1000
+
+
+def run(args):
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+    results = {}
+    for name, setup, number, threshold in CASES:
+        if args.only and not any(part in name for part in args.only.split(",")):
+            continue
+        number = max(1, int(number * args.scale))
+        result = measure(setup, number, args.rounds)
+        result["threshold"] = threshold
+        results[name] = result
+        print(f"{name:<36} {result['median_us']:>12.2f} us  (best {result['min_us']:.2f})",
+              flush=True)
+    data = {
+        "machine": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                    "platform": platform.platform(), "processor": platform.processor()},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {args.out}")
+    pygame.quit()
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    unit = "us" if args.raw else "per 1000 calibration us"
+    print(f"{'case':<36} {'baseline':>12} {'current':>12} {'change':>8}  ({unit})")
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            print(f"{name:<36} {'':>12} {'':>12}  (not run)")
+            continue
+        if name not in baseline:
+            print(f"{name:<36} {'':>12} {_cost(current[name], args.raw):>12.2f}  (new)")
+            continue
+        old = _cost(baseline[name], args.raw)
+        new = _cost(current[name], args.raw)
+        change = new / old - 1
+        threshold = args.threshold if args.threshold is not None else baseline[name].get(
+            "threshold", DEFAULT_THRESHOLD)
+        status = ""
+        if change > threshold:
+            status = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            status = "  faster"
+        print(f"{name:<36} {old:>12.2f} {new:>12.2f} {change:>+8.1%}{status}")
+    if regressions:
+        print(f"{regressions} case(s) regressed")
+        return 1
+    print("no regressions")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite with baseline comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time every case")
+    run_parser.add_argument("--out", help="write results here as JSON "
+                            f"(use {os.path.relpath(BASELINE)} to update the baseline)")
+    run_parser.add_argument("--only", help="comma-separated substrings of case names")
+    run_parser.add_argument("--rounds", type=int, default=ROUNDS)
+    run_parser.add_argument("--scale", type=float, default=1.0,
+                            help="multiply the operations per round, e.g. 0.1 for a quick run")
+
+    compare_parser = commands.add_parser("compare", help="fail if results regressed")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float,
+                                help="allowed slowdown as a fraction, overriding each case's")
+    compare_parser.add_argument("--raw", action="store_true",
+                                help="compare plain times, without the calibration")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
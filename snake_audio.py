@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from snake_sound import SAMPLE_RATE, beep_pcm
+
+# The game's sounds as pygame Sounds. Nothing here runs at import: the
+# mixer opens when a SoundBank loads, and the PCM is synthesized (or read
+# from the disk cache) on a background thread while the menu is up. With no
+# audio device, or SNAKE_AUDIO=0, every play() is a no-op.
+#
+# The game doesn't play sounds itself: it posts them to an AudioManager,
+# which starts them once a frame on channels reserved per category.
+
+# name -> (frequency, duration, volume)
+GAME_SOUNDS = {
+    "eat": (440, 0.1, 1.0),  # A4 note
+    "death": (110, 0.5, 1.0),  # A2 note (lower, longer)
+    "move": (220, 0.02, 0.05),  # A3 note (quick tick), very quiet on every move
+    "level_up": (880, 0.3, 1.0),  # A5 note
+    "menu": (660, 0.15, 1.0),  # E5 note
+    "select": (523, 0.2, 1.0),  # C5 note
+}
+
+# name -> (category, priority, seconds before it may start again). A busy
+# category gives its oldest lowest-priority voice to a sound of at least
+# that priority.
+SOUND_VOICES = {
+    "move": ("move", 0, 0.08),
+    "menu": ("ui", 1, 0.03),
+    "select": ("ui", 1, 0.0),
+    "eat": ("pickup", 2, 0.05),
+    "level_up": ("pickup", 3, 0.0),
+    "death": ("alert", 4, 0.0),
+}
+
+# category -> mixer channels reserved for it
+CHANNEL_POOLS = {"alert": 1, "pickup": 2, "ui": 1, "move": 1}
+
+QUEUE_LIMIT = 64  # Posted sounds kept per frame; past it the least important goes
+
+
+def init_mixer():
+    # True if the mixer is open in the stereo format the beeps are built
+    # in; False means run silent
+    if os.environ.get("SNAKE_AUDIO") == "0":
+        pygame.mixer.quit()
+        return False
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=512)
+        except pygame.error:
+            return False
+    return pygame.mixer.get_init()[2] == 2
+
+
+class SoundBank:
+    def __init__(self, specs=GAME_SOUNDS):
+        self.specs = specs
+        self.enabled = False
+        self.sounds = {}
+        self._pcm = {}
+        self._ready = threading.Event()
+        self._thread = None
+
+    def load(self):
+        # Open the mixer and start synthesizing; returns straight away
+        self.enabled = init_mixer()
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._synthesize, name="sound-synth",
+                                            daemon=True)
+            self._thread.start()
+        return self.enabled
+
+    def _synthesize(self):
+        # NumPy only; the Sounds themselves are made on the main thread
+        try:
+            for name, (frequency, duration, _) in self.specs.items():
+                self._pcm[name] = beep_pcm(frequency, duration)
+        finally:
+            self._ready.set()
+
+    def wait(self, timeout=None):
+        # Block until every sound can play; the game calls this before its
+        # first tick. False if running silent or the timeout ran out.
+        if not self.enabled:
+            return False
+        if not self.sounds:
+            if not self._ready.wait(timeout):
+                return False
+            for name, (_, _, volume) in self.specs.items():
+                pcm = self._pcm.get(name)
+                if pcm is None:
+                    continue  # Synthesis failed; that sound stays silent
+                try:
+                    sound = pygame.sndarray.make_sound(pcm)
+                except (pygame.error, ValueError):
+                    self.enabled = False
+                    return False
+                sound.set_volume(volume)
+                self.sounds[name] = sound
+        return True
+
+    def ready(self):
+        # True if the sounds can play now, without waiting on synthesis
+        if self.sounds:
+            return True
+        return self.enabled and self._ready.is_set() and self.wait()
+
+    def play(self, name):
+        # A sound asked for before synthesis finishes is skipped rather
+        # than stalling the frame
+        if not self.ready():
+            return
+        sound = self.sounds.get(name)
+        if sound is not None:
+            sound.play()
+
+
+class AudioManager:
+    # Sound requests from the game logic go into a queue (post is a deque
+    # append, so the simulation never touches the mixer); pump() starts
+    # them once a frame, rate limited per sound, on reserved channels so a
+    # flood of move ticks can never take a channel from the death cue.
+    def __init__(self, bank=None, voices=SOUND_VOICES, pools=CHANNEL_POOLS,
+                 clock=time.perf_counter):
+        self.bank = bank if bank is not None else SoundBank()
+        self.voices = voices
+        self.pools = pools
+        self.clock = clock
+        self._queue = deque()
+        self._channels = None  # category -> [Channel]
+        self._playing = {}  # Channel -> (priority, started)
+        self._last_start = {}  # name -> when it last started
+        # Counters since the manager was made
+        self.played = 0
+        self.stolen = 0  # Started by cutting off a lower-priority voice
+        self.limited = 0  # Skipped for retriggering too soon
+        self.dropped = 0  # Pushed out of a full queue, or every voice busy on more important ones
+
+    @property
+    def enabled(self):
+        return self.bank.enabled
+
+    def load(self):
+        return self.bank.load()
+
+    def wait(self, timeout=None):
+        return self.bank.wait(timeout)
+
+    def post(self, name):
+        if not self.bank.enabled:
+            return
+        queue = self._queue
+        if len(queue) >= QUEUE_LIMIT:
+            # Full: the oldest of the least important sounds makes room,
+            # unless that would be more important than this one
+            victim = min(queue, key=self._priority)
+            if self._priority(victim) >= self._priority(name):
+                self.dropped += 1
+                return
+            queue.remove(victim)
+            self.dropped += 1
+        queue.append(name)
+
+    def _priority(self, name):
+        voice = self.voices.get(name)
+        return voice[1] if voice is not None else -1
+
+    def clear(self):
+        self._queue.clear()
+
+    def _reserve_channels(self):
+        # Channels 0.. go to the pools, and set_reserved keeps pygame's own
+        # Sound.play off them
+        total = sum(self.pools.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+        channels = {}
+        index = 0
+        for category, count in self.pools.items():
+            channels[category] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
+        self._channels = channels
+
+    def pump(self):
+        # Start what was posted since the last call; returns how many started
+        queue = self._queue
+        if not queue:
+            return 0
+        if not self.bank.ready():
+            queue.clear()  # Still synthesizing: these moments have passed
+            return 0
+        sounds = self.bank.sounds
+        if self._channels is None:
+            self._reserve_channels()
+        now = self.clock()
+        started = 0
+        while queue:
+            name = queue.popleft()
+            sound = sounds.get(name)
+            voice = self.voices.get(name)
+            if sound is None or voice is None:
+                continue
+            category, priority, interval = voice
+            last = self._last_start.get(name)
+            if last is not None and now - last < interval:
+                self.limited += 1
+                continue
+            channel = self._voice_for(category, priority)
+            if channel is None:
+                self.dropped += 1
+                continue
+            channel.play(sound)
+            self._playing[channel] = (priority, now)
+            self._last_start[name] = now
+            started += 1
+        self.played += started
+        return started
+
+    def _voice_for(self, category, priority):
+        # An idle channel from the pool, else the one playing the oldest
+        # lowest-priority sound if that is no more important than this one
+        victim = None
+        for channel in self._channels[category]:
+            if not channel.get_busy():
+                return channel
+            playing = self._playing.get(channel, (-1, 0.0))
+            if victim is None or playing < victim[0]:
+                victim = (playing, channel)
+        if victim[0][0] > priority:
+            return None
+        self.stolen += 1
+        return victim[1]
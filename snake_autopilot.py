@@ -0,0 +1,289 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+from itertools import islice
+
+from snake_engine import DIRECTIONS
+
+# Autopilot: steers toward the food along a shortest path around the body,
+# keeps away from bombs, cuts through itself while ghost mode lasts, and
+# refuses moves that would seal it off from its own tail.
+#
+# The distance-to-food field is the expensive part, so it is built lazily
+# (only as far out as the head) and repaired in place as the snake moves:
+# each move blocks one cell at the head and frees one at the tail, which
+# touches only the few cells whose shortest path ran through them.
+
+INF = 1 << 30
+
+
+class DistanceField:
+    # Path lengths to `target` around blocked cells. Dijkstra with a heap,
+    # expanded only as far as queries need: every cell whose distance is at
+    # most `radius` is exact, the rest are upper bounds still in the heap.
+    # Blocking and freeing cells repairs the values in place.
+    #
+    # Internally the board has a blocked border one cell wide, so the four
+    # neighbors of a cell are fixed offsets with no bounds checks. Public
+    # methods take plain board cells.
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+        self.width = width = grid_size + 2
+        self.count = width * width
+        self.offsets = (-width, width, -1, 1)
+        self.dist = array("l", [INF]) * self.count
+        self.border = bytearray([1]) * self.count
+        for y in range(grid_size):
+            row = (y + 1) * width + 1
+            self.border[row:row + grid_size] = bytes(grid_size)
+        self.blocked = bytearray(self.border)
+        self.target = None
+        self.radius = -1
+        self._heap = []
+        self.expanded = 0  # Cells settled so far, for the benchmark
+
+    def pad(self, cell):
+        # Board cell -> index in the bordered arrays
+        return cell + 2 * (cell // self.grid_size) + self.width + 1
+
+    def reset(self, target, blocked):
+        # `blocked` is per board cell, like Snake.occupancy
+        size = self.grid_size
+        width = self.width
+        self.dist[:] = array("l", [INF]) * self.count
+        self.blocked[:] = self.border
+        for y in range(size):
+            row = (y + 1) * width + 1
+            self.blocked[row:row + size] = blocked[y * size:(y + 1) * size]
+        self.target = None if target is None else self.pad(target)
+        self.radius = -1
+        self._heap = []
+        if target is not None:
+            self.dist[self.target] = 0
+            self._heap.append((0, self.target))
+
+    def distance(self, cell):
+        return self._distance(self.pad(cell))
+
+    def _distance(self, cell):
+        dist = self.dist
+        blocked = self.blocked
+        heap = self._heap
+        offsets = self.offsets
+        while dist[cell] > self.radius and heap:
+            d, current = heappop(heap)
+            if d != dist[current] or blocked[current]:
+                continue  # Superseded or since blocked
+            self.radius = d
+            self.expanded += 1
+            d += 1
+            for offset in offsets:
+                neighbor = current + offset
+                if d < dist[neighbor] and not blocked[neighbor]:
+                    dist[neighbor] = d
+                    heappush(heap, (d, neighbor))
+        # With nothing left to settle, every distance is final
+        return dist[cell] if dist[cell] <= self.radius or not heap else INF
+
+    def free(self, cell):
+        # A cell opened up: it can only shorten paths, which Dijkstra
+        # handles by re-queueing it with its best neighbor's distance + 1
+        cell = self.pad(cell)
+        dist = self.dist
+        blocked = self.blocked
+        blocked[cell] = 0
+        if cell == self.target:
+            d = 0
+        else:
+            d = min((dist[cell + o] for o in self.offsets if not blocked[cell + o]),
+                    default=INF) + 1
+        if d < dist[cell]:
+            dist[cell] = d
+            heappush(self._heap, (d, cell))
+            if d <= self.radius:
+                self.radius = d - 1
+
+    def block(self, cell):
+        # A cell closed: every value is backed by a neighbor with a smaller
+        # one, so find the cells left with no such neighbor, in increasing
+        # order of distance, and queue them again from what remains
+        cell = self.pad(cell)
+        dist = self.dist
+        blocked = self.blocked
+        offsets = self.offsets
+        blocked[cell] = 1
+        old = dist[cell]
+        dist[cell] = INF
+        if old >= INF:
+            return
+        lost = {cell}
+        pending = [(old, cell)]
+        while pending:
+            d, current = heappop(pending)
+            for offset in offsets:
+                n = current + offset
+                dn = dist[n]
+                if dn <= d or dn >= INF or blocked[n]:
+                    continue
+                if any(dist[n + o] < dn and not blocked[n + o] for o in offsets):
+                    continue  # Still backed by another neighbor
+                lost.add(n)
+                dist[n] = INF
+                heappush(pending, (dn, n))
+
+        heap = self._heap
+        lost.discard(cell)
+        for current in lost:
+            d = min((dist[current + o] for o in offsets if not blocked[current + o]),
+                    default=INF) + 1
+            if d < INF:
+                dist[current] = d
+                heappush(heap, (d, current))
+        self.radius = min(self.radius, old - 1)
+
+
+class Autopilot:
+    def __init__(self, engine):
+        self.engine = engine
+        self.field = DistanceField(engine.grid_size)
+        # The body as the field last saw it, to find changed cells
+        self._body = deque()
+        self._moves = -1
+        self._target = None
+        self._plan_key = None
+        self._plan = None
+
+    def decide(self):
+        # Direction to turn to before the next move, or None to carry on.
+        # Cheap to call every tick: it only plans again after a move.
+        engine = self.engine
+        snake = engine.snake
+        key = (snake.moves, snake.direction, engine.food.position, engine.food.type,
+               engine.ghost_mode_timer > engine.move_delay, len(snake.body))
+        if key != self._plan_key:
+            self._plan_key = key
+            self._sync()
+            self._plan = self._choose()
+        return self._plan
+
+    def steer(self):
+        # Apply the decision; True if the snake turned
+        direction = self.decide()
+        return direction is not None and self.engine.turn(direction)
+
+    def _sync(self):
+        snake = self.engine.snake
+        food = self.engine.food
+        size = self.engine.grid_size
+        target = None if food.position is None else food.position[1] * size + food.position[0]
+        body = snake.body
+        moved = snake.moves - self._moves
+        if target != self._target or moved < 0 or moved > len(body):
+            self.field.reset(target, snake.occupancy)
+            self._target = target
+            self._body = deque(body)
+            self._moves = snake.moves
+            return
+
+        # Replay the moves on the old body, like the renderer does
+        drawn = self._body
+        changed = set()
+        if moved:
+            new_cells = list(islice(body, moved))
+            drawn.extendleft(reversed(new_cells))
+            changed.update(new_cells)
+        while len(drawn) > len(body):
+            changed.add(drawn.pop())
+        self._moves = snake.moves
+
+        field = self.field
+        occupancy = snake.occupancy
+        blocked = field.blocked
+        for cell in changed:
+            if occupancy[cell] and not blocked[field.pad(cell)]:
+                field.block(cell)
+        for cell in changed:
+            if not occupancy[cell] and blocked[field.pad(cell)]:
+                field.free(cell)
+
+    def _choose(self):
+        engine = self.engine
+        snake = engine.snake
+        food = engine.food
+        size = engine.grid_size
+        occupancy = snake.occupancy
+        body = snake.body
+        head = body[0]
+        tail = body[-1]
+        # Ghost mode has to last until the next move lands for it to help
+        ghost = engine.ghost_mode_timer > engine.move_delay
+        bomb = food.type == "bomb"
+        target = self._target
+        reverse = (-snake.direction[0], -snake.direction[1])
+        tail_moves = snake.grow_count == 0 and len(body) > 1
+
+        candidates = []
+        hy, hx = divmod(head, size)
+        for direction in DIRECTIONS:
+            if direction == reverse:
+                continue  # change_direction would refuse it anyway
+            x = hx + direction[0]
+            y = hy + direction[1]
+            if not (0 <= x < size and 0 <= y < size):
+                continue
+            cell = y * size + x
+            if bomb and cell == target:
+                continue
+            if occupancy[cell] and not ghost and not (cell == tail and tail_moves):
+                continue
+            candidates.append((direction, cell))
+        if not candidates:
+            return None
+
+        need = len(body) + snake.grow_count
+        if target is not None and not bomb:
+            ranked = []
+            for direction, cell in candidates:
+                if ghost:
+                    tx, ty = food.position
+                    distance = abs(cell % size - tx) + abs(cell // size - ty)
+                else:
+                    distance = self.field.distance(cell)
+                if distance < INF:
+                    ranked.append((distance, direction != snake.direction, direction, cell))
+            ranked.sort()
+            for _, _, direction, cell in ranked:
+                if ghost or self._room(cell, need) >= need:
+                    return self._turn(direction)
+
+        # No safe way to the food (or it's a bomb): go where there's most
+        # room, ideally following the tail
+        best = max(candidates, key=lambda c: (min(self._room(c[1], need), need),
+                                              c[0] == snake.direction))
+        return self._turn(best[0])
+
+    def _turn(self, direction):
+        return None if direction == self.engine.snake.direction else direction
+
+    def _room(self, start, need):
+        # Free cells reachable from `start`, counting up to `need`. Reaching
+        # the tail also counts as enough, as long as it will have moved on
+        # by the time the head gets there. A flood over the snake's
+        # bitboard: each step grows the whole frontier at once.
+        snake = self.engine.snake
+        bits = snake.bits
+        passable = bits.free()
+        tail = 1 << snake.body[-1]
+        grow = snake.grow_count
+        region = frontier = 1 << start
+        steps = 1
+        while frontier:
+            steps += 1
+            grown = bits.neighbors(frontier)
+            if grown & tail and steps > grow:
+                return need
+            frontier = grown & passable & ~region
+            region |= frontier
+            if region.bit_count() > need:
+                return need
+        return region.bit_count() - 1
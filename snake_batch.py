@@ -0,0 +1,282 @@
+import numpy as np
+
+from snake_engine import GRID_SIZE, DIRECTIONS
+
+# Batched simulator: N independent boards stepped together with NumPy.
+# Each call to BatchEngine.step is one Engine.step on every board, with the
+# same rules, food rarity table and timers, and no Python loop over boards.
+# Like Engine.step, every step moves every snake once: the real-time move
+# delay and its speed-ups only pace interactive play, so they aren't kept.
+
+# Food type codes, in Food.spawn rarity order
+FOOD_TYPES = ("apple", "golden", "speed", "ghost", "bomb")
+APPLE, GOLDEN, SPEED, GHOST, BOMB = range(len(FOOD_TYPES))
+FOOD_THRESHOLDS = np.array([0.6, 0.8, 0.9, 0.95])
+FOOD_LIFESPANS = np.array([-1, -1, 300, 180, 240], dtype=np.int32)
+FOOD_POINTS = np.array([10, 50, 25, 30, -20], dtype=np.int32)
+FOOD_GROWTH = np.array([1, 3, 0, 0, 0], dtype=np.int32)
+
+# Death cause codes
+CAUSE_NONE = 0
+CAUSE_WALL = 1
+CAUSE_SELF = 2
+CAUSE_WIN = 3  # No free cell left to put food on
+CAUSES = ("", "wall", "self", "win")
+
+# Actions are indices into DIRECTIONS, or NO_ACTION to keep going straight
+NO_ACTION = -1
+_DX = np.array([d[0] for d in DIRECTIONS], dtype=np.int32)
+_DY = np.array([d[1] for d in DIRECTIONS], dtype=np.int32)
+_OPPOSITE = np.array([DIRECTIONS.index((-d[0], -d[1])) for d in DIRECTIONS],
+                     dtype=np.int32)
+_RIGHT = DIRECTIONS.index((1, 0))
+
+
+class BatchEngine:
+    def __init__(self, num_boards, grid_size=GRID_SIZE, seed=None):
+        n = num_boards
+        cells = grid_size * grid_size
+        self.num_boards = n
+        self.grid_size = grid_size
+        self.cells = cells
+        # Ghost mode lets the body overlap itself, so leave room past one lap
+        self.capacity = 2 * cells
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(n)
+        self._cell_base = self._rows * cells
+        self._body_base = self._rows * self.capacity
+
+        # Per-cell segment counts, and the body as a ring buffer of cell
+        # indices running from head_ptr (head) for `length` entries. Both are
+        # mostly accessed through flat views, which index much faster.
+        small = self.capacity <= np.iinfo(np.int16).max
+        self.occupancy = np.zeros((n, cells), dtype=np.int16 if small else np.int32)
+        self.body = np.zeros((n, self.capacity), dtype=np.int16 if small else np.int32)
+        self._occ = self.occupancy.reshape(-1)
+        self._body = self.body.reshape(-1)
+        # The empty cells of each board as a swap-remove list (the first
+        # free_count entries of a row) and each cell's slot in it, kept up
+        # as cells empty and fill, so food spawns with one draw per board
+        index = np.int16 if cells <= np.iinfo(np.int16).max else np.int32
+        self.free = np.zeros((n, cells), dtype=index)
+        self.free_slot = np.zeros((n, cells), dtype=index)
+        self.free_count = np.zeros(n, dtype=np.int64)
+        self._free = self.free.reshape(-1)
+        self._free_slot = self.free_slot.reshape(-1)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int32)
+        self.grow_count = np.zeros(n, dtype=np.int32)
+        self.rainbow_mode = np.zeros(n, dtype=bool)
+
+        self.food_pos = np.zeros(n, dtype=np.int64)
+        self.food_type = np.zeros(n, dtype=np.int32)
+        self.food_timer = np.zeros(n, dtype=np.int32)
+        self.food_lifespan = np.zeros(n, dtype=np.int32)
+
+        self.score = np.zeros(n, dtype=np.int32)
+        self.speed_boost_timer = np.zeros(n, dtype=np.int32)
+        self.ghost_mode_timer = np.zeros(n, dtype=np.int32)
+
+        # Outputs of the last step; final_* hold the ended episode's values
+        # for boards that were auto-reset
+        self.eaten = np.full(n, -1, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+        self.death_cause = np.zeros(n, dtype=np.int32)
+        self.final_score = np.zeros(n, dtype=np.int32)
+        self.final_length = np.zeros(n, dtype=np.int64)
+        self.episodes = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, boards=None):
+        if boards is None:
+            boards = self._rows
+        boards = np.asarray(boards)
+        if boards.dtype == bool:
+            boards = np.flatnonzero(boards)
+        if boards.size == 0:
+            return
+
+        center = (self.grid_size // 2) * self.grid_size + self.grid_size // 2
+        self.occupancy[boards] = 0
+        self.occupancy[boards, center] = 1
+        self.free[boards] = np.arange(self.cells)
+        self.free_slot[boards] = np.arange(self.cells)
+        self.free_count[boards] = self.cells
+        self._fill(boards, np.full(boards.size, center))
+        self.head_ptr[boards] = 0
+        self.body[boards, 0] = center
+        self.length[boards] = 1
+        self.direction[boards] = _RIGHT
+        self.grow_count[boards] = 0
+        self.rainbow_mode[boards] = False
+        self.score[boards] = 0
+        self.speed_boost_timer[boards] = 0
+        self.ghost_mode_timer[boards] = 0
+        self._respawn_food(boards)
+
+    def step(self, actions=None):
+        g = self.grid_size
+        self.eaten[:] = -1
+        self.done[:] = False
+        self.death_cause[:] = CAUSE_NONE
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int32)
+            # Prevent going back into yourself
+            turn = (actions >= 0) & (actions != _OPPOSITE[self.direction])
+            self.direction[turn] = actions[turn]
+
+        head = self._body[self._body_base + self.head_ptr]
+        x = head % g + _DX[self.direction]
+        y = head // g + _DY[self.direction]
+        wall = (x < 0) | (x >= g) | (y < 0) | (y >= g)
+        self.done[wall] = True
+        self.death_cause[wall] = CAUSE_WALL
+
+        moving = np.flatnonzero(~wall)
+        new_head = (y * g + x)[moving]
+        self._push_head(moving, new_head)
+
+        eat = moving[new_head == self.food_pos[moving]]
+        if eat.size:
+            self._eat(eat)
+
+        # Check self collision (unless in ghost mode). A board that filled up
+        # this move has already ended, with a win, as Engine ends it.
+        live = ~self.done[moving]
+        moving, new_head = moving[live], new_head[live]
+        crashed = moving[(self.ghost_mode_timer[moving] <= 0) &
+                         (self._occ[self._cell_base[moving] + new_head] > 1)]
+        self.done[crashed] = True
+        self.death_cause[crashed] = CAUSE_SELF
+
+        self._tick_timers(moving[~self.done[moving]])
+
+        ended = np.flatnonzero(self.done)
+        if ended.size:
+            self.final_score[ended] = self.score[ended]
+            self.final_length[ended] = self.length[ended]
+            self.episodes[ended] += 1
+            self.reset(ended)
+        return self.eaten, self.done
+
+    def positions(self, board):
+        # Body of one board as (x, y) tuples, head first
+        idx = (self.head_ptr[board] + np.arange(self.length[board])) % self.capacity
+        cells = self.body[board, idx]
+        return [(int(c % self.grid_size), int(c // self.grid_size)) for c in cells]
+
+    def _push_head(self, boards, new_head):
+        ptr = (self.head_ptr[boards] - 1) % self.capacity
+        self.head_ptr[boards] = ptr
+        self._body[self._body_base[boards] + ptr] = new_head
+        # Boards are distinct, so plain fancy-index increments are safe
+        head_at = self._cell_base[boards] + new_head
+        self._occ[head_at] += 1
+        filled = self._occ[head_at] == 1
+        self._fill(boards[filled], new_head[filled])
+
+        growing = self.grow_count[boards] > 0
+        self.grow_count[boards[growing]] -= 1
+        self.length[boards[growing]] += 1
+
+        shrink = boards[~growing]
+        tail_ptr = (self.head_ptr[shrink] + self.length[shrink]) % self.capacity
+        tail = self._body[self._body_base[shrink] + tail_ptr]
+        tail_at = self._cell_base[shrink] + tail
+        self._occ[tail_at] -= 1
+        emptied = self._occ[tail_at] == 0
+        self._empty(shrink[emptied], tail[emptied])
+
+        # Ghost laps can only outgrow the ring buffer on absurd boards
+        full = boards[self.length[boards] >= self.capacity]
+        self.done[full] = True
+        self.death_cause[full] = CAUSE_WIN
+
+    def _eat(self, boards):
+        food_type = self.food_type[boards]
+        self.eaten[boards] = food_type
+        self.grow_count[boards] += FOOD_GROWTH[food_type]
+        self.score[boards] = np.maximum(0, self.score[boards] + FOOD_POINTS[food_type])
+        self.rainbow_mode[boards[food_type == GOLDEN]] = True
+        self.speed_boost_timer[boards[food_type == SPEED]] = 300
+        self.ghost_mode_timer[boards[food_type == GHOST]] = 180
+
+        # Bomb hurts! Remove the back half of the snake if possible
+        bombed = boards[(food_type == BOMB) & (self.length[boards] > 3)]
+        if bombed.size:
+            self._truncate(bombed, self.length[bombed] // 2)
+
+        self._respawn_food(boards)
+
+    def _truncate(self, boards, new_length):
+        old_length = self.length[boards]
+        k = np.arange(old_length.max())
+        cut = (k >= new_length[:, None]) & (k < old_length[:, None])
+        ring = (self.head_ptr[boards][:, None] + k) % self.capacity
+        rows = np.broadcast_to(boards[:, None], cut.shape)[cut]
+        cells = self.body[rows, ring[cut]]
+        np.subtract.at(self.occupancy, (rows, cells), 1)
+        self.length[boards] = new_length
+
+        # Ghost laps can drop a cell more than once; each emptied cell goes
+        # on its board's free list once, after the ones already there
+        at = np.unique(rows * self.cells + cells)
+        at = at[self._occ[at] == 0]
+        rows, cells = np.divmod(at, self.cells)
+        rank = np.arange(at.size) - np.searchsorted(rows, rows)
+        slot = self.free_count[rows] + rank
+        self._free[self._cell_base[rows] + slot] = cells
+        self._free_slot[at] = slot
+        np.add.at(self.free_count, rows, 1)
+
+    def _fill(self, boards, cells):
+        # Swap-remove one newly occupied cell per board from its free list
+        base = self._cell_base[boards]
+        slot = self._free_slot[base + cells]
+        count = self.free_count[boards] - 1
+        self.free_count[boards] = count
+        last = self._free[base + count]
+        self._free[base + slot] = last
+        self._free_slot[base + last] = slot
+
+    def _empty(self, boards, cells):
+        # Append one newly emptied cell per board to its free list
+        base = self._cell_base[boards]
+        slot = self.free_count[boards]
+        self._free[base + slot] = cells
+        self._free_slot[base + cells] = slot
+        self.free_count[boards] = slot + 1
+
+    def _respawn_food(self, boards):
+        # Uniform draw over free cells: the same distribution as re-rolling
+        # Food.spawn until it misses the snake, without the retries
+        count = self.free_count[boards]
+        slot = (self.rng.random(boards.size) * count).astype(np.int64)
+        self.food_pos[boards] = np.where(count > 0, self._free[self._cell_base[boards] + slot], 0)
+
+        full = boards[count == 0]
+        self.done[full] = True
+        self.death_cause[full] = CAUSE_WIN
+        self._roll_food_type(boards)
+
+    def _roll_food_type(self, boards):
+        food_type = np.searchsorted(FOOD_THRESHOLDS, self.rng.random(boards.size),
+                                    side="right")
+        self.food_type[boards] = food_type
+        self.food_lifespan[boards] = FOOD_LIFESPANS[food_type]
+        self.food_timer[boards] = 0
+
+    def _tick_timers(self, boards):
+        expiring = boards[self.food_lifespan[boards] > 0]
+        self.food_timer[expiring] += 1
+        expired = expiring[self.food_timer[expiring] >= self.food_lifespan[expiring]]
+        if expired.size:
+            self._respawn_food(expired)
+
+        speed = boards[self.speed_boost_timer[boards] > 0]
+        self.speed_boost_timer[speed] -= 1
+        ghost = boards[self.ghost_mode_timer[boards] > 0]
+        self.ghost_mode_timer[ghost] -= 1
@@ -0,0 +1,86 @@
+# Bitboards: a whole board as one Python int, bit y * size + x per cell.
+# Set operations over every cell (free space, neighbors of a region, flood
+# fills) become a handful of shifts and masks, and a 20x20 board state
+# fits in about 80 bytes.
+
+
+class Bitboard:
+    __slots__ = ("size", "count", "full", "not_left", "not_right", "body", "food", "walls")
+
+    def __init__(self, size):
+        self.size = size
+        self.count = size * size
+        self.full = (1 << self.count) - 1
+        left = 0
+        for y in range(size):
+            left |= 1 << (y * size)
+        self.not_left = self.full & ~left  # Cells that have a neighbor to the left
+        self.not_right = self.full & ~(left << (size - 1))
+        self.body = 0  # Cells with at least one snake segment
+        self.food = 0
+        self.walls = 0  # Cells nothing may enter; the plain game has none
+
+    def clear(self):
+        self.body = 0
+        self.food = 0
+
+    def bit(self, x, y):
+        return 1 << (y * self.size + x)
+
+    def occupied(self, cell):
+        return (self.body | self.walls) >> cell & 1
+
+    def free(self):
+        return self.full & ~(self.body | self.walls)
+
+    def free_count(self):
+        return self.count - (self.body | self.walls).bit_count()
+
+    def shift(self, mask, direction):
+        # `mask` moved one cell in `direction`, dropping what leaves the board
+        dx, dy = direction
+        if dx == 1:
+            mask = (mask & self.not_right) << 1
+        elif dx == -1:
+            mask = (mask & self.not_left) >> 1
+        if dy == 1:
+            mask <<= self.size
+        elif dy == -1:
+            mask >>= self.size
+        return mask & self.full
+
+    def neighbors(self, mask):
+        # Every cell next to one in `mask` (4-connected)
+        size = self.size
+        return ((mask << size) | (mask >> size) | ((mask & self.not_right) << 1) |
+                ((mask & self.not_left) >> 1)) & self.full
+
+    def flood(self, start, passable, limit=None):
+        # Cells of `passable` connected to `start`, grown one step at a time;
+        # stops early once the region has more than `limit` cells
+        region = start
+        frontier = start
+        while frontier:
+            frontier = self.neighbors(frontier) & passable & ~region
+            region |= frontier
+            if limit is not None and region.bit_count() > limit:
+                break
+        return region
+
+    @staticmethod
+    def cells(mask):
+        # Set bits of `mask` as cell indices, lowest first
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def rect(self, x0, y0, x1, y1):
+        # Mask of the cells with x0 <= x <= x1 and y0 <= y <= y1
+        if x1 < x0:
+            return 0
+        row = ((1 << (x1 - x0 + 1)) - 1) << x0
+        mask = 0
+        for y in range(y0, y1 + 1):
+            mask |= row << (y * self.size)
+        return mask
@@ -0,0 +1,592 @@
+import random
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from functools import lru_cache
+
+from snake_bitboard import Bitboard
+
+# Headless simulation core. Everything here is plain Python with no pygame
+# dependency: the rules report sounds and particle bursts as events and the
+# renderer decides what to do with them.
+
+GRID_SIZE = 20
+MAX_GRID_SIZE = 1000
+FPS = 60
+TABLE_CELLS = 1 << 16  # Boards up to 256x256 get per-cell lookup tables
+
+# The simulation advances in fixed ticks, independent of the frame rate.
+# Every timer (moves, power-ups, food, particles) counts these.
+TICK_RATE = 60  # Ticks per second
+TICK_MS = 1000 / TICK_RATE
+MAX_CATCHUP_TICKS = 5  # Ticks a slow frame may run before time is dropped
+MOVE_DELAY = 6.0  # Ticks between moves at the start (100 ms)
+MIN_MOVE_DELAY = 3.0  # Fastest pace (50 ms)
+MOVE_SPEEDUP = 0.12  # Delay shaved off per food eaten (2 ms)
+SPEED_BOOST_TICKS = 300  # 5 seconds of boost
+GHOST_MODE_TICKS = 180  # 3 seconds of ghost mode
+TURN_QUEUE_SIZE = 3  # Key presses buffered ahead of the snake's moves
+LATENCY_SAMPLES = 256  # Input latencies kept for the overlay
+
+# Directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+# Event kinds returned by Engine.tick / Engine.step
+EVENT_SOUND = "sound"            # (EVENT_SOUND, sound_name)
+EVENT_PARTICLES = "particles"    # (EVENT_PARTICLES, food_type, cell)
+EVENT_EAT = "eat"                # (EVENT_EAT, food_type, cell)
+EVENT_GAME_OVER = "game_over"    # (EVENT_GAME_OVER, cause)
+
+# Game over causes
+DEATH_WALL = "wall"
+DEATH_SELF = "self"
+BOARD_FULL = "win"  # No free cell left to put food on
+
+
+class CellPositions(Sequence):
+    # Packed cell index -> (x, y), worked out on lookup. Big boards use this
+    # instead of a table: a million (x, y) tuples would cost ~100 MB.
+    __slots__ = ("grid_size",)
+
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+
+    def __len__(self):
+        return self.grid_size * self.grid_size
+
+    def __getitem__(self, cell):
+        if not 0 <= cell < self.grid_size * self.grid_size:
+            raise IndexError(cell)
+        y, x = divmod(cell, self.grid_size)
+        return (x, y)
+
+
+@lru_cache(maxsize=None)
+def cell_positions(grid_size):
+    # Packed cell index -> (x, y), shared by every snake on this board size
+    if grid_size * grid_size > TABLE_CELLS:
+        return CellPositions(grid_size)
+    return tuple((x, y) for y in range(grid_size) for x in range(grid_size))
+
+
+_OCCUPIED_DIGITS = b"0" + b"1" * 255  # Segment count -> binary digit, for Snake.bits
+
+_MOVE_SOUND = (EVENT_SOUND, "move")
+_DEATH_SOUND = (EVENT_SOUND, "death")
+_WIN_SOUND = (EVENT_SOUND, "level_up")
+
+# Score, growth and sound for each food type
+FOOD_EFFECTS = {
+    "apple": (10, 1, "eat"),
+    "golden": (50, 3, "level_up"),
+    "speed": (25, 0, "menu"),
+    "ghost": (30, 0, "select"),
+    "bomb": (-20, 0, "death"),
+}
+
+
+class FreeCells:
+    # The board's empty cells in a swap-remove list, with a cell -> slot
+    # index so add, remove and a uniform draw are all O(1). Lists are
+    # faster; big boards use arrays, 8 bytes a cell instead of ~36.
+    __slots__ = ("cells", "slots", "_initial")
+
+    def __init__(self, count):
+        if count <= TABLE_CELLS:
+            self._initial = range(count)
+            self.cells = list(self._initial)
+            self.slots = list(self._initial)  # -1 when the cell is taken
+        else:
+            self._initial = array("q", range(count))
+            self.cells = array("q", self._initial)
+            self.slots = array("q", self._initial)
+
+    def reset(self):
+        self.cells[:] = self._initial
+        self.slots[:] = self._initial
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.slots[cell] >= 0
+
+    def remove(self, cell):
+        slot = self.slots[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[cell] = -1
+
+    def add(self, cell):
+        self.slots[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self, rng=random):
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class BodyView(Sequence):
+    # Read-only (x, y) view over a snake body stored as packed cell indices
+    __slots__ = ("_body", "_occupancy", "_cell_pos", "_grid_size")
+
+    def __init__(self, body, occupancy, cell_pos, grid_size):
+        self._body = body
+        self._occupancy = occupancy
+        self._cell_pos = cell_pos
+        self._grid_size = grid_size
+
+    def __len__(self):
+        return len(self._body)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._cell_pos[cell] for cell in list(self._body)[index]]
+        return self._cell_pos[self._body[index]]
+
+    def __iter__(self):
+        return map(self._cell_pos.__getitem__, self._body)
+
+    def __contains__(self, pos):
+        # O(1) through the occupancy grid instead of a scan of the body
+        x, y = pos
+        size = self._grid_size
+        return 0 <= x < size and 0 <= y < size and self._occupancy[y * size + x] > 0
+
+    def __repr__(self):
+        return f"BodyView({list(self)!r})"
+
+
+class Snake:
+    def __init__(self, grid_size=GRID_SIZE):
+        self.grid_size = grid_size
+        self.cell_pos = cell_positions(grid_size)
+        # Body cells (y * grid_size + x), head first, plus a count of body
+        # segments on every cell. Ghost mode lets segments share a cell, but
+        # never anywhere near 255 of them. `free` tracks the empty cells and
+        # `bits` the occupied ones, for whole-board queries.
+        self.body = deque()
+        self.occupancy = bytearray(grid_size * grid_size)
+        self.free = FreeCells(grid_size * grid_size)
+        self._bits = Bitboard(grid_size)
+        self._bits_stale = True
+        self.positions = BodyView(self.body, self.occupancy, self.cell_pos, grid_size)
+        self.reset()
+
+    def reset(self, start=None):
+        # Rebuild the free list in board order rather than re-adding the old
+        # body, so a new game never depends on how the last one went. The
+        # snake starts on cell `start`, by default the center of the board.
+        for cell in self.body:
+            self.occupancy[cell] = 0
+        self.free.reset()
+        self.body.clear()
+        if start is None:
+            start = (self.grid_size // 2) * self.grid_size + self.grid_size // 2
+        self.body.append(start)
+        self.occupancy[start] = 1
+        self.free.remove(start)
+        self._bits_stale = True
+        self.direction = RIGHT
+        self.grow_count = 0
+        self.rainbow_mode = False
+        self.moves = 0  # Lets renderers find the cells added since they looked
+
+    def move(self):
+        size = self.grid_size
+        y, x = divmod(self.body[0], size)
+        x += self.direction[0]
+        y += self.direction[1]
+
+        # Check if snake leaves the board
+        if x < 0 or x >= size or y < 0 or y >= size:
+            return None  # Signal that snake left the board
+
+        cell = y * size + x
+        occupancy = self.occupancy
+        self.body.appendleft(cell)
+        if not occupancy[cell]:
+            self.free.remove(cell)
+        occupancy[cell] += 1
+
+        if self.grow_count > 0:
+            self.grow_count -= 1
+        else:
+            tail = self.body.pop()
+            occupancy[tail] -= 1
+            if not occupancy[tail]:
+                self.free.add(tail)
+
+        self._bits_stale = True
+        self.moves += 1
+        return self.cell_pos[cell]
+
+    def grow(self, amount=1):
+        self.grow_count += amount
+
+    def truncate(self, length):
+        # Keep the first `length` segments (head side). Each pop undoes one
+        # earlier move, so this is O(1) amortized.
+        body = self.body
+        occupancy = self.occupancy
+        while len(body) > length:
+            tail = body.pop()
+            occupancy[tail] -= 1
+            if not occupancy[tail]:
+                self.free.add(tail)
+        self._bits_stale = True
+
+    @property
+    def bits(self):
+        # The occupied cells as a Bitboard, built from `occupancy` when asked
+        # for after the body changed. Updating it on every move would copy a
+        # board-sized int each time, O(cells) per move on big boards.
+        bits = self._bits
+        if self._bits_stale:
+            # One byte per cell -> '0' or '1', cell 0 as the lowest bit
+            bits.body = int(self.occupancy.translate(_OCCUPIED_DIGITS)[::-1], 2)
+            self._bits_stale = False
+        return bits
+
+    def check_collision(self):
+        return self.occupancy[self.body[0]] > 1
+
+    def change_direction(self, new_direction):
+        # Prevent going back into yourself
+        if (new_direction[0] * -1, new_direction[1] * -1) != self.direction:
+            self.direction = new_direction
+
+    def snapshot(self):
+        # Everything needed to resume exactly, free-cell order included,
+        # since the order decides where the next food lands
+        return (tuple(self.body), bytes(self.occupancy), self.free.cells[:],
+                self.free.slots[:], self.direction, self.grow_count,
+                self.rainbow_mode, self.moves)
+
+    def restore(self, state):
+        (body, occupancy, cells, slots, self.direction,
+         self.grow_count, self.rainbow_mode, self.moves) = state
+        self._bits_stale = True
+        self.body.clear()
+        self.body.extend(body)
+        self.occupancy[:] = occupancy
+        self.free.cells[:] = cells
+        self.free.slots[:] = slots
+
+
+class Food:
+    def __init__(self, grid_size=GRID_SIZE, rng=None):
+        self.grid_size = grid_size
+        self.rng = rng if rng is not None else random.Random()
+        self.position = None
+        self.type = "normal"
+        self.timer = 0
+        self.lifespan = 0
+        self.spawn()
+
+    def spawn(self, free=None):
+        # With `free` (a FreeCells), one uniform draw over the empty cells;
+        # returns False when there are none left
+        if free is None:
+            self.position = (self.rng.randint(0, self.grid_size - 1),
+                             self.rng.randint(0, self.grid_size - 1))
+        elif free:
+            self.position = cell_positions(self.grid_size)[free.choice(self.rng)]
+        else:
+            self.position = None
+            return False
+
+        # Different food types with different rarities
+        rand = self.rng.random()
+        if rand < 0.6:  # 60% normal apple
+            self.type = "apple"
+            self.lifespan = -1  # Never expires
+        elif rand < 0.8:  # 20% golden apple
+            self.type = "golden"
+            self.lifespan = -1
+        elif rand < 0.9:  # 10% speed fruit
+            self.type = "speed"
+            self.lifespan = 300  # 5 seconds at 60 FPS
+        elif rand < 0.95:  # 5% ghost fruit
+            self.type = "ghost"
+            self.lifespan = 180  # 3 seconds
+        else:  # 5% bomb (avoid this!)
+            self.type = "bomb"
+            self.lifespan = 240  # 4 seconds
+
+        self.timer = 0
+        return True
+
+    def update(self):
+        if self.lifespan > 0:
+            self.timer += 1
+            if self.timer >= self.lifespan:
+                return True  # Signal to respawn
+        return False
+
+    @property
+    def special(self):
+        return self.type != "apple"
+
+    def snapshot(self):
+        return (self.position, self.type, self.timer, self.lifespan)
+
+    def restore(self, state):
+        self.position, self.type, self.timer, self.lifespan = state
+
+
+class FixedTimestep:
+    # Turns real frame times into a whole number of logic ticks. Leftover
+    # time carries to the next frame, and `alpha` is how far the frame
+    # sits between the last tick and the next, for interpolated drawing.
+    def __init__(self, tick_ms=TICK_MS, max_ticks=MAX_CATCHUP_TICKS):
+        self.tick_ms = tick_ms
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.dropped = 0  # Ticks skipped to keep a slow machine responsive
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        # Number of ticks to run for a frame that took `elapsed_ms`
+        self.accumulator += elapsed_ms
+        ticks = int(self.accumulator // self.tick_ms)
+        if ticks > self.max_ticks:
+            # Don't spiral trying to catch up: run the cap and let the rest go
+            self.dropped += ticks - self.max_ticks
+            ticks = self.max_ticks
+            self.accumulator %= self.tick_ms
+        else:
+            self.accumulator -= ticks * self.tick_ms
+        return ticks
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.tick_ms
+
+
+class TurnQueue:
+    # Direction key presses waiting for the snake's next moves, one turn
+    # taken per move. Each press is checked against the direction queued
+    # before it rather than the one the snake has now, so a quick up-left
+    # while heading right becomes two turns instead of a reversal, and taps
+    # between moves aren't lost. Times are whatever clock the caller uses.
+    def __init__(self, capacity=TURN_QUEUE_SIZE, samples=LATENCY_SAMPLES):
+        self.capacity = capacity
+        self.pending = deque()  # (direction, time pressed)
+        self.latencies = deque(maxlen=samples)  # Press to the move that made the turn
+        self.dropped = 0  # Presses that found the queue full
+
+    def __len__(self):
+        return len(self.pending)
+
+    def clear(self):
+        self.pending.clear()
+
+    def push(self, direction, current, when):
+        # Queue a turn from `current`, the snake's direction now; False if
+        # it wouldn't change the direction it follows or there is no room
+        last = self.pending[-1][0] if self.pending else current
+        if direction == last or direction == (-last[0], -last[1]):
+            return False
+        if len(self.pending) >= self.capacity:
+            self.dropped += 1
+            return False
+        self.pending.append((direction, when))
+        return True
+
+    def pop(self, now):
+        # The next turn, for the tick that moves the snake; None if empty
+        if not self.pending:
+            return None
+        direction, when = self.pending.popleft()
+        self.latencies.append(now - when)
+        return direction
+
+    def latency(self, fraction):
+        # Latency at `fraction` (0.5 for the median) of the kept samples
+        samples = sorted(self.latencies)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] if samples else 0.0
+
+
+class Engine:
+    def __init__(self, grid_size=GRID_SIZE, seed=None):
+        self.grid_size = grid_size
+        # Every random draw in the rules comes from this, so a game is fully
+        # determined by its seed and the turns made on each tick
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.snake = Snake(grid_size)
+        self.food = Food(grid_size, self.rng)
+        self.score = 0
+        self.move_timer = 0
+        self.move_delay = MOVE_DELAY  # ticks
+        self.speed_boost_timer = 0
+        self.ghost_mode_timer = 0
+        self.game_over = False
+        self.death_cause = None
+        self.ticks = 0
+
+    def reset(self, seed=None):
+        # Each game gets its own seed, picked at random unless given
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng.seed(self.seed)
+        self.snake.reset()
+        self.food.spawn(self.snake.free)
+        self.score = 0
+        self.move_timer = 0
+        self.move_delay = MOVE_DELAY
+        self.speed_boost_timer = 0
+        self.ghost_mode_timer = 0
+        self.game_over = False
+        self.death_cause = None
+        self.ticks = 0
+
+    def turn(self, direction):
+        # Steer the snake; True if its direction actually changed
+        old = self.snake.direction
+        self.snake.change_direction(direction)
+        return self.snake.direction != old
+
+    def tick(self):
+        # One fixed logic tick; a speed boost makes moves come twice as fast
+        events = []
+        if self.game_over:
+            return events
+        self.ticks += 1
+
+        self.move_timer += self._move_step()
+        if self.move_timer >= self.move_delay:
+            # Keep the remainder so fractional delays average out exactly
+            self.move_timer -= self.move_delay
+            if not self._move(events):
+                return events
+
+        self._tick_timers(events)
+        return events
+
+    @property
+    def move_due(self):
+        # True if the next tick moves the snake, so policies only decide then
+        return self.move_timer + self._move_step() >= self.move_delay
+
+    def _move_step(self):
+        return 2 if self.speed_boost_timer > 0 else 1
+
+    def bitboard(self):
+        # The board as bitboards (body, food, walls) for renderers, spawners
+        # and agents: the snake's, brought up to date, with the food filled in
+        bits = self.snake.bits
+        position = self.food.position
+        bits.food = 0 if position is None else bits.bit(*position)
+        return bits
+
+    def step(self, action=None):
+        # Headless step: one tick in which the snake always moves
+        events = []
+        if self.game_over:
+            return events
+        if action is not None:
+            self.snake.change_direction(action)
+        self.ticks += 1
+
+        self.move_timer = 0
+        if self._move(events):
+            self._tick_timers(events)
+        return events
+
+    def snapshot(self):
+        # Full game state, for seeking in replays
+        return (self.snake.snapshot(), self.food.snapshot(), self.rng.getstate(),
+                self.seed, self.score, self.move_timer, self.move_delay,
+                self.speed_boost_timer, self.ghost_mode_timer, self.game_over,
+                self.death_cause, self.ticks)
+
+    def restore(self, state):
+        (snake, food, rng, self.seed, self.score, self.move_timer, self.move_delay,
+         self.speed_boost_timer, self.ghost_mode_timer, self.game_over,
+         self.death_cause, self.ticks) = state
+        self.snake.restore(snake)
+        self.food.restore(food)
+        self.rng.setstate(rng)
+
+    def _end(self, events, cause):
+        if self.game_over:
+            return
+        self.game_over = True
+        self.death_cause = cause
+        events.append(_WIN_SOUND if cause == BOARD_FULL else _DEATH_SOUND)
+        events.append((EVENT_GAME_OVER, cause))
+
+    def _move(self, events):
+        snake = self.snake
+        food = self.food
+        head = snake.move()
+
+        # Check if snake left the board
+        if head is None:
+            self._end(events, DEATH_WALL)
+            return False
+        events.append(_MOVE_SOUND)
+
+        # Check food collision
+        if head == food.position:
+            food_type = food.type
+            points, growth, sound = FOOD_EFFECTS[food_type]
+            events.append((EVENT_EAT, food_type, head))
+            events.append((EVENT_SOUND, sound))
+            if growth:
+                snake.grow(growth)
+
+            if food_type == "bomb":
+                # Bomb hurts! Lose score and length
+                self.score = max(0, self.score + points)
+                if len(snake.positions) > 3:
+                    snake.truncate(len(snake.positions) // 2)
+            else:
+                self.score += points
+            if food_type == "golden":
+                snake.rainbow_mode = True
+            elif food_type == "speed":
+                self.speed_boost_timer = SPEED_BOOST_TICKS
+            elif food_type == "ghost":
+                self.ghost_mode_timer = GHOST_MODE_TICKS
+            if food_type != "apple":
+                events.append((EVENT_PARTICLES, food_type, head))
+
+            if not self._respawn_food(events):
+                return False
+
+            # Speed up game (except for bombs)
+            if food.type != "bomb":
+                self.move_delay = max(MIN_MOVE_DELAY, self.move_delay - MOVE_SPEEDUP)
+
+        # Check self collision (unless in ghost mode)
+        if self.ghost_mode_timer <= 0 and snake.check_collision():
+            self._end(events, DEATH_SELF)
+        return True
+
+    def _respawn_food(self, events):
+        # Spawn food away from snake; filling the whole board wins the game
+        if self.food.spawn(self.snake.free):
+            return True
+        self._end(events, BOARD_FULL)
+        return False
+
+    def _tick_timers(self, events):
+        # Update food timer
+        if self.food.update():
+            self._respawn_food(events)
+
+        # Update power-up timers
+        if self.speed_boost_timer > 0:
+            self.speed_boost_timer -= 1
+
+        if self.ghost_mode_timer > 0:
+            self.ghost_mode_timer -= 1
@@ -0,0 +1,272 @@
+import random
+
+import numpy as np
+
+from snake_batch import FOOD_TYPES, NO_ACTION
+from snake_engine import (GRID_SIZE, DIRECTIONS, EVENT_EAT, GHOST_MODE_TICKS,
+                          SPEED_BOOST_TICKS, Engine)
+
+# Gymnasium-style environment over the headless Engine, for training agents:
+#
+#   env = SnakeEnv()
+#   observation, info = env.reset(seed=1)
+#   observation, reward, terminated, truncated, info = env.step(action)
+#
+# Every step moves the snake once (Engine.step). Actions are indices into
+# DIRECTIONS, or NO_ACTION to keep going; the reward is the change in score.
+#
+# The observation is one preallocated float32 array of CHANNELS planes,
+# updated in place: each step rewrites only the cells that changed, so
+# nothing is allocated and no tuples are converted. The same array comes
+# back from every call; copy it to keep one. With pixels=True the
+# observation is instead an (height, width, RGB) view straight into a
+# pygame surface, which needs no display.
+#
+# SnakeVecEnv steps several of these, all writing into one shared buffer.
+
+CHANNELS = ("body", "head") + tuple(f"food_{name}" for name in FOOD_TYPES) + ("ghost", "speed")
+BODY, HEAD = 0, 1
+FOOD = 2  # food_apple; the food channels follow in FOOD_TYPES order
+GHOST = FOOD + len(FOOD_TYPES)  # Ghost mode time left, 1.0 when it starts
+SPEED = GHOST + 1  # Speed boost time left, 1.0 when it starts
+ACTIONS = len(DIRECTIONS)
+PIXEL_CELL_SIZE = 8
+
+_FOOD_CHANNELS = {name: FOOD + i for i, name in enumerate(FOOD_TYPES)}
+
+
+def observation_shape(grid_size=GRID_SIZE):
+    return (len(CHANNELS), grid_size, grid_size)
+
+
+class PixelBoard:
+    # The board drawn by filling cell squares, in the game's colors. Fills
+    # work on a surface that the pixels3d view keeps locked; blits don't.
+    def __init__(self, grid_size, cell_size=PIXEL_CELL_SIZE, surface=None):
+        import pygame
+        import snake_render
+
+        size = grid_size * cell_size
+        if surface is None:
+            surface = pygame.Surface((size, size), depth=32)
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self.surface = surface
+        self.background = snake_render.BLACK
+        self.head = snake_render.GREEN
+        self.body = snake_render.DARK_GREEN
+        self.food = {"apple": snake_render.RED, "golden": snake_render.YELLOW,
+                     "speed": snake_render.CYAN, "ghost": snake_render.WHITE,
+                     "bomb": (80, 0, 0)}
+        # pixels3d is indexed [x, y]; transposed, it reads like an image
+        self.pixels = pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
+        self._rect = pygame.Rect(0, 0, cell_size - 2, cell_size - 2)
+
+    def clear(self):
+        self.surface.fill(self.background)
+
+    def paint(self, cell, color):
+        rect = self._rect
+        y, x = divmod(cell, self.grid_size)
+        rect.topleft = (x * self.cell_size, y * self.cell_size)
+        self.surface.fill(color, rect)
+
+
+class SnakeEnv:
+    def __init__(self, grid_size=GRID_SIZE, max_steps=None, pixels=False,
+                 cell_size=PIXEL_CELL_SIZE, buffer=None, surface=None):
+        # `buffer` (an array of observation_shape) and `surface` let a
+        # caller place the observation; SnakeVecEnv uses them to share one
+        self.grid_size = grid_size
+        self.max_steps = max_steps  # Steps before an episode is truncated
+        self.engine = Engine(grid_size)
+        shape = observation_shape(grid_size)
+        if buffer is None:
+            buffer = np.zeros(shape, dtype=np.float32)
+        elif buffer.shape != shape or not buffer.flags.c_contiguous:
+            raise ValueError(f"buffer must be a contiguous array of shape {shape}")
+        self.grid = buffer
+        self._planes = buffer.reshape(len(CHANNELS), -1)  # Channel, cell
+        self._occupancy = np.frombuffer(self.engine.snake.occupancy, dtype=np.uint8)
+        self.board = PixelBoard(grid_size, cell_size, surface) if pixels else None
+        self.pixels = self.board.pixels if pixels else None
+        self.observation = self.pixels if pixels else self.grid
+        self.steps = 0
+        # What the observation shows, for updating only what changed
+        self._head = None
+        self._food = None  # (cell, food type)
+        self._ghost = 0
+        self._speed = 0
+
+    def reset(self, seed=None, options=None):
+        self.engine.reset(seed)
+        self.steps = 0
+        self._redraw()
+        return self.observation, self._info()
+
+    def step(self, action=None):
+        engine = self.engine
+        body = engine.snake.body
+        old_head = body[0]
+        old_tail = body[-1]
+        score = engine.score
+        direction = None
+        if action is not None and action != NO_ACTION:
+            if not 0 <= action < ACTIONS:
+                raise ValueError(f"action must be 0..{ACTIONS - 1} or NO_ACTION, not {action!r}")
+            direction = DIRECTIONS[action]
+
+        events = engine.step(direction)
+        self.steps += 1
+        if any(event[0] == EVENT_EAT and event[1] == "bomb" for event in events):
+            self._redraw()  # Half the body went at once
+        else:
+            self._update_cell(old_tail)
+            self._update_cell(old_head)
+            self._update_cell(body[0])
+            self._update_food()
+            self._update_timers()
+
+        terminated = engine.game_over
+        truncated = (not terminated and self.max_steps is not None
+                     and self.steps >= self.max_steps)
+        return self.observation, engine.score - score, terminated, truncated, self._info()
+
+    def _info(self):
+        engine = self.engine
+        info = {"score": engine.score, "length": len(engine.snake.body)}
+        if engine.game_over:
+            info["death_cause"] = engine.death_cause
+        return info
+
+    def _redraw(self):
+        # Rebuild the whole observation from the engine
+        planes = self._planes
+        planes.fill(0.0)
+        np.minimum(self._occupancy, 1, out=planes[BODY])
+        head = self.engine.snake.body[0]
+        planes[HEAD, head] = 1.0
+        self._head = head
+        self._food = None
+        self._ghost = self._speed = 0
+        if self.board is not None:
+            self.board.clear()
+            for cell in np.flatnonzero(self._occupancy).tolist():
+                self._paint(cell)
+        self._update_food()
+        self._update_timers()
+
+    def _update_cell(self, cell):
+        # Body and head planes (and pixels) for one cell that may have changed
+        planes = self._planes
+        planes[BODY, cell] = self._occupancy[cell] > 0
+        head = self.engine.snake.body[0]
+        if cell == head and self._head != head:
+            planes[HEAD, self._head] = 0.0
+            planes[HEAD, head] = 1.0
+            old = self._head
+            self._head = head
+            if self.board is not None:
+                self._paint(old)
+        if self.board is not None:
+            self._paint(cell)
+
+    def _update_food(self):
+        food = self.engine.food
+        position = food.position
+        current = None if position is None else (position[1] * self.grid_size + position[0],
+                                                 food.type)
+        if current == self._food:
+            return
+        if self._food is not None:
+            cell, food_type = self._food
+            self._planes[_FOOD_CHANNELS[food_type], cell] = 0.0
+            self._food = None
+            if self.board is not None:
+                self._paint(cell)
+        if current is not None:
+            cell, food_type = current
+            self._planes[_FOOD_CHANNELS[food_type], cell] = 1.0
+            self._food = current
+            if self.board is not None:
+                self._paint(cell)
+
+    def _update_timers(self):
+        engine = self.engine
+        if engine.ghost_mode_timer != self._ghost:
+            self._ghost = engine.ghost_mode_timer
+            self._planes[GHOST].fill(self._ghost / GHOST_MODE_TICKS)
+        if engine.speed_boost_timer != self._speed:
+            self._speed = engine.speed_boost_timer
+            self._planes[SPEED].fill(self._speed / SPEED_BOOST_TICKS)
+
+    def _paint(self, cell):
+        board = self.board
+        if cell == self._head:
+            board.paint(cell, board.head)
+        elif self._occupancy[cell]:
+            board.paint(cell, board.body)
+        elif self._food is not None and cell == self._food[0]:
+            board.paint(cell, board.food[self._food[1]])
+        else:
+            board.paint(cell, board.background)
+
+
+class SnakeVecEnv:
+    # `num_envs` SnakeEnvs whose observations are slices of one array (and,
+    # with pixels, sub-surfaces of one surface), stepped together. A board
+    # whose episode ends is reset in the same step; final_score and
+    # final_length keep the ended episode's results for those boards, as
+    # BatchEngine does. Every returned array is reused by the next call.
+    def __init__(self, num_envs, grid_size=GRID_SIZE, max_steps=None, pixels=False,
+                 cell_size=PIXEL_CELL_SIZE):
+        self.num_envs = num_envs
+        self.grid = np.zeros((num_envs,) + observation_shape(grid_size), dtype=np.float32)
+        surfaces = [None] * num_envs
+        self.pixels = None
+        if pixels:
+            import pygame
+
+            size = grid_size * cell_size
+            self.surface = pygame.Surface((size, size * num_envs), depth=32)
+            surfaces = [self.surface.subsurface((0, i * size, size, size))
+                        for i in range(num_envs)]
+        self.envs = [SnakeEnv(grid_size, max_steps, pixels, cell_size, self.grid[i], surfaces[i])
+                     for i in range(num_envs)]
+        if pixels:
+            # Stacked board images: (num_envs, height, width, RGB), no copy
+            self.pixels = pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2).reshape(
+                num_envs, size, size, 3)
+        self.observation = self.pixels if pixels else self.grid
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.final_score = np.zeros(num_envs, dtype=np.int64)
+        self.final_length = np.zeros(num_envs, dtype=np.int64)
+        self.episodes = np.zeros(num_envs, dtype=np.int64)
+        self._seeds = random.Random()
+
+    def reset(self, seed=None):
+        # Board i starts from seed + i; later episodes draw their seeds
+        # from a generator seeded with `seed`
+        self._seeds.seed(seed)
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+        self.episodes[:] = 0
+        return self.observation, {}
+
+    def step(self, actions):
+        rewards = self.rewards
+        terminated = self.terminated
+        truncated = self.truncated
+        for i, env in enumerate(self.envs):
+            _, reward, ended, cut, info = env.step(actions[i])
+            rewards[i] = reward
+            terminated[i] = ended
+            truncated[i] = cut
+            if ended or cut:
+                self.final_score[i] = info["score"]
+                self.final_length[i] = info["length"]
+                self.episodes[i] += 1
+                env.reset(self._seeds.getrandbits(32))
+        return self.observation, rewards, terminated, truncated, {}
@@ -0,0 +1,127 @@
+import numpy as np
+import pygame
+
+# Particle effects as a preallocated struct-of-arrays pool. Live particles
+# are packed at the front of the arrays, so integration and culling are a
+# handful of NumPy ops, and drawing blits cached circle sprites.
+
+GRAVITY = 0.5
+DECAY = 0.02  # Life lost per tick
+ALPHA_BUCKETS = 16
+MAX_SIZE = 16  # Sprites are cached for radius 1..MAX_SIZE-1
+
+
+class SpriteCache(dict):
+    # (color index, radius, alpha bucket) -> pre-rendered SRCALPHA circle
+    def __init__(self, palette):
+        super().__init__()
+        self.palette = palette
+
+    def __missing__(self, key):
+        color, size, bucket = key
+        alpha = bucket * 255 // (ALPHA_BUCKETS - 1)
+        surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*self.palette[color], alpha), (size, size), size)
+        self[key] = surf
+        return surf
+
+
+class ParticlePool:
+    def __init__(self, palette, capacity=16384, seed=None):
+        self.palette = list(palette)
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.intp)
+        self.rng = np.random.default_rng(seed)
+        self.sprites = SpriteCache(self.palette)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, count, speed, colors, life):
+        # `colors` are palette entries; a full pool drops the extra particles
+        start = self.count
+        count = min(count, self.capacity - start)
+        if count <= 0:
+            return
+        end = start + count
+        self.pos[start:end] = (x, y)
+        self.vel[start:end] = self.rng.uniform(-speed, speed, (count, 2))
+        self.life[start:end] = life
+        indices = [self.palette.index(color) for color in colors]
+        self.color[start:end] = self.rng.choice(indices, count)
+        self.count = end
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        life = self.life[:n]
+        pos += vel
+        vel[:, 1] += GRAVITY
+        life -= DECAY
+
+        alive = life > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            kept = keep.size
+            self.pos[:kept] = pos[keep]
+            self.vel[:kept] = vel[keep]
+            self.life[:kept] = life[keep]
+            self.color[:kept] = self.color[:n][keep]
+            self.count = kept
+
+    def positions(self, alpha=0.0):
+        # Live positions, `alpha` of the way to where the next tick puts them
+        n = self.count
+        if alpha:
+            return self.pos[:n] + self.vel[:n] * alpha
+        return self.pos[:n]
+
+    def bounds(self, alpha=0.0):
+        # Rect covering every live particle's sprite, or None with none alive
+        n = self.count
+        if not n:
+            return None
+        pos = self.positions(alpha)
+        size = (self.life[:n] * 10)[:, None]
+        low = (pos - size).min(axis=0)
+        high = (pos + size).max(axis=0)
+        left, top = int(low[0]) - 1, int(low[1]) - 1
+        return pygame.Rect(left, top, int(high[0]) - left + 2, int(high[1]) - top + 2)
+
+    def draw(self, surface, alpha=0.0, offset=(0, 0)):
+        # `offset` moves world pixels to surface pixels, for a scrolled view
+        n = self.count
+        if not n:
+            return
+        life = self.life[:n]
+        pos = self.positions(alpha)
+        if offset != (0, 0):
+            pos = pos + offset
+        size = (life * 10).astype(np.intp)
+        # Cull dead-sized particles and the ones that fell off the surface
+        width, height = surface.get_size()
+        x = pos[:, 0]
+        y = pos[:, 1]
+        visible = np.flatnonzero((size > 0) & (size < MAX_SIZE) &
+                                 (x + size > 0) & (x - size < width) &
+                                 (y + size > 0) & (y - size < height))
+        if not visible.size:
+            return
+        size = size[visible]
+        bucket = np.minimum(life[visible] * 255, 255).astype(np.intp) * ALPHA_BUCKETS // 256
+        top_left = (pos[visible] - size[:, None]).astype(np.intp)
+
+        sprites = self.sprites
+        keys = zip(self.color[:n][visible].tolist(), size.tolist(), bucket.tolist())
+        surface.blits(zip(map(sprites.__getitem__, keys), top_left.tolist()),
+                      doreturn=False)
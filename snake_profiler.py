@@ -0,0 +1,190 @@
+import json
+import time
+from array import array
+
+# Per-frame phase timings. Game.run brackets each phase of a frame with
+# start()/end(); the spans go into fixed-size ring buffers (the last few
+# seconds only), so profiling can stay on for a whole session. Disabled,
+# each bracket is one attribute check.
+#
+# The overlay shows p50/p99 frame times and dropped frames; export() writes
+# the buffered spans as Chrome trace events, for chrome://tracing or
+# https://ui.perfetto.dev.
+
+PHASES = ("events", "input", "update", "particles", "draw_menu", "draw_game",
+          "draw_game_over", "present", "audio")
+(PHASE_EVENTS, PHASE_INPUT, PHASE_UPDATE, PHASE_PARTICLES, PHASE_DRAW_MENU,
+ PHASE_DRAW_GAME, PHASE_DRAW_GAME_OVER, PHASE_PRESENT, PHASE_AUDIO) = range(len(PHASES))
+
+FRAME_CAPACITY = 600  # 10 s at 60 FPS
+SPAN_CAPACITY = FRAME_CAPACITY * 16
+DROPPED_FACTOR = 1.5  # A frame this much longer than the budget missed a refresh
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class FrameProfiler:
+    def __init__(self, fps, frame_capacity=FRAME_CAPACITY, span_capacity=SPAN_CAPACITY):
+        self.enabled = False
+        self.budget = 1.0 / fps
+        # Frame ring: start of each frame and the time its work took
+        self.frame_capacity = frame_capacity
+        self.frame_start = array("d", bytes(8 * frame_capacity))
+        self.frame_work = array("d", bytes(8 * frame_capacity))
+        self.frames = 0  # Frames recorded in total; the ring holds the last ones
+        # Span ring: one entry per phase run
+        self.span_capacity = span_capacity
+        self.span_phase = bytearray(span_capacity)
+        self.span_start = array("d", bytes(8 * span_capacity))
+        self.span_end = array("d", bytes(8 * span_capacity))
+        self.span_frame = array("q", bytes(8 * span_capacity))  # Frame each span was in
+        self.spans = 0
+        self.phase_total = [0.0] * len(PHASES)  # Seconds per phase in the span ring
+        self.dropped = 0
+        self._frame_began = 0.0
+        self._origin = time.perf_counter()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.clear()
+        return self.enabled
+
+    def clear(self):
+        self.frames = 0
+        self.spans = 0
+        self.phase_total = [0.0] * len(PHASES)
+        self.dropped = 0
+        self._frame_began = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        # A refresh was missed if this frame started long after the last one
+        if self._frame_began and now - self._frame_began > self.budget * DROPPED_FACTOR:
+            self.dropped += 1
+        self._frame_began = now
+
+    def pause(self):
+        # The loop slept on purpose; the gap before the next frame isn't a
+        # missed refresh
+        self._frame_began = 0.0
+
+    def end_frame(self):
+        if not self.enabled or not self._frame_began:
+            return
+        slot = self.frames % self.frame_capacity
+        self.frame_start[slot] = self._frame_began
+        self.frame_work[slot] = time.perf_counter() - self._frame_began
+        self.frames += 1
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def end(self, phase, started):
+        if not self.enabled or not started:
+            return
+        now = time.perf_counter()
+        slot = self.spans % self.span_capacity
+        if self.spans >= self.span_capacity:
+            # Overwriting the oldest span
+            self.phase_total[self.span_phase[slot]] -= self.span_end[slot] - self.span_start[slot]
+        self.span_phase[slot] = phase
+        self.span_start[slot] = started
+        self.span_end[slot] = now
+        self.span_frame[slot] = self.frames
+        self.phase_total[phase] += now - started
+        self.spans += 1
+
+    def _frame_slots(self):
+        count = min(self.frames, self.frame_capacity)
+        return [(self.frames - count + i) % self.frame_capacity for i in range(count)]
+
+    def _span_slots(self):
+        count = min(self.spans, self.span_capacity)
+        return [(self.spans - count + i) % self.span_capacity for i in range(count)]
+
+    def summary(self):
+        # Frame work p50/p99 and mean time per phase per frame, in ms,
+        # over what the ring buffers hold
+        work = [self.frame_work[slot] * 1000 for slot in self._frame_slots()]
+        phases = self.phase_total
+        # The span ring can reach further back than the frame ring
+        oldest = self.spans % self.span_capacity if self.spans >= self.span_capacity else 0
+        frames = max(1, self.frames - self.span_frame[oldest]) if self.spans else 1
+        return {
+            "frames": self.frames,
+            "p50": _percentile(work, 0.5),
+            "p99": _percentile(work, 0.99),
+            "dropped": self.dropped,
+            "phases": {name: phases[i] * 1000 / frames
+                       for i, name in enumerate(PHASES) if phases[i] > 0},
+        }
+
+    def overlay_lines(self):
+        # Text for the on-screen overlay, heaviest phases first
+        stats = self.summary()
+        lines = [f"FRAME p50 {stats['p50']:.1f} p99 {stats['p99']:.1f} ms",
+                 f"BUDGET {self.budget * 1000:.1f} ms  DROPPED {stats['dropped']}"]
+        for name, ms in sorted(stats["phases"].items(), key=lambda item: -item[1])[:4]:
+            lines.append(f"{name} {ms:.2f} ms")
+        return lines
+
+    def trace_events(self):
+        # The buffered frames and spans as Chrome "complete" events, in
+        # microseconds since the profiler was created
+        origin = self._origin
+        events = []
+        for slot in self._frame_slots():
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": (self.frame_start[slot] - origin) * 1e6,
+                           "dur": self.frame_work[slot] * 1e6})
+        for slot in self._span_slots():
+            start = self.span_start[slot]
+            events.append({"name": PHASES[self.span_phase[slot]], "ph": "X", "pid": 1,
+                           "tid": 1, "ts": (start - origin) * 1e6,
+                           "dur": (self.span_end[slot] - start) * 1e6})
+        events.sort(key=lambda event: (event["ts"], -event["dur"]))
+        return events
+
+    def export(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class StateCPU:
+    # Process CPU time against wall time in each game state, so an idle
+    # screen's cost shows up next to the game's. Cheap enough to stay on:
+    # Game.run calls enter() once per loop with the state it is in.
+    def __init__(self):
+        self.cpu = {}  # State -> seconds of CPU
+        self.wall = {}  # State -> seconds of wall time
+        self._state = None
+        self._cpu_mark = 0.0
+        self._wall_mark = 0.0
+
+    def enter(self, state):
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        if self._state is not None:
+            self.cpu[self._state] = self.cpu.get(self._state, 0.0) + cpu - self._cpu_mark
+            self.wall[self._state] = self.wall.get(self._state, 0.0) + wall - self._wall_mark
+        self._state = state
+        self._cpu_mark = cpu
+        self._wall_mark = wall
+
+    def usage(self, state):
+        # Fraction of one core used while in `state`
+        wall = self.wall.get(state, 0.0)
+        return self.cpu.get(state, 0.0) / wall if wall else 0.0
+
+    def lines(self):
+        return [f"CPU {state} {self.usage(state) * 100:.1f}% over {self.wall[state]:.0f} s"
+                for state in self.wall]
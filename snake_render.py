@@ -0,0 +1,573 @@
+import math
+from array import array
+from collections import deque
+from itertools import islice
+
+import pygame
+
+from snake_text import TextCache
+
+# Board rendering: a cached background layer plus dirty-rectangle redraws of
+# only the cells, food, particles and HUD lines that changed since the last
+# frame. Effects that touch every segment (rainbow, ghost) fall back to a
+# full redraw.
+#
+# Boards bigger than the window scroll: a camera follows the head, the
+# background is assembled from grid tiles a chunk of cells wide, and only
+# what the view shows is drawn, so a frame costs the same on a 1000x1000
+# board with a million-segment snake as on a small one.
+
+# Colors - Retro palette
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+DARK_GREEN = (0, 180, 0)
+RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+BLUE = (0, 100, 255)
+PURPLE = (255, 0, 255)
+CYAN = (0, 255, 255)
+ORANGE = (255, 165, 0)
+GRID_COLOR = (20, 20, 20)
+
+FOOD_BAR_SPACE = 5  # The food timer bar sits this far above the cell
+FULL_REDRAW_AREA = 0.5  # Dirty area (fraction of the screen) worth a flip
+CHUNK_CELLS = 8  # Background tiles are this many cells square
+DEAD_ZONE = 0.25  # The camera holds still while the head is this far inside the view
+
+RAINBOW_PERIOD = 18  # Rainbow hues step 20 degrees per segment
+ROOM_COLORS = (BLUE, PURPLE, ORANGE, YELLOW)  # Other players' snakes, by player id
+
+
+def _hue_lut():
+    # Hue in whole degrees -> RGB at full saturation and half lightness
+    lut = []
+    for hue in range(360):
+        color = pygame.Color(0)
+        color.hsla = (hue, 100, 50, 100)
+        lut.append(tuple(color)[:3])
+    return tuple(lut)
+
+
+HUE_LUT = _hue_lut()
+
+_tiles = {}
+
+
+def background_tile(cell_size, origin, size, board_size):
+    # Grid lines for one chunk of the board at world pixel `origin`, plus
+    # whatever part of the red border runs through it. Every chunk away from
+    # the edges shares one surface.
+    board_width, board_height = board_size
+    x, y = origin
+    width, height = size
+    edges = (x == 0, y == 0, x + width >= board_width, y + height >= board_height)
+    key = (cell_size, size, edges)
+    surf = _tiles.get(key)
+    if surf is None:
+        surf = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        surf.fill(BLACK)
+        for line_x in range(0, width, cell_size):
+            pygame.draw.line(surf, GRID_COLOR, (line_x, 0), (line_x, height))
+        for line_y in range(0, height, cell_size):
+            pygame.draw.line(surf, GRID_COLOR, (0, line_y), (width, line_y))
+        # The border of the whole board, shifted so this chunk's part lands
+        left = 0 if edges[0] else -cell_size
+        top = 0 if edges[1] else -cell_size
+        right = width if edges[2] else width + cell_size
+        bottom = height if edges[3] else height + cell_size
+        pygame.draw.rect(surf, RED, (left, top, right - left, bottom - top), 3)
+        _tiles[key] = surf
+    return surf
+
+
+class Camera:
+    # Top-left world pixel of the view. A board that fits the view is
+    # centered in it; a bigger one scrolls just enough to keep the point
+    # being followed out of the outer DEAD_ZONE of the view, so the picture
+    # only moves when it has to.
+    def __init__(self, view_size, board_size):
+        self.view_size = tuple(view_size)
+        self.board_size = tuple(board_size)
+        self.x = 0
+        self.y = 0
+
+    def center_on(self, x, y):
+        self.x = self._clamp(x - self.view_size[0] // 2, 0)
+        self.y = self._clamp(y - self.view_size[1] // 2, 1)
+
+    def follow(self, x, y):
+        # True if the camera moved
+        old = (self.x, self.y)
+        self.x = self._clamp(self._track(x, self.x, self.view_size[0]), 0)
+        self.y = self._clamp(self._track(y, self.y, self.view_size[1]), 1)
+        return (self.x, self.y) != old
+
+    @staticmethod
+    def _track(pos, start, view):
+        margin = int(view * DEAD_ZONE)
+        if pos < start + margin:
+            return pos - margin
+        if pos >= start + view - margin:
+            return pos - view + margin + 1
+        return start
+
+    def _clamp(self, start, axis):
+        view = self.view_size[axis]
+        board = self.board_size[axis]
+        if board <= view:
+            return (board - view) // 2
+        return min(max(start, 0), board - view)
+
+
+class SegmentSprites(dict):
+    # color -> a segment-sized surface filled with it. These are plain
+    # surfaces, so ghost mode sets a surface alpha instead of needing one
+    # translucent copy per alpha level.
+    def __init__(self, cell_size):
+        super().__init__()
+        self.size = cell_size - 2
+
+    def __missing__(self, color):
+        surf = pygame.Surface((self.size, self.size))
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert()
+        surf.fill(color)
+        self[color] = surf
+        return surf
+
+
+class BoardRenderer:
+    def __init__(self, screen, grid_size, cell_size, font, text_cache=None):
+        self.screen = screen
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self.font = font
+        self.text_cache = text_cache if text_cache is not None else TextCache()
+        self.screen_rect = screen.get_rect()
+        board = grid_size * cell_size
+        self.camera = Camera(self.screen_rect.size, (board, board))
+        # The background tiles under the view, put together again whenever
+        # the camera moves
+        self.background = pygame.Surface(self.screen_rect.size)
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self._background_at = None
+        self._sprites = SegmentSprites(cell_size)
+        self._alphas = {}  # Alpha each sprite is set to right now
+        # The ghost food, drawn once opaque; its fade is a surface alpha
+        size = cell_size - 2
+        self._ghost_food = pygame.Surface((size, size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self._ghost_food = self._ghost_food.convert_alpha()
+        pygame.draw.circle(self._ghost_food, WHITE, (size // 2, size // 2), size // 2)
+
+        # What is on screen right now, for working out the next frame's
+        # damage. `_stamp` is the move on which the head last entered each
+        # cell, so the segment there is number moves - stamp from the head.
+        self._body = deque()
+        self._stamp = array("q", bytes(8 * grid_size * grid_size))
+        self._moves = 0
+        self._tracking = False
+        self._following = False  # draw_room's camera is on our snake
+        self._direction = None
+        self._food_rect = None
+        self._particle_rect = None
+        self._hud = []  # (text, color, surface, rect)
+        self._valid = False
+
+    def invalidate(self):
+        # Something else drew over the board; the next frame redraws it all
+        self._valid = False
+
+    def reset(self):
+        # A new game: start tracking the body afresh, camera on the head
+        self._valid = False
+        self._tracking = False
+        self._following = False
+
+    def draw(self, snake, food, particles, hud, ghost=False, interp=0.0):
+        # Draws one frame, `interp` of a tick past the last simulation tick.
+        # Returns the dirty rects for display.update, or None after a full
+        # redraw that needs display.flip.
+        special = ghost or snake.rainbow_mode
+        changed = self._track(snake)
+        head = self._center(snake.body[0])
+        if changed is None:
+            self.camera.center_on(*head)
+        else:
+            self.camera.follow(*head)
+        if (self.camera.x, self.camera.y) != self._background_at:
+            self._compose_background()
+            self._valid = False  # Everything on screen moved
+
+        rects = None
+        if self._valid and not special and changed is not None:
+            rects = self._draw_dirty(snake, food, particles, hud, interp, changed)
+        if rects is None:
+            self._draw_full(snake, food, particles, hud, ghost, interp)
+        self._direction = snake.direction
+        self._food_rect = self._food_region(food)
+        self._particle_rect = self._particle_region(particles, interp)
+        # A frame full of translucent or rainbow segments can't be patched
+        self._valid = not special
+        return rects
+
+    def draw_room(self, players, foods, me, hud):
+        # A multiplayer frame from a RoomView: every snake in the room, ours
+        # (player `me`) in green with the camera on it. The server's deltas
+        # don't say which cells changed on screen, so it is always a full
+        # redraw; returns None for display.flip.
+        player = players.get(me)
+        if player is not None and player.body:
+            head = self._center(player.body[0])
+            if self._following:
+                self.camera.follow(*head)
+            else:
+                self.camera.center_on(*head)
+        # After a death the camera jumps to wherever the snake respawns
+        self._following = player is not None and bool(player.body)
+        if (self.camera.x, self.camera.y) != self._background_at:
+            self._compose_background()
+        self.screen.blit(self.background, (0, 0))
+
+        x0, y0, x1, y1 = self._cell_range(self.screen_rect)
+        grid = self.grid_size
+        size = self.cell_size
+        left = self.camera.x
+        top = self.camera.y
+        blits = []
+        for other in players.values():
+            if not other.body:
+                continue
+            if other.id == me:
+                body, head = self._sprite(DARK_GREEN, None), self._sprite(GREEN, None)
+            else:
+                body = self._sprite(ROOM_COLORS[other.id % len(ROOM_COLORS)], None)
+                head = self._sprite(WHITE, None)
+            sprite = head
+            for cell in other.body:
+                y, x = divmod(cell, grid)
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    blits.append((sprite, (x * size - left, y * size - top)))
+                sprite = body
+        self.screen.blits(blits, doreturn=False)
+        for food in foods:
+            if food.position is not None and self.screen_rect.colliderect(self._food_region(food)):
+                self._draw_food(food)
+        self._draw_hud(hud, None)
+        # Whatever draws next over this frame starts from a full redraw
+        self._valid = False
+        return None
+
+    def _track(self, snake):
+        # Bring the drawn copy of the body up to date. The body only ever
+        # gains cells at the head and loses them at the tail, so replaying
+        # that finds every changed cell; None if it had to start over.
+        body = snake.body
+        moves = snake.moves
+        moved = moves - self._moves
+        self._moves = moves
+        stamp = self._stamp
+        if not self._tracking or moved < 0 or moved > len(body):
+            self._tracking = True
+            self._body = deque(body)
+            last = len(body) - 1
+            for index, cell in enumerate(reversed(body)):
+                stamp[cell] = moves - last + index
+            return None
+
+        drawn = self._body
+        cells = set()
+        if moved:
+            cells.add(drawn[0])  # The old head loses its eyes
+            new_cells = list(islice(body, moved))
+            drawn.extendleft(reversed(new_cells))
+            cells.update(new_cells)
+            for index in range(moved - 1, -1, -1):
+                stamp[new_cells[index]] = moves - index
+        while len(drawn) > len(body):
+            cells.add(drawn.pop())
+        if snake.direction != self._direction:
+            cells.add(body[0])
+        return cells
+
+    def _center(self, cell):
+        # World pixel at the middle of a cell
+        size = self.cell_size
+        y, x = divmod(cell, self.grid_size)
+        return x * size + size // 2, y * size + size // 2
+
+    def _compose_background(self):
+        camera = self.camera
+        size = self.cell_size
+        chunk = CHUNK_CELLS * size
+        board = self.grid_size * size
+        width, height = self.screen_rect.size
+        tiles = []
+        for y in range(max(0, camera.y) // chunk * chunk,
+                       min(board, camera.y + height), chunk):
+            for x in range(max(0, camera.x) // chunk * chunk,
+                           min(board, camera.x + width), chunk):
+                tile = background_tile(size, (x, y), (min(chunk, board - x), min(chunk, board - y)),
+                                       (board, board))
+                tiles.append((tile, (x - camera.x, y - camera.y)))
+        self.background.fill(BLACK)
+        self.background.blits(tiles, doreturn=False)
+        self._background_at = (camera.x, camera.y)
+
+    def _cell_range(self, rect):
+        # Board cells (x0, y0, x1, y1) under a screen rect, clipped to the
+        # board; empty when x0 > x1 or y0 > y1
+        size = self.cell_size
+        last = self.grid_size - 1
+        x = self.camera.x
+        y = self.camera.y
+        return (max(0, (rect.left + x) // size), max(0, (rect.top + y) // size),
+                min(last, (rect.right - 1 + x) // size), min(last, (rect.bottom - 1 + y) // size))
+
+    def _cells_in(self, occupancy, x0, y0, x1, y1, found):
+        # Occupied cells in a block of the board -> their screen position.
+        # A row scan of the occupancy grid, so it costs what the block
+        # covers whatever the size of the board or the snake.
+        grid = self.grid_size
+        size = self.cell_size
+        left = x0 * size - self.camera.x
+        for y in range(y0, y1 + 1):
+            row = y * grid + x0
+            line = occupancy[row:row + x1 - x0 + 1]
+            if line.count(0) == len(line):
+                continue
+            top = y * size - self.camera.y
+            for i, count in enumerate(line):
+                if count:
+                    found[row + i] = (left + i * size, top)
+        return found
+
+    def _draw_full(self, snake, food, particles, hud, ghost, interp):
+        self.screen.blit(self.background, (0, 0))
+        alpha = None
+        if ghost:
+            alpha = 100 + int(155 * abs(math.sin(pygame.time.get_ticks() * 0.01)))
+        cells = self._cells_in(snake.occupancy, *self._cell_range(self.screen_rect), {})
+        head = snake.body[0]
+        if snake.rainbow_mode:
+            # Rainbow effect: segment i has hue i * 20 + ticks / 10, so the
+            # colors repeat every 18 segments and a frame needs only those
+            offset = pygame.time.get_ticks() // 10
+            period = [self._sprite(HUE_LUT[(i * 20 + offset) % 360], alpha)
+                      for i in range(RAINBOW_PERIOD)]
+            moves = snake.moves
+            stamp = self._stamp
+            sprites = [period[(moves - stamp[cell]) % RAINBOW_PERIOD] for cell in cells]
+        else:
+            # Gradient from head to tail
+            body = self._sprite(DARK_GREEN, alpha)
+            sprites = [body] * len(cells)
+            if head in cells:
+                sprites[list(cells).index(head)] = self._sprite(GREEN, alpha)
+        self.screen.blits(zip(sprites, cells.values()), doreturn=False)
+        if head in cells:
+            self._draw_eyes(snake.positions[0], snake.direction, alpha)
+
+        # Draw food (there is none once the snake fills the board)
+        if food.position is not None and self.screen_rect.colliderect(self._food_region(food)):
+            self._draw_food(food)
+        particles.draw(self.screen, interp, (-self.camera.x, -self.camera.y))
+        self._draw_hud(hud, None)
+
+    def _draw_dirty(self, snake, food, particles, hud, interp, cells):
+        size = self.cell_size
+        rects = []
+        for cell in cells:
+            x, y = self._center(cell)
+            rects.append(pygame.Rect(x - size // 2 - self.camera.x, y - size // 2 - self.camera.y,
+                                     size, size))
+        rects.append(self._food_rect)
+        rects.append(self._food_region(food))
+        rects.append(self._particle_rect)
+        rects.append(self._particle_region(particles, interp))
+        hud_rects = self._hud_damage(hud)
+        rects.extend(hud_rects)
+
+        # Snap the damage to whole cells, since segments are redrawn whole,
+        # and take in every HUD line it touches: antialiased text can only be
+        # blitted again over a clean background
+        screen_rect = self.screen_rect
+        rects = [self._snap(rect).clip(screen_rect) for rect in rects if rect is not None]
+        rects = [rect for rect in rects if rect]
+        pending = [line[3] for line in self._hud]
+        touched = True
+        while touched:
+            touched = False
+            for rect in pending:
+                if rect.collidelist(rects) >= 0:
+                    rects.append(self._snap(rect).clip(screen_rect))
+                    pending.remove(rect)
+                    touched = True
+                    break
+        area = sum(rect.width * rect.height for rect in rects)
+        if area > FULL_REDRAW_AREA * screen_rect.width * screen_rect.height:
+            return None
+
+        # Restore the background, then repaint every layer under the damage
+        for rect in rects:
+            self.screen.blit(self.background, rect, rect)
+        self._redraw_cells(snake, rects)
+        if food.position is not None:
+            self._draw_food(food)
+        particles.draw(self.screen, interp, (-self.camera.x, -self.camera.y))
+        self._draw_hud(hud, rects)
+        return rects
+
+    def _snap(self, rect):
+        # Grow a screen rect out to whole cells of the (scrolled) board
+        size = self.cell_size
+        x = self.camera.x
+        y = self.camera.y
+        left = (rect.left + x) // size * size - x
+        top = (rect.top + y) // size * size - y
+        right = -(-(rect.right + x) // size) * size - x
+        bottom = -(-(rect.bottom + y) // size) * size - y
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def _redraw_cells(self, snake, rects):
+        found = {}
+        for rect in rects:
+            x0, y0, x1, y1 = self._cell_range(rect)
+            if x0 <= x1 and y0 <= y1:
+                self._cells_in(snake.occupancy, x0, y0, x1, y1, found)
+
+        head = snake.body[0]
+        body = self._sprite(DARK_GREEN, None)
+        self.screen.blits([(self._sprite(GREEN, None) if cell == head else body, pos)
+                           for cell, pos in found.items()], doreturn=False)
+        if head in found:
+            self._draw_eyes(snake.cell_pos[head], snake.direction, None)
+
+    def _particle_region(self, particles, interp):
+        rect = particles.bounds(interp)
+        return None if rect is None else rect.move(-self.camera.x, -self.camera.y)
+
+    def _sprite(self, color, alpha):
+        # The reusable segment surface for `color`, set to this frame's alpha
+        surf = self._sprites[color]
+        if self._alphas.get(color, -1) != alpha:
+            surf.set_alpha(alpha)
+            self._alphas[color] = alpha
+        return surf
+
+    def _draw_eyes(self, pos, direction, alpha):
+        size = self.cell_size
+        rect = pygame.Rect(pos[0] * size - self.camera.x, pos[1] * size - self.camera.y,
+                           size - 2, size - 2)
+        eye_size = size // 5
+        eye_color = WHITE if alpha is None else (*WHITE, alpha)
+        if direction == (1, 0):  # Right
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.right - eye_size, rect.top + eye_size), eye_size // 2)
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.right - eye_size, rect.bottom - eye_size), eye_size // 2)
+        elif direction == (-1, 0):  # Left
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.left + eye_size, rect.top + eye_size), eye_size // 2)
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.left + eye_size, rect.bottom - eye_size), eye_size // 2)
+        elif direction == (0, -1):  # Up
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.left + eye_size, rect.top + eye_size), eye_size // 2)
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.right - eye_size, rect.top + eye_size), eye_size // 2)
+        else:  # Down
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.left + eye_size, rect.bottom - eye_size), eye_size // 2)
+            pygame.draw.circle(self.screen, eye_color,
+                               (rect.right - eye_size, rect.bottom - eye_size), eye_size // 2)
+
+    def _food_region(self, food):
+        # The food cell plus the timer bar drawn just above it
+        if food.position is None:
+            return None
+        size = self.cell_size
+        return pygame.Rect(food.position[0] * size - self.camera.x,
+                           food.position[1] * size - self.camera.y - FOOD_BAR_SPACE,
+                           size, size + FOOD_BAR_SPACE)
+
+    def _draw_food(self, food):
+        size = self.cell_size
+        screen = self.screen
+        left = food.position[0] * size - self.camera.x
+        top = food.position[1] * size - self.camera.y
+        food_rect = pygame.Rect(left, top, size - 2, size - 2)
+
+        if food.type == "apple":
+            # Normal red apple
+            pygame.draw.rect(screen, RED, food_rect)
+        elif food.type == "golden":
+            # Pulsing golden apple
+            pulse = abs(math.sin(pygame.time.get_ticks() * 0.005))
+            inner = int(size - 2 - pulse * 10)
+            offset = (size - inner) // 2
+            food_rect = pygame.Rect(left + offset, top + offset, inner, inner)
+            pygame.draw.rect(screen, YELLOW, food_rect)
+            pygame.draw.rect(screen, PURPLE, food_rect, 3)
+        elif food.type == "speed":
+            # Blue lightning bolt shape for speed
+            pygame.draw.rect(screen, CYAN, food_rect)
+            bolt_points = [
+                (food_rect.centerx - 5, food_rect.top + 5),
+                (food_rect.centerx + 2, food_rect.centery - 2),
+                (food_rect.centerx - 2, food_rect.centery + 2),
+                (food_rect.centerx + 5, food_rect.bottom - 5)
+            ]
+            pygame.draw.lines(screen, WHITE, False, bolt_points, 3)
+        elif food.type == "ghost":
+            # White ghost shape with fade effect
+            fade = abs(math.sin(pygame.time.get_ticks() * 0.01)) * 0.5 + 0.5
+            self._ghost_food.set_alpha(int(255 * fade))
+            screen.blit(self._ghost_food, food_rect)
+        elif food.type == "bomb":
+            # Red bomb with fuse
+            pygame.draw.circle(screen, (80, 0, 0), food_rect.center, size // 2 - 2)
+            pygame.draw.circle(screen, RED, food_rect.center, size // 2 - 2, 2)
+            # Sparking fuse
+            if food.timer % 10 < 5:
+                spark_pos = (food_rect.centerx + size // 3, food_rect.top)
+                pygame.draw.circle(screen, YELLOW, spark_pos, 3)
+                pygame.draw.circle(screen, ORANGE, spark_pos, 2)
+
+        # Draw timer bar for expiring foods
+        if food.lifespan > 0:
+            time_left = (food.lifespan - food.timer) / food.lifespan
+            bar_rect = pygame.Rect(left, top - FOOD_BAR_SPACE, int(size * time_left), 3)
+            bar_color = GREEN if time_left > 0.5 else YELLOW if time_left > 0.25 else RED
+            pygame.draw.rect(screen, bar_color, bar_rect)
+
+    def _hud_damage(self, hud):
+        # Re-render only the HUD lines whose text or color changed
+        old = self._hud
+        new = []
+        damage = []
+        for i, (text, color, pos) in enumerate(hud):
+            if i < len(old) and old[i][0] == text and old[i][1] == color:
+                surface = old[i][2]
+            else:
+                surface = self.text_cache.render(self.font, text, color)
+            rect = surface.get_rect(topleft=pos)
+            new.append((text, color, surface, rect))
+            if i >= len(old) or old[i][2] is not surface or old[i][3] != rect:
+                damage.append(rect)
+                if i < len(old):
+                    damage.append(old[i][3])
+        damage.extend(line[3] for line in old[len(hud):])
+        self._hud = new
+        return damage
+
+    def _draw_hud(self, hud, rects):
+        if rects is None:
+            self._hud_damage(hud)
+        for _, _, surface, rect in self._hud:
+            if rects is None or rect.collidelist(rects) >= 0:
+                self.screen.blit(surface, rect)
@@ -0,0 +1,220 @@
+import argparse
+import os
+import sys
+import time
+from bisect import bisect_left
+
+from snake_engine import DIRECTIONS, Engine
+
+# Deterministic replays. A game is fully determined by its seed and the
+# ticks on which the snake turned, so a replay stores just those, packed as
+# varints:
+#
+#   magic "SNKR", version byte,
+#   varint grid_size, seed, turn count,
+#   per turn: varint (ticks since the previous turn << 2 | direction index),
+#   varint end tick, final score, final length
+#
+# Playback runs Engine.tick as fast as it will go and can check the result
+# against the recorded score. Snapshots taken every SNAPSHOT_INTERVAL ticks
+# make seeking cheap.
+
+MAGIC = b"SNKR"
+VERSION = 1
+SNAPSHOT_INTERVAL = 600  # Ticks between seek snapshots (10 s of play)
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    def __init__(self, grid_size, seed, turns=None, end_tick=0, score=0, length=1):
+        self.grid_size = grid_size
+        self.seed = seed
+        self.turns = turns if turns is not None else []  # (tick, direction)
+        self.end_tick = end_tick
+        self.score = score
+        self.length = length
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _write_varint(out, self.grid_size)
+        _write_varint(out, self.seed)
+        _write_varint(out, len(self.turns))
+        last = 0
+        for tick, direction in self.turns:
+            _write_varint(out, (tick - last) << 2 | DIRECTIONS.index(direction))
+            last = tick
+        _write_varint(out, self.end_tick)
+        _write_varint(out, self.score)
+        _write_varint(out, self.length)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ReplayError("not a replay file")
+        if data[4] != VERSION:
+            raise ReplayError(f"unsupported replay version {data[4]}")
+        grid_size, pos = _read_varint(data, 5)
+        seed, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        turns = []
+        tick = 0
+        for _ in range(count):
+            packed, pos = _read_varint(data, pos)
+            tick += packed >> 2
+            turns.append((tick, DIRECTIONS[packed & 3]))
+        end_tick, pos = _read_varint(data, pos)
+        score, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        return cls(grid_size, seed, turns, end_tick, score, length)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    # Notes every turn the engine accepted, keyed by the tick it preceded
+    def __init__(self):
+        self.replay = None
+
+    def start(self, engine):
+        self.replay = Replay(engine.grid_size, engine.seed)
+
+    def record(self, engine):
+        # Call after Engine.turn returned True; the turn applies to the
+        # next tick the engine runs
+        if self.replay is not None:
+            self.replay.turns.append((engine.ticks, engine.snake.direction))
+
+    def finish(self, engine):
+        replay = self.replay
+        replay.end_tick = engine.ticks
+        replay.score = engine.score
+        replay.length = len(engine.snake.body)
+        self.replay = None
+        return replay
+
+
+class ReplayPlayer:
+    def __init__(self, replay, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.replay = replay
+        self.snapshot_interval = snapshot_interval
+        self.engine = Engine(replay.grid_size)
+        self.engine.reset(replay.seed)
+        self._turn_ticks = [tick for tick, _ in replay.turns]
+        self._next_turn = 0
+        self._snapshots = [self.engine.snapshot()]  # Taken at multiples of the interval
+
+    @property
+    def done(self):
+        return self.engine.game_over or self.engine.ticks >= self.replay.end_tick
+
+    def step(self):
+        # Apply this tick's turns, then run it
+        engine = self.engine
+        turns = self.replay.turns
+        while self._next_turn < len(turns) and turns[self._next_turn][0] == engine.ticks:
+            engine.snake.change_direction(turns[self._next_turn][1])
+            self._next_turn += 1
+        events = engine.tick()
+        if engine.ticks == len(self._snapshots) * self.snapshot_interval:
+            self._snapshots.append(engine.snapshot())
+        return events
+
+    def run(self):
+        # Play to the end at full speed; returns the engine in its final state
+        while not self.done:
+            self.step()
+        return self.engine
+
+    def seek(self, tick):
+        # Jump to `tick` from the nearest snapshot at or before it
+        tick = min(tick, self.replay.end_tick)
+        index = min(tick // self.snapshot_interval, len(self._snapshots) - 1)
+        if self.engine.ticks > tick or self.engine.ticks < index * self.snapshot_interval:
+            self.engine.restore(self._snapshots[index])
+            self._next_turn = bisect_left(self._turn_ticks, self.engine.ticks)
+        while self.engine.ticks < tick and not self.engine.game_over:
+            self.step()
+        return self.engine
+
+    def verify(self):
+        # True if playing to the end reproduces the recorded result
+        engine = self.run()
+        return (engine.score == self.replay.score and
+                len(engine.snake.body) == self.replay.length and
+                engine.ticks == self.replay.end_tick)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or inspect recorded games")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of them")
+    parser.add_argument("--seek", type=int, help="print the state at this tick")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            paths.append(path)
+
+    failed = 0
+    ticks = 0
+    start = time.perf_counter()
+    for path in paths:
+        replay = Replay.load(path)
+        player = ReplayPlayer(replay)
+        if args.seek is not None:
+            engine = player.seek(args.seek)
+            print(f"{path} @ tick {engine.ticks}: score {engine.score}, "
+                  f"length {len(engine.snake.body)}, head {engine.snake.positions[0]}")
+            continue
+        ok = player.verify()
+        ticks += player.engine.ticks
+        if not ok:
+            failed += 1
+            engine = player.engine
+            print(f"{path}: MISMATCH score {engine.score} (recorded {replay.score}), "
+                  f"length {len(engine.snake.body)} (recorded {replay.length}), "
+                  f"tick {engine.ticks} (recorded {replay.end_tick})")
+    elapsed = time.perf_counter() - start
+    if args.seek is None:
+        print(f"{len(paths) - failed}/{len(paths)} replays match "
+              f"({ticks:,} ticks in {elapsed:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,784 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from snake_engine import (GRID_SIZE, DIRECTIONS, LEFT, RIGHT, FOOD_EFFECTS, GHOST_MODE_TICKS,
+                          MAX_CATCHUP_TICKS, MIN_MOVE_DELAY, MOVE_DELAY, MOVE_SPEEDUP,
+                          SPEED_BOOST_TICKS, TICK_RATE, Food, FreeCells, Snake, TurnQueue,
+                          cell_positions)
+from snake_replay import _read_varint, _write_varint
+
+# Authoritative multiplayer. One asyncio process hosts many rooms; each room
+# runs the single-player rules (moves, food effects, timers) for several
+# snakes on one board, where running into any body kills. Every tick of
+# every room runs from one fixed-rate loop, and what changed goes to the
+# room's clients as one delta message:
+#
+#   python snake_server.py --port 7777
+#   python 6.13.25-atari_snake.py --connect 127.0.0.1:7777
+#
+# Messages are framed as a 4-byte little-endian length, then a type byte
+# and varints (as in replays):
+#
+#   client -> server
+#     JOIN   room (0, or a room that is full, = any room with space)
+#     TURN   direction index, sequence number
+#     STATS  (before or instead of JOIN) asks for the server's timings
+#   server -> client
+#     WELCOME  room, your player id
+#     SNAPSHOT tick, grid size, players (id, alive, score, body cells
+#              head first), foods (cell + 1 or 0, type)
+#     DELTA    tick, changed players (id, flags, then per flag: spawn
+#              cell, new head cell, tail cells dropped, zigzag score change),
+#              changed foods (index, cell + 1 or 0, type)
+#     ACK      the sequence number of your last TURN, once the move it
+#              queued for has been made. A TURN that changes nothing, finds
+#              the turn queue full or is cut short by a death is never acked.
+#     STATS    JSON
+#
+# A body only gains cells at the head and loses them at the tail, so a
+# delta names the new head and how many tail cells went, never the body.
+# A tick where nothing moved sends nothing.
+
+PORT = 7777
+ROOM_PLAYERS = 4
+ROOM_FOODS = 3
+RESPAWN_TICKS = TICK_RATE  # A dead snake is back on the board a second later
+MAX_BUFFERED = 256 * 1024  # A client this far behind on reading is dropped
+MAX_MESSAGE = 16 * 1024 * 1024  # Room for the SNAPSHOT of a full MAX_GRID_SIZE board
+TICK_SAMPLES = TICK_RATE * 60  # Tick timings kept for STATS
+
+MSG_JOIN, MSG_TURN, MSG_STATS, MSG_WELCOME, MSG_SNAPSHOT, MSG_DELTA, MSG_ACK = range(7)
+
+# Delta flags
+MOVED = 1
+POPPED = 2
+SCORED = 4
+SPAWNED = 8
+DIED = 16
+LEFT_ROOM = 32
+
+FOOD_TYPES = tuple(FOOD_EFFECTS)
+_HEADER = struct.Struct("<I")
+
+
+def frame(kind, body=b""):
+    return _HEADER.pack(len(body) + 1) + bytes((kind,)) + body
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class Player:
+    __slots__ = ("id", "snake", "score", "move_timer", "move_delay", "speed_boost_timer",
+                 "ghost_mode_timer", "alive", "respawn_timer", "input_seq", "acked_seq", "turns",
+                 "turn_seqs")
+
+    def __init__(self, player_id, grid_size):
+        self.id = player_id
+        self.snake = Snake(grid_size)
+        self.score = 0
+        self.move_timer = 0
+        self.move_delay = MOVE_DELAY
+        self.speed_boost_timer = 0
+        self.ghost_mode_timer = 0
+        self.alive = False
+        self.respawn_timer = 0
+        self.input_seq = 0
+        self.acked_seq = 0
+        self.turns = TurnQueue()  # Timed in room ticks
+        self.turn_seqs = deque()  # The sequence number of each queued turn
+
+
+class Room:
+    # The rules for several snakes sharing a board. `board` counts the
+    # segments of every snake on each cell and `free` holds the empty cells,
+    # so spawning food or a snake is one uniform draw as in Engine.
+    def __init__(self, room_id, grid_size=GRID_SIZE, max_players=ROOM_PLAYERS,
+                 food_count=ROOM_FOODS, seed=None):
+        self.id = room_id
+        self.grid_size = grid_size
+        self.max_players = max_players
+        self.rng = random.Random(seed)
+        self.cell_pos = cell_positions(grid_size)
+        self.board = bytearray(grid_size * grid_size)
+        self.free = FreeCells(grid_size * grid_size)
+        self.players = {}
+        self._next_id = 1
+        self.foods = [Food(grid_size, self.rng) for _ in range(food_count)]
+        self._food_cells = [None] * food_count
+        self.ticks = 0
+        # What changed this tick: player id -> [flags, head, popped,
+        # score change, spawn cell], and the indices of foods that moved
+        self._changes = {}
+        self._food_changes = set()
+        for index in range(food_count):
+            self._spawn_food(index)
+        self._food_changes.clear()
+
+    def __len__(self):
+        return len(self.players)
+
+    @property
+    def full(self):
+        return len(self.players) >= self.max_players
+
+    def join(self):
+        player = Player(self._next_id, self.grid_size)
+        self._next_id += 1
+        self.players[player.id] = player
+        self._spawn(player)
+        return player
+
+    def leave(self, player_id):
+        player = self.players.pop(player_id)
+        if player.alive:
+            self._clear_body(player)
+        self._change(player)[0] |= LEFT_ROOM
+
+    def turn(self, player_id, direction, seq=0):
+        # Queued like local key presses, one turn per move, so a quick
+        # up-left while heading right isn't a reversal into the neck. Only
+        # turns that made it into the queue are acked, once they're made.
+        player = self.players[player_id]
+        if player.alive and player.turns.push(DIRECTIONS[direction], player.snake.direction,
+                                              self.ticks):
+            player.turn_seqs.append(seq)
+
+    def tick(self):
+        # One fixed tick for every snake. Moves happen first, then food,
+        # then collisions.
+        self.ticks += 1
+        movers = []
+        for player in list(self.players.values()):
+            if not player.alive:
+                player.respawn_timer -= 1
+                if player.respawn_timer <= 0:
+                    self._spawn(player)
+                continue
+            player.move_timer += 2 if player.speed_boost_timer > 0 else 1
+            if player.move_timer >= player.move_delay:
+                player.move_timer -= player.move_delay
+                direction = player.turns.pop(self.ticks)
+                if direction is not None:
+                    player.snake.change_direction(direction)
+                    player.input_seq = player.turn_seqs.popleft()
+                if self._move(player):
+                    movers.append(player)
+
+        for player in movers:
+            head = player.snake.body[0]
+            for index, cell in enumerate(self._food_cells):
+                if cell == head:
+                    self._eat(player, index)
+                    break
+
+        # Check collisions (unless in ghost mode) against every body. Every
+        # head is checked against the board before anyone's body comes off
+        # it, so two heads meeting both die whatever the order.
+        board = self.board
+        crashed = [player for player in movers
+                   if player.ghost_mode_timer <= 0 and board[player.snake.body[0]] > 1]
+        for player in crashed:
+            self._kill(player)
+
+        for player in self.players.values():
+            if player.speed_boost_timer > 0:
+                player.speed_boost_timer -= 1
+            if player.ghost_mode_timer > 0:
+                player.ghost_mode_timer -= 1
+        for index, food in enumerate(self.foods):
+            if food.update():
+                self._spawn_food(index)
+
+    def snapshot(self):
+        out = bytearray()
+        _write_varint(out, self.ticks)
+        _write_varint(out, self.grid_size)
+        _write_varint(out, len(self.players))
+        for player in self.players.values():
+            _write_varint(out, player.id)
+            out.append(player.alive)
+            _write_varint(out, _zigzag(player.score))
+            body = player.snake.body if player.alive else ()
+            _write_varint(out, len(body))
+            for cell in body:
+                _write_varint(out, cell)
+        self._write_foods(out, range(len(self.foods)))
+        return frame(MSG_SNAPSHOT, out)
+
+    def delta(self):
+        # The DELTA for this tick's changes, or None if there were none;
+        # either way the changes are cleared
+        changes = self._changes
+        food_changes = self._food_changes
+        if not changes and not food_changes:
+            return None
+        out = bytearray()
+        _write_varint(out, self.ticks)
+        _write_varint(out, len(changes))
+        for player_id, (flags, head, popped, score, spawn) in changes.items():
+            if score:
+                flags |= SCORED
+            _write_varint(out, player_id)
+            out.append(flags)
+            if flags & SPAWNED:
+                _write_varint(out, spawn)
+            if flags & MOVED:
+                _write_varint(out, head)
+            if flags & POPPED:
+                _write_varint(out, popped)
+            if flags & SCORED:
+                _write_varint(out, _zigzag(score))
+        self._write_foods(out, sorted(food_changes))
+        changes.clear()
+        food_changes.clear()
+        return frame(MSG_DELTA, out)
+
+    def acks(self):
+        # (player id, sequence number) for inputs that took effect
+        done = []
+        for player in self.players.values():
+            if player.input_seq != player.acked_seq:
+                player.acked_seq = player.input_seq
+                done.append((player.id, player.input_seq))
+        return done
+
+    def _write_foods(self, out, indices):
+        _write_varint(out, len(indices))
+        for index in indices:
+            cell = self._food_cells[index]
+            _write_varint(out, index)
+            _write_varint(out, 0 if cell is None else cell + 1)
+            out.append(FOOD_TYPES.index(self.foods[index].type) if cell is not None else 0)
+
+    def _change(self, player):
+        change = self._changes.get(player.id)
+        if change is None:
+            change = self._changes[player.id] = [0, 0, 0, 0, 0]
+        return change
+
+    def _occupy(self, cell):
+        if not self.board[cell]:
+            self.free.remove(cell)
+        self.board[cell] += 1
+
+    def _vacate(self, cell):
+        self.board[cell] -= 1
+        if not self.board[cell]:
+            self.free.add(cell)
+
+    def _spawn(self, player):
+        # A new snake of one segment on a random empty cell, heading for
+        # the far side of the board; without one it tries again next tick
+        if not self.free:
+            player.respawn_timer = 1
+            return
+        start = self.free.choice(self.rng)
+        snake = player.snake
+        snake.reset(start)
+        snake.direction = RIGHT if start % self.grid_size < self.grid_size // 2 else LEFT
+        self._occupy(start)
+        change = self._change(player)
+        change[3] -= player.score
+        player.score = 0
+        player.move_timer = 0
+        player.move_delay = MOVE_DELAY
+        player.speed_boost_timer = 0
+        player.ghost_mode_timer = 0
+        player.alive = True
+        change[0] |= SPAWNED
+        change[4] = start
+        # A food under the new head would be eaten without a move
+        for index, cell in enumerate(self._food_cells):
+            if cell == start:
+                self._spawn_food(index)
+
+    def _move(self, player):
+        snake = player.snake
+        body = snake.body
+        tail = body[-1]
+        growing = snake.grow_count > 0
+        if snake.move() is None:
+            self._kill(player)  # Left the board
+            return False
+        change = self._change(player)
+        change[0] |= MOVED
+        change[1] = body[0]
+        self._occupy(body[0])
+        if not growing:
+            self._vacate(tail)
+            change[0] |= POPPED
+            change[2] += 1
+        return True
+
+    def _eat(self, player, index):
+        snake = player.snake
+        food_type = self.foods[index].type
+        points, growth, _ = FOOD_EFFECTS[food_type]
+        if growth:
+            snake.grow(growth)
+        change = self._change(player)
+        old_score = player.score
+        if food_type == "bomb":
+            # Bomb hurts! Lose score and length
+            player.score = max(0, player.score + points)
+            if len(snake.body) > 3:
+                self._truncate(player, len(snake.body) // 2)
+        else:
+            player.score += points
+        change[3] += player.score - old_score
+        if food_type == "golden":
+            snake.rainbow_mode = True
+        elif food_type == "speed":
+            player.speed_boost_timer = SPEED_BOOST_TICKS
+        elif food_type == "ghost":
+            player.ghost_mode_timer = GHOST_MODE_TICKS
+        self._spawn_food(index)
+        # Speed up game (except for bombs)
+        if self.foods[index].type != "bomb":
+            player.move_delay = max(MIN_MOVE_DELAY, player.move_delay - MOVE_SPEEDUP)
+
+    def _truncate(self, player, length):
+        body = player.snake.body
+        dropped = len(body) - length
+        for cell in islice(body, length, None):
+            self._vacate(cell)
+        player.snake.truncate(length)
+        change = self._change(player)
+        change[0] |= POPPED
+        change[2] += dropped
+
+    def _clear_body(self, player):
+        for cell in player.snake.body:
+            self._vacate(cell)
+
+    def _kill(self, player):
+        self._clear_body(player)
+        player.turns.clear()  # Never made, so never acked
+        player.turn_seqs.clear()
+        player.alive = False
+        player.respawn_timer = RESPAWN_TICKS
+        self._change(player)[0] |= DIED
+
+    def _spawn_food(self, index):
+        # A free cell no other food is on; a crowded board can leave a food
+        # off until it next respawns
+        food = self.foods[index]
+        self._food_cells[index] = None
+        self._food_changes.add(index)
+        for _ in range(8):
+            if not food.spawn(self.free):
+                return
+            x, y = food.position
+            cell = y * self.grid_size + x
+            if cell not in self._food_cells:
+                self._food_cells[index] = cell
+                return
+        food.position = None
+
+
+class RemotePlayer:
+    __slots__ = ("id", "body", "score", "alive")
+
+    def __init__(self, player_id):
+        self.id = player_id
+        self.body = deque()  # Cells, head first
+        self.score = 0
+        self.alive = False
+
+
+class RemoteFood:
+    # Enough of a Food for BoardRenderer to draw
+    __slots__ = ("position", "type", "timer", "lifespan")
+
+    def __init__(self):
+        self.position = None
+        self.type = "apple"
+        self.timer = 0
+        self.lifespan = -1
+
+
+class RoomView:
+    # A client's copy of a room, kept up to date from SNAPSHOT and DELTA
+    def __init__(self):
+        self.grid_size = GRID_SIZE
+        self.tick = 0
+        self.players = {}
+        self.foods = []
+
+    def apply(self, kind, data):
+        # Returns the (player id, flags, score change) of every player the
+        # message touched
+        if kind == MSG_SNAPSHOT:
+            return self._apply_snapshot(data)
+        if kind == MSG_DELTA:
+            return self._apply_delta(data)
+        return []
+
+    def _apply_snapshot(self, data):
+        self.tick, pos = _read_varint(data, 0)
+        self.grid_size, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        self.players = {}
+        changes = []
+        for _ in range(count):
+            player_id, pos = _read_varint(data, pos)
+            player = self.players[player_id] = RemotePlayer(player_id)
+            player.alive = bool(data[pos])
+            score, pos = _read_varint(data, pos + 1)
+            player.score = _unzigzag(score)
+            length, pos = _read_varint(data, pos)
+            for _ in range(length):
+                cell, pos = _read_varint(data, pos)
+                player.body.append(cell)
+            changes.append((player_id, SPAWNED if player.alive else DIED, 0))
+        self._read_foods(data, pos)
+        return changes
+
+    def _apply_delta(self, data):
+        self.tick, pos = _read_varint(data, 0)
+        count, pos = _read_varint(data, pos)
+        changes = []
+        for _ in range(count):
+            player_id, pos = _read_varint(data, pos)
+            flags = data[pos]
+            pos += 1
+            player = self.players.get(player_id)
+            if player is None:
+                player = self.players[player_id] = RemotePlayer(player_id)
+            score = 0
+            if flags & SPAWNED:
+                # Before any move: a snake that joined between ticks can
+                # spawn and move in one delta
+                cell, pos = _read_varint(data, pos)
+                player.body.clear()
+                player.body.append(cell)
+                player.alive = True
+            if flags & MOVED:
+                head, pos = _read_varint(data, pos)
+                player.body.appendleft(head)
+            if flags & POPPED:
+                popped, pos = _read_varint(data, pos)
+                for _ in range(popped):
+                    player.body.pop()
+            if flags & SCORED:
+                score, pos = _read_varint(data, pos)
+                score = _unzigzag(score)
+                player.score += score
+            if flags & DIED:
+                player.body.clear()
+                player.alive = False
+            if flags & LEFT_ROOM:
+                del self.players[player_id]
+            changes.append((player_id, flags, score))
+        self._read_foods(data, pos)
+        return changes
+
+    def _read_foods(self, data, pos):
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            index, pos = _read_varint(data, pos)
+            cell, pos = _read_varint(data, pos)
+            while len(self.foods) <= index:
+                self.foods.append(RemoteFood())
+            food = self.foods[index]
+            if cell:
+                y, x = divmod(cell - 1, self.grid_size)
+                food.position = (x, y)
+            else:
+                food.position = None
+            food.type = FOOD_TYPES[data[pos]]
+            pos += 1
+        return pos
+
+
+def _check_length(length):
+    # A frame holds at least its type byte; a bigger one than any message
+    # we send is garbage or an attempt to make us allocate it
+    if not 1 <= length <= MAX_MESSAGE:
+        raise ValueError(f"bad message length {length}")
+
+
+def split_frames(buffer):
+    # Complete (type, body) messages at the front of `buffer`, which is
+    # consumed up to the end of the last one. ValueError on a bad length.
+    messages = []
+    start = 0
+    while len(buffer) - start >= _HEADER.size:
+        (length,) = _HEADER.unpack_from(buffer, start)
+        _check_length(length)
+        end = start + _HEADER.size + length
+        if end > len(buffer):
+            break
+        messages.append((buffer[start + _HEADER.size], bytes(buffer[start + _HEADER.size + 1:end])))
+        start = end
+    del buffer[:start]
+    return messages
+
+
+class RoomClient:
+    # Blocking connect and join, then non-blocking: the game calls poll()
+    # once a frame and turn() on input, and never waits on the network
+    def __init__(self, host, port, room=0, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.view = RoomView()
+        self._buffer = bytearray()
+        self._seq = 0
+        self.acked = 0
+        out = bytearray()
+        _write_varint(out, room)
+        self.sock.sendall(frame(MSG_JOIN, out))
+        self.room = self.player_id = None
+        synced = False
+        while self.player_id is None or not synced:
+            data = self.sock.recv(65536)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self._buffer += data
+            for kind, body in split_frames(self._buffer):
+                if kind == MSG_WELCOME:
+                    self.room, pos = _read_varint(body, 0)
+                    self.player_id, _ = _read_varint(body, pos)
+                else:
+                    self.view.apply(kind, body)
+                    synced |= kind == MSG_SNAPSHOT
+        self.sock.setblocking(False)
+
+    @property
+    def me(self):
+        return self.view.players.get(self.player_id)
+
+    def turn(self, direction):
+        self._seq += 1
+        out = bytearray()
+        _write_varint(out, DIRECTIONS.index(direction))
+        _write_varint(out, self._seq)
+        try:
+            self.sock.send(frame(MSG_TURN, out))
+        except BlockingIOError:
+            pass  # A full send buffer means the server is gone; poll finds out
+
+    def poll(self):
+        # Apply everything that has arrived; returns the changes, as
+        # RoomView.apply does. Raises ConnectionError if the server went,
+        # ValueError if it sent a bad frame.
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self._buffer += data
+        changes = []
+        for kind, body in split_frames(self._buffer):
+            if kind == MSG_ACK:
+                self.acked, _ = _read_varint(body, 0)
+            else:
+                changes.extend(self.view.apply(kind, body))
+        return changes
+
+    def close(self):
+        self.sock.close()
+
+
+def _percentiles(samples):
+    values = sorted(samples)
+    if not values:
+        return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+    return {"p50": values[len(values) // 2], "p99": values[int(len(values) * 0.99)],
+            "max": values[-1]}
+
+
+class RoomServer:
+    def __init__(self, grid_size=GRID_SIZE, max_players=ROOM_PLAYERS, food_count=ROOM_FOODS,
+                 seed=None):
+        self.grid_size = grid_size
+        self.max_players = max_players
+        self.food_count = food_count
+        self.rng = random.Random(seed)
+        self.rooms = {}  # room id -> Room
+        self.clients = {}  # room id -> {player id: StreamWriter}
+        self._next_room = 1
+        # Timings of the last TICK_SAMPLES ticks, in ms
+        self.tick_work = deque(maxlen=TICK_SAMPLES)
+        self.tick_late = deque(maxlen=TICK_SAMPLES)
+        self.ticks = 0
+        self.room_ticks = 0
+        self.dropped_ticks = 0
+        self.messages = 0
+        self.bytes_sent = 0
+        self.slow_clients = 0
+
+    def room_for(self, room_id=0):
+        # The room asked for (made if needed), or with 0 or a full room the
+        # first that has space; WELCOME tells the client which it got
+        room = self.rooms.get(room_id)
+        if room_id and (room is None or not room.full):
+            self._next_room = max(self._next_room, room_id + 1)
+        else:
+            room_id = next((rid for rid, room in self.rooms.items() if not room.full),
+                           self._next_room)
+            self._next_room = max(self._next_room, room_id + 1)
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id, self.grid_size, self.max_players,
+                                              self.food_count, self.rng.getrandbits(32))
+            self.clients[room_id] = {}
+        return room
+
+    def tick(self):
+        # One tick of every room, and its delta and acks out to its clients
+        for room_id, room in self.rooms.items():
+            room.tick()
+            message = room.delta()
+            clients = self.clients[room_id]
+            if message is not None:
+                for writer in list(clients.values()):
+                    self._send(writer, message)
+            for player_id, seq in room.acks():
+                writer = clients.get(player_id)
+                if writer is not None:
+                    out = bytearray()
+                    _write_varint(out, seq)
+                    self._send(writer, frame(MSG_ACK, out))
+        self.room_ticks += len(self.rooms)
+        self.ticks += 1
+
+    def _send(self, writer, message):
+        if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            # Not reading: drop it rather than buffer without limit
+            self.slow_clients += 1
+            writer.transport.abort()
+            return
+        writer.write(message)
+        self.messages += 1
+        self.bytes_sent += len(message)
+
+    def stats(self):
+        return {
+            "rooms": len(self.rooms),
+            "players": sum(len(room) for room in self.rooms.values()),
+            "ticks": self.ticks,
+            "room_ticks": self.room_ticks,
+            "dropped_ticks": self.dropped_ticks,
+            "tick_work_ms": _percentiles(self.tick_work),
+            "tick_late_ms": _percentiles(self.tick_late),
+            "messages": self.messages,
+            "bytes_sent": self.bytes_sent,
+            "slow_clients": self.slow_clients,
+        }
+
+    async def run_ticks(self):
+        # Fixed-rate loop. A late tick runs straight away; more than
+        # MAX_CATCHUP_TICKS behind, the backlog is dropped, as FixedTimestep
+        # does for a slow frame.
+        loop = asyncio.get_running_loop()
+        period = 1.0 / TICK_RATE
+        next_tick = loop.time()
+        while True:
+            delay = next_tick - loop.time()
+            # Yield even when late, so clients' input still gets read
+            await asyncio.sleep(max(0.0, delay))
+            now = loop.time()
+            started = time.perf_counter()
+            self.tick()
+            self.tick_work.append((time.perf_counter() - started) * 1000)
+            self.tick_late.append(max(0.0, now - next_tick) * 1000)
+            next_tick += period
+            behind = int((loop.time() - next_tick) / period)
+            if behind > MAX_CATCHUP_TICKS:
+                self.dropped_ticks += behind
+                next_tick += behind * period
+
+    async def serve_client(self, reader, writer):
+        room = player = None
+        try:
+            kind, body = await _read_message(reader)
+            if kind == MSG_STATS:
+                writer.write(frame(MSG_STATS, json.dumps(self.stats()).encode()))
+                await writer.drain()
+                return
+            if kind != MSG_JOIN:
+                return
+            room = self.room_for(_read_varint(body, 0)[0])
+            player = room.join()
+            out = bytearray()
+            _write_varint(out, room.id)
+            _write_varint(out, player.id)
+            writer.write(frame(MSG_WELCOME, out) + room.snapshot())
+            self.clients[room.id][player.id] = writer
+            while True:
+                kind, body = await _read_message(reader)
+                if kind == MSG_TURN:
+                    direction, pos = _read_varint(body, 0)
+                    seq, _ = _read_varint(body, pos)
+                    if direction < len(DIRECTIONS):
+                        room.turn(player.id, direction, seq)
+                elif kind == MSG_STATS:
+                    writer.write(frame(MSG_STATS, json.dumps(self.stats()).encode()))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if player is not None:
+                self.clients[room.id].pop(player.id, None)
+                room.leave(player.id)
+                if not len(room):
+                    del self.rooms[room.id]
+                    del self.clients[room.id]
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=PORT, ready=None):
+        server = await asyncio.start_server(self.serve_client, host, port)
+        address = server.sockets[0].getsockname()
+        if ready is not None:
+            ready(address)
+        async with server:
+            await self.run_ticks()
+
+
+async def _read_message(reader):
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    _check_length(length)
+    data = await reader.readexactly(length)
+    return data[0], data[1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multiplayer snake server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT, help="0 picks a free port")
+    parser.add_argument("--grid", type=int, default=GRID_SIZE)
+    parser.add_argument("--players", type=int, default=ROOM_PLAYERS, help="snakes per room")
+    parser.add_argument("--foods", type=int, default=ROOM_FOODS, help="foods per room")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = RoomServer(args.grid, args.players, args.foods, args.seed)
+
+    def ready(address):
+        print(f"listening on {address[0]}:{address[1]}", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
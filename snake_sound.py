@@ -0,0 +1,102 @@
+import hashlib
+import os
+
+import numpy as np
+
+# Sound synthesis for the retro beeps. Pure NumPy, no pygame needed, so the
+# PCM can be built (and cached) before the mixer is even initialized.
+
+SAMPLE_RATE = 22050
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get(
+    "SNAKE_SOUND_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "atari_snake", "sounds"))
+WAVEFORMS = ("square", "sine")
+
+_memory_cache = {}
+
+
+def synth_wave(frequency, duration, sample_rate=SAMPLE_RATE, waveform="square"):
+    samples = int(sample_rate * duration)
+    i = np.arange(samples, dtype=np.float64)
+    t = i / sample_rate
+    phase = np.sin(2 * np.pi * frequency * t)
+    if waveform == "square":
+        # Square wave for that Atari sound
+        wave = np.where(phase > 0, 32767.0, -32767.0)
+    elif waveform == "sine":
+        wave = phase * 32767.0
+    else:
+        raise ValueError(f"unknown waveform: {waveform!r}")
+
+    # Linear attack over the first 10% and release over the last 10%
+    ramp = samples * 0.1
+    envelope = np.ones(samples)
+    if samples:
+        attack = i < ramp
+        release = ~attack & (i > samples * 0.9)
+        envelope[attack] = i[attack] / ramp
+        envelope[release] = (samples - i[release]) / ramp
+
+    mono = np.trunc(wave * envelope * 0.3).astype(np.int16)
+    # Left and right channels get the same signal
+    return np.repeat(mono[:, np.newaxis], 2, axis=1)
+
+
+def _cache_path(key):
+    digest = hashlib.sha1(repr((CACHE_VERSION,) + key).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"beep-{digest}.npy")
+
+
+def _load_cached(path, samples):
+    try:
+        waves = np.load(path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if waves.dtype != np.int16 or waves.shape != (samples, 2):
+        return None
+    return waves
+
+
+def _store_cached(path, waves):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, waves, allow_pickle=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # A read-only home just means every start is a cold start
+
+
+def beep_pcm(frequency, duration, sample_rate=SAMPLE_RATE, waveform="square",
+             use_disk=True):
+    # Returns a read-only (samples, 2) int16 buffer, shared between callers
+    key = (frequency, duration, sample_rate, waveform)
+    waves = _memory_cache.get(key)
+    if waves is not None:
+        return waves
+
+    samples = int(sample_rate * duration)
+    path = _cache_path(key) if use_disk else None
+    if path is not None:
+        waves = _load_cached(path, samples)
+    if waves is None:
+        waves = synth_wave(frequency, duration, sample_rate, waveform)
+        if path is not None:
+            _store_cached(path, waves)
+
+    waves.flags.writeable = False
+    _memory_cache[key] = waves
+    return waves
+
+
+def clear_cache(disk=False):
+    _memory_cache.clear()
+    if disk and os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.startswith("beep-") and name.endswith(".npy"):
+                try:
+                    os.remove(os.path.join(CACHE_DIR, name))
+                except OSError:
+                    pass
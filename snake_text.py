@@ -0,0 +1,96 @@
+from collections import OrderedDict
+
+import pygame
+
+# Text rendering cache. Font rasterization is one of the most expensive calls
+# in the frame, so every (font, text, color, antialias) surface is kept in an
+# LRU, and strings with numbers in them are assembled from a per-font digit
+# atlas so a changing score never goes back to Font.render.
+
+DIGITS = "0123456789"
+
+
+class GlyphAtlas:
+    # The ten digits of one font and color, rasterized once
+    def __init__(self, font, color, antialias=True):
+        self.glyphs = {}
+        self.advances = {}
+        for digit, metrics in zip(DIGITS, font.metrics(DIGITS)):
+            self.glyphs[digit] = font.render(digit, antialias, color)
+            self.advances[digit] = metrics[4]
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+
+class TextCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+        self._atlases = {}
+        self.renders = 0  # Font.render calls made, for checking the hit rate
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        if any(ch in DIGITS for ch in text):
+            surface = self._compose(font, text, color, antialias)
+        else:
+            surface = font.render(text, antialias, color)
+            self.renders += 1
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._atlases.clear()
+
+    def _atlas(self, font, color, antialias):
+        key = (font, tuple(color), antialias)
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(font, color, antialias)
+            self.renders += len(DIGITS)
+        return atlas
+
+    def _compose(self, font, text, color, antialias):
+        # Split into digit and non-digit runs; digits come from the atlas and
+        # the rest through the cache, so only new words are rasterized
+        atlas = self._atlas(font, color, antialias)
+        pieces = []
+        run = ""
+        for ch in text + "\0":
+            if ch in atlas.glyphs or ch == "\0":
+                if run:
+                    pieces.append(self.render(font, run, color, antialias))
+                    run = ""
+                if ch != "\0":
+                    pieces.append(ch)
+            else:
+                run += ch
+
+        width = 0
+        height = atlas.height
+        for piece in pieces:
+            if isinstance(piece, str):
+                width += atlas.advances[piece]
+            else:
+                width += piece.get_width()
+                height = max(height, piece.get_height())
+
+        # Copy glyphs onto a clear surface without blending, so antialiased
+        # edges keep their alpha instead of being darkened against it
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        x = 0
+        for piece in pieces:
+            if isinstance(piece, str):
+                surface.blit(atlas.glyphs[piece], (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                x += atlas.advances[piece]
+            else:
+                surface.blit(piece, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                x += piece.get_width()
+        return surface
@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from snake_autopilot import Autopilot
+from snake_engine import (BOARD_FULL, DEATH_SELF, DEATH_WALL, DIRECTIONS, EVENT_EAT,
+                          GRID_SIZE, Engine)
+
+# Headless tournaments: M games for each of K scripted policies, split into
+# chunks across a process pool. Each finished chunk is appended to a JSON
+# lines file as soon as it arrives and folded into running totals, so a
+# killed run picks up where it left off with --resume.
+
+CHUNK_SIZE = 50
+MAX_TICKS = 200_000  # A policy that loops forever ends the game here
+TIMEOUT = "timeout"
+FOOD_TYPES = ("apple", "golden", "speed", "ghost", "bomb")
+
+
+def _ahead(engine, direction):
+    x, y = engine.snake.positions[0]
+    return x + direction[0], y + direction[1]
+
+
+def _turns(engine):
+    # The directions Engine.turn accepts: anything but straight back
+    dx, dy = engine.snake.direction
+    return [d for d in DIRECTIONS if d != (-dx, -dy)]
+
+
+def _safe(engine, cell):
+    size = engine.grid_size
+    x, y = cell
+    return 0 <= x < size and 0 <= y < size and cell not in engine.snake.positions
+
+
+def policy_straight(engine, rng):
+    # Random turns now and then, no look-ahead
+    if rng.random() < 0.1:
+        return rng.choice(DIRECTIONS)
+    return None
+
+
+def policy_safe_random(engine, rng):
+    # Keep going unless that hits something, then any safe turn
+    direction = engine.snake.direction
+    if _safe(engine, _ahead(engine, direction)) and rng.random() > 0.1:
+        return None
+    options = [d for d in _turns(engine) if _safe(engine, _ahead(engine, d))]
+    return rng.choice(options) if options else None
+
+
+def policy_greedy(engine, rng, avoid_bombs=False):
+    # Safe move that gets closest to the food
+    food = engine.food.position
+    best = None
+    best_distance = None
+    for direction in _turns(engine):
+        cell = _ahead(engine, direction)
+        if not _safe(engine, cell):
+            continue
+        distance = abs(cell[0] - food[0]) + abs(cell[1] - food[1])
+        if avoid_bombs and engine.food.type == "bomb":
+            distance = -distance
+        if best is None or distance < best_distance or (
+                distance == best_distance and rng.random() < 0.5):
+            best, best_distance = direction, distance
+    return best
+
+
+def policy_bomb_shy(engine, rng):
+    return policy_greedy(engine, rng, avoid_bombs=True)
+
+
+def policy_autopilot(engine, rng):
+    # One decision from a fresh pilot. Games go through policy_for, which
+    # keeps one pilot per engine so its plans carry over between moves.
+    return Autopilot(engine).decide()
+
+
+POLICIES = {
+    "straight": policy_straight,
+    "safe-random": policy_safe_random,
+    "greedy": policy_greedy,
+    "bomb-shy": policy_bomb_shy,
+    "autopilot": policy_autopilot,
+}
+
+
+def policy_for(name, engine):
+    # The policy to play games on `engine` with. The autopilot's pilot is
+    # made here, next to the engine it serves, and goes when the engine does.
+    if name == "autopilot":
+        pilot = Autopilot(engine)
+        return lambda engine, rng: pilot.decide()
+    return POLICIES[name]
+
+
+class Stats:
+    # Totals that merge across chunks in any order
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.scores = Counter()  # score -> games, for exact percentiles
+        self.length_total = 0
+        self.length_max = 0
+        self.causes = Counter()
+        self.bomb_shortened = 0  # Games in which a bomb cut the snake down
+        self.pickups = Counter()
+
+    def add_game(self, engine, cause, pickups, shortened):
+        self.games += 1
+        self.ticks += engine.ticks
+        self.scores[engine.score] += 1
+        length = len(engine.snake.body)
+        self.length_total += length
+        self.length_max = max(self.length_max, length)
+        self.causes[cause] += 1
+        self.bomb_shortened += shortened
+        self.pickups.update(pickups)
+
+    def merge(self, other):
+        self.games += other.games
+        self.ticks += other.ticks
+        self.scores.update(other.scores)
+        self.length_total += other.length_total
+        self.length_max = max(self.length_max, other.length_max)
+        self.causes.update(other.causes)
+        self.bomb_shortened += other.bomb_shortened
+        self.pickups.update(other.pickups)
+
+    def percentile(self, fraction):
+        if not self.games:
+            return 0
+        rank = fraction * (self.games - 1)
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen > rank:
+                return score
+        return max(self.scores)
+
+    def to_json(self):
+        return {
+            "games": self.games,
+            "ticks": self.ticks,
+            "scores": {str(score): n for score, n in self.scores.items()},
+            "length_total": self.length_total,
+            "length_max": self.length_max,
+            "causes": dict(self.causes),
+            "bomb_shortened": self.bomb_shortened,
+            "pickups": dict(self.pickups),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls()
+        stats.games = data["games"]
+        stats.ticks = data["ticks"]
+        stats.scores = Counter({int(score): n for score, n in data["scores"].items()})
+        stats.length_total = data["length_total"]
+        stats.length_max = data["length_max"]
+        stats.causes = Counter(data["causes"])
+        stats.bomb_shortened = data["bomb_shortened"]
+        stats.pickups = Counter(data["pickups"])
+        return stats
+
+
+def check_policies(names, trials=500, seed=0):
+    # Policies that look ahead must never pick the reverse of the current
+    # direction: a one-cell snake sees the cell behind it as free, but the
+    # engine refuses the turn and the snake carries on into whatever is
+    # ahead. Returns (policy, head, direction, choice) for each bad pick.
+    rng = random.Random(seed)
+    engine = Engine(GRID_SIZE)
+    failures = []
+    for name in names:
+        if name == "straight":
+            continue  # Picks at random on purpose, with no look-ahead
+        for _ in range(trials):
+            engine.reset(rng.getrandbits(32))
+            direction = rng.choice(DIRECTIONS)
+            engine.snake.direction = direction
+            choice = POLICIES[name](engine, rng)
+            if choice is not None and choice == (-direction[0], -direction[1]):
+                failures.append((name, engine.snake.positions[0], direction, choice))
+    return failures
+
+
+def play(engine, policy, rng, max_ticks=MAX_TICKS):
+    # One game at tick resolution, exactly as Game.update would run it
+    pickups = Counter()
+    shortened = False
+    while not engine.game_over and engine.ticks < max_ticks:
+        if engine.move_due:
+            direction = policy(engine, rng)
+            if direction is not None:
+                engine.turn(direction)
+        length = len(engine.snake.body)
+        for event in engine.tick():
+            if event[0] == EVENT_EAT:
+                pickups[event[1]] += 1
+                if event[1] == "bomb" and len(engine.snake.body) < length:
+                    shortened = True
+    cause = engine.death_cause if engine.game_over else TIMEOUT
+    return cause, pickups, shortened
+
+
+def run_chunk(policy_name, chunk, games, seed, grid_size=GRID_SIZE, max_ticks=MAX_TICKS):
+    # Worker entry point. The chunk's RNG depends only on the run seed and
+    # the chunk's identity, so results don't change with the worker count.
+    rng = random.Random(f"{seed}:{policy_name}:{chunk}")
+    engine = Engine(grid_size)
+    policy = policy_for(policy_name, engine)
+    stats = Stats()
+    for _ in range(games):
+        engine.reset(rng.getrandbits(32))
+        cause, pickups, shortened = play(engine, policy, rng, max_ticks)
+        stats.add_game(engine, cause, pickups, shortened)
+    return policy_name, chunk, stats.to_json()
+
+
+def _load_results(path, config):
+    # Finished chunks from an earlier run with the same settings. A line
+    # half-written by a crash is cut off so new results append cleanly.
+    done = {}
+    with open(path, "rb+") as f:
+        header = json.loads(f.readline())
+        if header != config:
+            raise SystemExit(f"{path} was written with different settings: {header}")
+        good = f.tell()
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            done[record["policy"], record["chunk"]] = Stats.from_json(record["stats"])
+            good += len(line)
+        f.truncate(good)
+    return done
+
+
+def report(totals, ticks, elapsed):
+    print(f"{'policy':<12} {'games':>7} {'mean':>7} {'p50':>6} {'p90':>6} {'max':>6} "
+          f"{'len':>6} {'wall':>6} {'self':>6} {'win':>5} {'t/o':>5} {'bomb-cut':>8}  "
+          f"pickups/game ({'/'.join(FOOD_TYPES)})")
+    for name, stats in totals.items():
+        games = stats.games or 1
+        mean = sum(score * n for score, n in stats.scores.items()) / games
+        pickups = " ".join(f"{stats.pickups[t] / games:.1f}" for t in FOOD_TYPES)
+        print(f"{name:<12} {stats.games:>7} {mean:>7.1f} {stats.percentile(0.5):>6} "
+              f"{stats.percentile(0.9):>6} {max(stats.scores, default=0):>6} "
+              f"{stats.length_total / games:>6.1f} "
+              f"{stats.causes[DEATH_WALL]:>6} {stats.causes[DEATH_SELF]:>6} "
+              f"{stats.causes[BOARD_FULL]:>5} {stats.causes[TIMEOUT]:>5} "
+              f"{stats.bomb_shortened:>8}  {pickups}")
+    if ticks:
+        print(f"{ticks:,} ticks simulated in {elapsed:.1f}s ({ticks / elapsed:,.0f} ticks/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scripted policies headless and compare them")
+    parser.add_argument("--games", type=int, default=1000, help="games per policy")
+    parser.add_argument("--policies", default=",".join(POLICIES),
+                        help=f"comma-separated, from: {', '.join(POLICIES)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="games per work item")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grid", type=int, default=GRID_SIZE)
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--out", default="tournament.jsonl",
+                        help="results file, one line per finished chunk")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the chunks already in --out")
+    parser.add_argument("--check", action="store_true",
+                        help="only check that no policy reverses a one-cell snake")
+    args = parser.parse_args(argv)
+
+    policies = args.policies.split(",")
+    for name in policies:
+        if name not in POLICIES:
+            parser.error(f"unknown policy {name!r}")
+    if args.check:
+        failures = check_policies(policies, seed=args.seed)
+        for name, head, direction, choice in failures[:10]:
+            print(f"{name}: head {head} heading {direction} picked {choice}")
+        print(f"{len(failures)} reversals" if failures else "no policy reverses")
+        return 1 if failures else 0
+    config = {"games": args.games, "chunk": args.chunk, "seed": args.seed,
+              "grid": args.grid, "max_ticks": args.max_ticks}
+
+    done = {}
+    if args.resume and os.path.exists(args.out):
+        done = _load_results(args.out, config)
+    else:
+        with open(args.out, "w") as f:
+            f.write(json.dumps(config) + "\n")
+
+    totals = {name: Stats() for name in policies}
+    for (name, _), stats in done.items():
+        if name in totals:
+            totals[name].merge(stats)
+
+    work = []
+    for name in policies:
+        for chunk, start in enumerate(range(0, args.games, args.chunk)):
+            if (name, chunk) not in done:
+                work.append((name, chunk, min(args.chunk, args.games - start)))
+    print(f"{len(work)} chunks to run, {len(done)} already done, {args.workers} workers")
+
+    # multiprocessing and friends, only once there are games to run
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    ticks = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool, open(args.out, "a") as out:
+        futures = [pool.submit(run_chunk, name, chunk, games, args.seed, args.grid,
+                               args.max_ticks)
+                   for name, chunk, games in work]
+        for finished, future in enumerate(as_completed(futures), 1):
+            name, chunk, stats = future.result()
+            out.write(json.dumps({"policy": name, "chunk": chunk, "stats": stats}) + "\n")
+            out.flush()
+            stats = Stats.from_json(stats)
+            totals[name].merge(stats)
+            ticks += stats.ticks
+            if finished % max(1, len(futures) // 10) == 0:
+                print(f"  {finished}/{len(futures)} chunks")
+    report(totals, ticks, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())